@@ -10,11 +10,31 @@ from .video_analytics import (
 )
 from .comment_analytics import (
     generate_word_cloud,
+    render_word_cloud_image,
     clean_text,
     analyze_comment_sentiment,
     get_top_commenters,
     get_most_liked_comments,
 )
+from .metrics import (
+    safe_ratio,
+    engagement_rate,
+    video_age_days,
+    compute_video_metrics,
+    with_video_metrics,
+)
+from .sentiment import LEXICON_VERSION, score_comments
+from .enrichment import (
+    TOKENIZER_VERSION,
+    tokenize_comments,
+    detect_language,
+    enrich_comments,
+    enrich_comment_batch,
+    enrich_pending_comments,
+    start_enrichment_backfill,
+    ensure_video_enriched,
+    analyze_video_sentiment,
+)
 
 __all__ = [
     "analyze_video_performance",
@@ -22,8 +42,25 @@ __all__ = [
     "create_comparison_chart",
     "generate_optimization_suggestions",
     "generate_word_cloud",
+    "render_word_cloud_image",
     "clean_text",
     "analyze_comment_sentiment",
     "get_top_commenters",
     "get_most_liked_comments",
+    "safe_ratio",
+    "engagement_rate",
+    "video_age_days",
+    "compute_video_metrics",
+    "with_video_metrics",
+    "LEXICON_VERSION",
+    "score_comments",
+    "TOKENIZER_VERSION",
+    "tokenize_comments",
+    "detect_language",
+    "enrich_comments",
+    "enrich_comment_batch",
+    "enrich_pending_comments",
+    "start_enrichment_backfill",
+    "ensure_video_enriched",
+    "analyze_video_sentiment",
 ]
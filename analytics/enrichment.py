@@ -0,0 +1,265 @@
+"""
+评论预处理模块
+在评论入库时计算分词结果、语言和情感得分并写入 comment_enrichment 表，
+词云、情感分析等页面直接汇总这些列，不再每次重新读取和处理评论文本。
+
+- 处理是幂等的：同一条评论重复处理只会覆盖为相同的结果
+- 修改分词规则后递增 TOKENIZER_VERSION，修改情感词典后递增 sentiment.LEXICON_VERSION，
+  版本落后的评论由轮询器或分析页面触发的后台任务重新计算
+
+安装 jieba 时中文按词切分，否则按相邻两字（二元组）切分。
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import jieba
+    HAS_JIEBA = True
+except ImportError:
+    HAS_JIEBA = False
+
+from config import Config
+from database import (
+    get_unenriched_comments,
+    count_unenriched_comments,
+    save_comment_enrichment,
+    get_sentiment_summary,
+    get_comment_sentiments,
+)
+from .sentiment import LEXICON_VERSION, score_comments
+
+TOKENIZER_VERSION = 1
+
+STOPWORDS = frozenset([
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "could",
+    "should", "may", "might", "must", "shall", "can", "need", "dare",
+    "this", "that", "these", "those", "i", "you", "he", "she", "it", "we",
+    "they", "me", "him", "her", "us", "them", "my", "your", "his", "its",
+    "our", "their", "mine", "yours", "hers", "ours", "theirs", "what",
+    "which", "who", "whom", "whose", "when", "where", "why", "how", "if",
+    "then", "else", "because", "although", "though", "but", "and", "or",
+    "so", "for", "nor", "yet", "both", "either", "neither", "not", "only",
+    "own", "same", "than", "too", "very", "just", "also", "now", "here",
+    "there", "all", "any", "some", "no", "each", "every", "few", "many",
+    "much", "more", "most", "less", "least", "another", "such", "whatever",
+    "whichever",
+    "的", "了", "是", "在", "我", "有", "和", "就", "不", "人", "都", "一",
+    "一个", "上", "也", "很", "到", "说", "要", "去", "你", "会", "着", "没有",
+    "看", "好", "自己", "这",
+])
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+# 英文词至少 3 个字母；中文取连续的汉字串，再切分为词
+TOKEN_PATTERN = re.compile("[a-z][a-z0-9']{2,}|[\u4e00-\u9fff]{2,}")
+_CJK_RUN = re.compile("[\u4e00-\u9fff]")
+
+# 各文字的字符，用于判断评论语言
+_SCRIPTS = {
+    "kana": "[\u3040-\u30ff]",
+    "hangul": "[\uac00-\ud7af]",
+    "han": "[\u4e00-\u9fff]",
+    "latin": "[A-Za-z]",
+}
+
+_backfill_lock = threading.Lock()
+
+
+def _split_cjk(run: str) -> List[str]:
+    if HAS_JIEBA:
+        return [word for word in jieba.lcut(run) if len(word) >= 2]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def _filter_tokens(matches: List[str]) -> List[str]:
+    # 中文串切分为词，再去掉停用词，保持词在评论中的顺序
+    tokens = []
+    for match in matches:
+        words = _split_cjk(match) if _CJK_RUN.match(match) else (match,)
+        tokens.extend(word for word in words if word not in STOPWORDS)
+    return tokens
+
+
+def _as_series(texts: Iterable[Optional[str]]) -> pd.Series:
+    if isinstance(texts, pd.Series):
+        return texts.reset_index(drop=True)
+    return pd.Series(list(texts), dtype="object")
+
+
+def tokenize_comments(texts: Iterable[Optional[str]]) -> pd.Series:
+    """
+    批量分词
+
+    Args:
+        texts: 评论文本序列，None 视为空文本
+
+    Returns:
+        与输入顺序一致的 Series，每项为去掉停用词后的词列表（小写）
+    """
+    texts = _as_series(texts)
+    lowered = texts.fillna("").astype(str).str.lower().str.replace(_URL_PATTERN, " ", regex=True)
+    return lowered.str.findall(TOKEN_PATTERN).map(_filter_tokens)
+
+
+def detect_language(texts: Iterable[Optional[str]]) -> pd.Series:
+    """
+    按文字类型粗略判断评论语言
+
+    Args:
+        texts: 评论文本序列
+
+    Returns:
+        与输入顺序一致的 Series，取值为 "ja"、"ko"、"zh"、"en" 或 "other"
+    """
+    texts = _as_series(texts).fillna("").astype(str)
+    counts = {name: texts.str.count(pattern).to_numpy() for name, pattern in _SCRIPTS.items()}
+
+    language = np.select(
+        [
+            counts["kana"] > 0,
+            counts["hangul"] > counts["han"],
+            counts["han"] > 0,
+            counts["latin"] > 0,
+        ],
+        ["ja", "ko", "zh", "en"],
+        default="other",
+    )
+    return pd.Series(language, index=texts.index)
+
+
+def enrich_comments(texts: Iterable[Optional[str]]) -> pd.DataFrame:
+    """
+    批量计算评论的预处理结果
+
+    Args:
+        texts: 评论文本序列
+
+    Returns:
+        与输入顺序一致的 DataFrame，列为 tokens（JSON 数组字符串）、language、
+        positive、negative、score、label（见 sentiment.score_comments）
+    """
+    texts = _as_series(texts)
+    enriched = score_comments(texts)
+    enriched.insert(0, "language", detect_language(texts).to_numpy())
+    enriched.insert(0, "tokens", tokenize_comments(texts).map(
+        lambda tokens: json.dumps(tokens, ensure_ascii=False)).to_numpy())
+    return enriched
+
+
+def enrich_comment_batch(comments: List[Dict[str, Any]]) -> int:
+    """
+    为刚入库的一批评论计算并保存预处理结果
+
+    Args:
+        comments: API 返回的评论字典列表（需要 comment_id 和 text）
+
+    Returns:
+        写入的条数
+    """
+    comments = [comment for comment in comments if comment.get("comment_id")]
+    if not comments:
+        return 0
+
+    enriched = enrich_comments(comment.get("text") for comment in comments)
+    enriched.insert(0, "comment_id", [comment["comment_id"] for comment in comments])
+    return save_comment_enrichment(enriched, TOKENIZER_VERSION, LEXICON_VERSION)
+
+
+def enrich_pending_comments(video_id: str = None, batch_size: int = None) -> int:
+    """
+    处理还没有预处理或版本落后的评论
+
+    Args:
+        video_id: 只处理该视频的评论，None 表示全部评论
+        batch_size: 每批读取和写入的评论数，默认使用 Config.ENRICHMENT_BATCH_SIZE
+
+    Returns:
+        本次处理的评论数
+    """
+    batch_size = batch_size or Config.ENRICHMENT_BATCH_SIZE
+    processed = 0
+    after_id = 0
+
+    while True:
+        pending = get_unenriched_comments(TOKENIZER_VERSION, LEXICON_VERSION, video_id=video_id,
+                                          after_id=after_id, limit=batch_size)
+        if pending.empty:
+            return processed
+
+        enriched = enrich_comments(pending["text"])
+        enriched.insert(0, "comment_id", pending["id"].to_numpy())
+        save_comment_enrichment(enriched, TOKENIZER_VERSION, LEXICON_VERSION)
+        processed += len(enriched)
+        after_id = int(pending["id"].iloc[-1])
+
+        if len(pending) < batch_size:
+            return processed
+
+
+def _run_backfill() -> None:
+    try:
+        enrich_pending_comments()
+    finally:
+        _backfill_lock.release()
+
+
+def start_enrichment_backfill() -> bool:
+    """
+    在后台线程中处理全部待处理的评论
+
+    Returns:
+        是否启动了新的后台任务（已有任务在运行时返回 False）
+    """
+    if not _backfill_lock.acquire(blocking=False):
+        return False
+    threading.Thread(target=_run_backfill, name="comment-enrichment", daemon=True).start()
+    return True
+
+
+def ensure_video_enriched(video_id: str) -> int:
+    """
+    确保视频评论的预处理结果是最新的
+
+    待处理的评论不超过 Config.ENRICHMENT_INLINE_LIMIT 时当场处理；
+    较多时（例如词典版本更新后）启动后台补算，调用方先使用已处理部分的结果
+
+    Args:
+        video_id: 视频 ID
+
+    Returns:
+        仍未处理的评论数
+    """
+    pending = count_unenriched_comments(TOKENIZER_VERSION, LEXICON_VERSION, video_id=video_id)
+    if pending and pending <= Config.ENRICHMENT_INLINE_LIMIT:
+        enrich_pending_comments(video_id)
+        return 0
+    if pending:
+        start_enrichment_backfill()
+    return pending
+
+
+def analyze_video_sentiment(video_id: str, include_comments: bool = False) -> Dict:
+    """
+    汇总视频评论的情感分布
+
+    Args:
+        video_id: 视频 ID
+        include_comments: 是否同时返回每条评论的打分
+
+    Returns:
+        {"positive", "neutral", "negative", "total", "average_score", "languages",
+         "pending": 尚未处理的评论数}；
+        include_comments 为 True 时另有 "comments"（见 get_comment_sentiments）
+    """
+    pending = ensure_video_enriched(video_id)
+    result = get_sentiment_summary(video_id, LEXICON_VERSION)
+    result["pending"] = pending
+    if include_comments:
+        result["comments"] = get_comment_sentiments(video_id, LEXICON_VERSION)
+    return result
@@ -0,0 +1,110 @@
+"""
+视频指标模块
+按整列计算互动率、点赞率、评论率、日均观看量和百分位排名，不逐行调用 Python 函数
+
+输入为 database.get_videos_frame 格式的 DataFrame（或包含相同计数列的任意 DataFrame）。
+除法统一经过 safe_ratio：分母为 0、缺失或为负时取默认值，不产生 inf/NaN。
+"""
+
+import numpy as np
+import pandas as pd
+
+# 计算日均观看量时视频年龄的下限（天），避免刚发布的视频被放大成极高的速度
+MIN_AGE_DAYS = 1.0
+
+
+def safe_ratio(numerator, denominator, default: float = 0.0) -> np.ndarray:
+    """
+    安全的逐元素除法
+
+    Args:
+        numerator: 分子（数组或 Series）
+        denominator: 分母（数组或 Series）
+        default: 分母不为正数或任一方缺失时的结果
+
+    Returns:
+        float64 数组
+    """
+    numerator = np.asarray(numerator, dtype="float64")
+    denominator = np.asarray(denominator, dtype="float64")
+    valid = (denominator > 0) & ~np.isnan(numerator)
+    out = np.full(np.broadcast(numerator, denominator).shape, default, dtype="float64")
+    return np.divide(numerator, denominator, out=out, where=valid)
+
+
+def engagement_rate(frame: pd.DataFrame) -> pd.Series:
+    """
+    互动率 = (点赞数 + 评论数) / 观看数
+
+    Args:
+        frame: 包含 view_count、like_count、comment_count 列的 DataFrame
+
+    Returns:
+        互动率（0-1），观看数为 0 时为 0
+    """
+    return pd.Series(
+        safe_ratio(frame["like_count"] + frame["comment_count"], frame["view_count"]),
+        index=frame.index,
+    )
+
+
+def video_age_days(frame: pd.DataFrame, now: pd.Timestamp = None) -> pd.Series:
+    """
+    视频发布至今的天数
+
+    Args:
+        frame: 包含 published_at（可缺失）和 added_at 列（datetime64[UTC]）的 DataFrame
+        now: 当前时间，默认使用系统时间
+
+    Returns:
+        天数（不小于 MIN_AGE_DAYS），发布和添加时间都缺失时为 NaN
+    """
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    published = frame["published_at"]
+    if "added_at" in frame:
+        published = published.fillna(frame["added_at"])
+    return ((now - published) / pd.Timedelta(days=1)).clip(lower=MIN_AGE_DAYS)
+
+
+def compute_video_metrics(frame: pd.DataFrame, now: pd.Timestamp = None) -> pd.DataFrame:
+    """
+    计算每个视频的派生指标
+
+    Args:
+        frame: get_videos_frame 格式的 DataFrame
+        now: 计算日均观看量使用的当前时间，默认使用系统时间
+
+    Returns:
+        与 frame 索引一致的 DataFrame，列为:
+            engagement_rate: 互动率（0-1）
+            like_ratio: 点赞数 / 观看数
+            comment_ratio: 评论数 / 观看数
+            views_per_day: 发布以来的日均观看量（缺少时间时为 0）
+            view_percentile: 观看量在所有视频中的百分位（0-1，越大越靠前）
+            engagement_percentile: 互动率的百分位
+    """
+    views = frame["view_count"]
+    metrics = pd.DataFrame({
+        "engagement_rate": safe_ratio(frame["like_count"] + frame["comment_count"], views),
+        "like_ratio": safe_ratio(frame["like_count"], views),
+        "comment_ratio": safe_ratio(frame["comment_count"], views),
+        "views_per_day": safe_ratio(views, video_age_days(frame, now)),
+    }, index=frame.index)
+    metrics["view_percentile"] = views.rank(pct=True, method="average")
+    metrics["engagement_percentile"] = metrics["engagement_rate"].rank(pct=True, method="average")
+    return metrics
+
+
+def with_video_metrics(frame: pd.DataFrame, now: pd.Timestamp = None) -> pd.DataFrame:
+    """
+    返回追加了 compute_video_metrics 各列的新 DataFrame
+
+    Args:
+        frame: get_videos_frame 格式的 DataFrame
+        now: 当前时间，默认使用系统时间
+
+    Returns:
+        原有列加上派生指标列
+    """
+    return frame.join(compute_video_metrics(frame, now))
+
@@ -0,0 +1,89 @@
+"""
+评论情感分析模块
+基于词典的情感打分：所有情感词编译为一个正则表达式，按 pandas Series 整批匹配
+
+- 英文词按单词边界匹配（"like" 不会命中 "unlike"）
+- 中文词按子串匹配，长词优先（"不好" 先于 "好" 匹配，不会被算作正面）
+- 每条评论的得分 = (正面词数 - 负面词数) / (正面词数 + 负面词数)，范围 [-1, 1]
+
+修改词典后需要递增 LEXICON_VERSION，数据库中旧版本的打分会由后台重新计算（见 enrichment 模块）。
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+LEXICON_VERSION = 1
+
+POSITIVE_WORDS = (
+    "good", "great", "love", "loved", "like", "liked", "amazing", "excellent", "awesome",
+    "nice", "best", "beautiful", "wonderful", "fantastic", "helpful", "useful", "perfect",
+    "brilliant", "enjoy", "enjoyed", "favorite", "thanks", "thank you", "recommend", "cool",
+    "好", "棒", "赞", "喜欢", "爱", "不错", "厉害", "优秀", "感谢", "谢谢", "支持",
+    "精彩", "好看", "好听", "完美", "有用", "推荐", "牛",
+)
+
+NEGATIVE_WORDS = (
+    "bad", "terrible", "awful", "worst", "dislike", "hate", "hated", "boring", "poor",
+    "waste", "useless", "disappointed", "disappointing", "annoying", "horrible", "stupid",
+    "sucks", "not good", "don't like", "do not like", "didn't like",
+    "差", "坏", "讨厌", "不好", "不喜欢", "垃圾", "无聊", "失望", "难看", "难听", "烂",
+    "恶心", "浪费", "没用", "不行", "不推荐",
+)
+
+# 匹配到的词（小写）-> 极性
+TERM_POLARITY: Dict[str, int] = {
+    **{word: 1 for word in POSITIVE_WORDS},
+    **{word: -1 for word in NEGATIVE_WORDS},
+}
+
+
+def _alternation(terms: Iterable[str]) -> str:
+    # 长词在前：同一位置优先匹配更长的词，"不好" 不会被拆成 "好"
+    return "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+
+
+# 英文词共用一组单词边界；中文没有空格分词，按子串匹配
+LEXICON_PATTERN = re.compile(
+    r"\b(?:" + _alternation(t for t in TERM_POLARITY if t.isascii()) + r")\b"
+    + "|" + _alternation(t for t in TERM_POLARITY if not t.isascii())
+)
+
+
+def score_comments(texts: Iterable[Optional[str]]) -> pd.DataFrame:
+    """
+    批量计算评论的情感得分
+
+    Args:
+        texts: 评论文本序列（Series、列表等），None 视为空文本
+
+    Returns:
+        与输入顺序一致的 DataFrame，列为:
+            positive: 正面词数
+            negative: 负面词数
+            score: 情感得分，范围 [-1, 1]，没有情感词时为 0
+            label: "positive" / "neutral" / "negative"
+    """
+    if isinstance(texts, pd.Series):
+        texts = texts.reset_index(drop=True)
+    else:
+        texts = pd.Series(list(texts), dtype="object")
+    lowered = texts.fillna("").astype(str).str.lower()
+
+    # 每条评论匹配到的词展开成一行，按所属评论汇总
+    polarity = lowered.str.findall(LEXICON_PATTERN).explode().map(TERM_POLARITY)
+    positive = (polarity > 0).groupby(level=0).sum().to_numpy(dtype="int64")
+    negative = (polarity < 0).groupby(level=0).sum().to_numpy(dtype="int64")
+
+    total = positive + negative
+    score = np.divide(positive - negative, total, out=np.zeros(len(texts)), where=total > 0)
+    label = np.select([score > 0, score < 0], ["positive", "negative"], default="neutral")
+
+    return pd.DataFrame({
+        "positive": positive,
+        "negative": negative,
+        "score": score,
+        "label": label,
+    })
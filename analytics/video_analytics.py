@@ -7,7 +7,7 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from typing import List, Tuple, Any
-from database import get_video_stats_history, get_video_info, get_latest_stats
+from database import get_video_stats_history, get_video_info, get_latest_stats, get_video_comparison
 
 
 def analyze_video_performance(video_id: str, days: int = 30) -> dict:
@@ -147,30 +147,34 @@ def create_performance_chart(video_id: str, days: int = 30) -> go.Figure:
     return fig
 
 
+# create_comparison_chart 支持的对比指标（get_video_comparison 返回的统计列）
+COMPARISON_METRICS = ("view_count", "like_count", "comment_count", "favorite_count")
+
+
 def create_comparison_chart(video_ids: List[str], metric: str = "view_count") -> go.Figure:
     """
     创建多视频对比图表
     
     Args:
         video_ids: 视频 ID 列表
-        metric: 对比指标 (view_count/like_count/comment_count)
+        metric: 对比指标 (view_count/like_count/comment_count/favorite_count)
     
     Returns:
         Plotly 图表对象
+    
+    Raises:
+        ValueError: 不支持的对比指标
     """
-    data = []
-    
-    for video_id in video_ids:
-        video_info = get_video_info(video_id)
-        if video_info:
-            latest_stats = get_latest_stats(video_id)
-            if latest_stats:
-                data.append({
-                    "title": video_info["title"][:30] + "...",
-                    "value": latest_stats.get(metric, 0)
-                })
-    
-    if not data:
+    if metric not in COMPARISON_METRICS:
+        raise ValueError(f"不支持的对比指标：{metric}，可选 {', '.join(COMPARISON_METRICS)}")
+    
+    comparison = get_video_comparison(video_ids)
+    
+    # 只对比已有统计数据的视频
+    df = pd.DataFrame(comparison)
+    df = df[df["fetch_time"].notna()]
+    
+    if df.empty:
         fig = go.Figure()
         fig.add_annotation(
             text="暂无数据",
@@ -180,7 +184,8 @@ def create_comparison_chart(video_ids: List[str], metric: str = "view_count") ->
         )
         return fig
     
-    df = pd.DataFrame(data)
+    titles = df["title"].str.slice(0, 30) + "..."
+    values = df[metric].fillna(0).astype("int64")
     
     # 根据指标选择颜色
     color_map = {
@@ -193,10 +198,10 @@ def create_comparison_chart(video_ids: List[str], metric: str = "view_count") ->
     # 创建柱状图
     fig = go.Figure(data=[
         go.Bar(
-            x=df["title"],
-            y=df["value"],
+            x=titles,
+            y=values,
             marker_color=color,
-            text=df["value"],
+            text=values,
             textposition="auto"
         )
     ])
@@ -205,7 +210,8 @@ def create_comparison_chart(video_ids: List[str], metric: str = "view_count") ->
     metric_name_map = {
         "view_count": "观看量",
         "like_count": "点赞量",
-        "comment_count": "评论量"
+        "comment_count": "评论量",
+        "favorite_count": "收藏量"
     }
     
     fig.update_layout(
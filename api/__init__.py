@@ -3,8 +3,39 @@ API 模块初始化文件
 """
 
 from .youtube_api import YouTubeAPI, extract_video_id
+from .refresh import refresh_videos
+from .comments import sync_video_comments, sync_comments
+from .quota import (
+    QuotaLimiter,
+    get_quota_limiter,
+    PRIORITY_STATS,
+    PRIORITY_DEFAULT,
+    PRIORITY_COMMENTS,
+)
+from .response_cache import ResponseCache, get_response_cache
+from .resilience import CircuitBreaker, get_circuit_breaker
+from .async_youtube_api import (
+    AsyncYouTubeAPI,
+    fetch_comments_for_videos,
+    fetch_video_info,
+)
 
 __all__ = [
     "YouTubeAPI",
     "extract_video_id",
+    "refresh_videos",
+    "sync_video_comments",
+    "sync_comments",
+    "QuotaLimiter",
+    "get_quota_limiter",
+    "PRIORITY_STATS",
+    "PRIORITY_DEFAULT",
+    "PRIORITY_COMMENTS",
+    "ResponseCache",
+    "get_response_cache",
+    "CircuitBreaker",
+    "get_circuit_breaker",
+    "AsyncYouTubeAPI",
+    "fetch_comments_for_videos",
+    "fetch_video_info",
 ]
@@ -0,0 +1,425 @@
+"""
+异步 YouTube API 客户端
+与 YouTubeAPI 使用相同的解析逻辑和返回格式，通过 asyncio 并发等待网络响应
+"""
+
+import asyncio
+import os
+import threading
+from typing import AsyncIterator, Dict, List, Optional
+
+import streamlit as st
+
+from config import Config
+from .session import get_shared_session
+from .quota import QuotaLimiter, get_quota_limiter
+from .response_cache import ResponseCache, get_response_cache
+from .resilience import CircuitBreaker, get_circuit_breaker, describe_failure, backoff_delay
+from .youtube_api import (
+    chunk_video_ids,
+    parse_video_item,
+    parse_comment_item,
+    parse_channel_item,
+)
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+
+class AsyncYouTubeAPI:
+    """
+    异步 YouTube API 客户端
+
+    安装了 httpx 时使用 httpx.AsyncClient；否则在线程池中执行共享的
+    requests 会话，同样可以让多个请求的网络等待重叠。
+    并发请求数由信号量限制。
+
+    使用示例:
+        async with AsyncYouTubeAPI(api_key) as api:
+            comments = await api.get_comments_for_videos(video_ids)
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = None,
+                 max_concurrency: int = None, quota: QuotaLimiter = None,
+                 wait_for_quota: bool = False, cache: ResponseCache = None,
+                 use_cache: bool = True, max_retries: int = None,
+                 breaker: CircuitBreaker = None):
+        """
+        初始化异步客户端
+
+        Args:
+            api_key: YouTube Data API 密钥
+            base_url: API 根地址（测试时可指向本地模拟服务器）
+            max_concurrency: 同时进行的最大请求数，默认使用 Config.API_ASYNC_CONCURRENCY
+            quota: 配额限速器，默认使用进程内共享的限速器
+            wait_for_quota: 配额紧张时是否等待，否则直接跳过请求
+            cache: 响应缓存，默认使用进程内共享的缓存
+            use_cache: 是否启用响应缓存
+            max_retries: 失败后的最大重试次数，默认使用 Config.API_MAX_RETRIES
+            breaker: 熔断器，默认使用该 API 根地址共享的熔断器
+        """
+        self.api_key = api_key or os.environ.get("YOUTUBE_API_KEY")
+        self.base_url = (base_url or Config.YOUTUBE_API_BASE_URL).rstrip("/")
+        self.max_concurrency = max_concurrency or Config.API_ASYNC_CONCURRENCY
+        self.quota = quota or get_quota_limiter()
+        self.wait_for_quota = wait_for_quota
+        self.cache = (cache or get_response_cache()) if use_cache else None
+        self.max_retries = Config.API_MAX_RETRIES if max_retries is None else max_retries
+        self.breaker = breaker or get_circuit_breaker(self.base_url)
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client = None
+
+        if not self.api_key:
+            st.warning("未设置 YouTube API 密钥，部分功能可能无法使用")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self) -> None:
+        """关闭底层 HTTP 客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 信号量需要在事件循环内创建
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=Config.API_REQUEST_TIMEOUT,
+                headers={"Accept-Encoding": "gzip, deflate"},
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    async def _make_request(self, endpoint: str, params: dict,
+                            priority: int = None) -> Optional[dict]:
+        """
+        发送 API 请求
+
+        Args:
+            endpoint: API 端点
+            params: 请求参数
+            priority: 配额优先级，默认按端点决定
+
+        Returns:
+            响应数据字典，失败时返回 None
+        """
+        cache_key = self.cache.make_key(endpoint, params) if self.cache else None
+        cached = await asyncio.to_thread(self.cache.get, cache_key) if self.cache else None
+
+        # 缓存仍新鲜时直接返回，不发请求也不消耗配额
+        if cached and cached["fresh"]:
+            return cached["data"]
+
+        if not self.breaker.allow():
+            st.warning(f"YouTube API 暂时不可用，约 {self.breaker.retry_in():.0f} 秒后重试，已跳过 {endpoint} 请求")
+            return None
+
+        params = dict(params, key=self.api_key)
+        url = f"{self.base_url}/{endpoint}"
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else None
+
+        for attempt in range(self.max_retries + 1):
+            # 申请配额可能需要等待或写账本，放到线程中避免阻塞事件循环；每次尝试都会消耗配额
+            granted = await asyncio.to_thread(
+                self.quota.acquire, endpoint, priority, self.wait_for_quota
+            )
+            if not granted:
+                st.warning(f"今日 API 配额不足，已跳过 {endpoint} 请求")
+                return None
+
+            async with self._get_semaphore():
+                try:
+                    if HAS_HTTPX:
+                        response = await self._get_client().get(url, params=params, headers=headers)
+                    else:
+                        response = await asyncio.to_thread(
+                            get_shared_session().get, url, params=params, headers=headers,
+                            timeout=Config.API_REQUEST_TIMEOUT
+                        )
+                except Exception as e:
+                    response = None
+                    retryable, error, retry_after = describe_failure(exc=e)
+
+            if response is not None:
+                if response.status_code == 304 and cached:
+                    self.breaker.record_success()
+                    await asyncio.to_thread(self.cache.mark_revalidated, cache_key, cached)
+                    return cached["data"]
+
+                if 200 <= response.status_code < 300:
+                    try:
+                        data = response.json()
+                    except ValueError as e:
+                        self.breaker.record_success()
+                        st.error(f"API 请求失败: {str(e)}")
+                        return None
+
+                    self.breaker.record_success()
+                    if self.cache:
+                        etag = response.headers.get("ETag") or data.get("etag")
+                        await asyncio.to_thread(
+                            self.cache.put, cache_key, endpoint, etag, response.content
+                        )
+                    return data
+
+                retryable, error, retry_after = describe_failure(response=response)
+
+            if not retryable:
+                # 配额耗尽、密钥无效等错误重试也不会成功，服务本身是可用的
+                self.breaker.record_success()
+                st.error(f"API 请求失败: {error}")
+                return None
+
+            self.breaker.record_failure()
+            if attempt == self.max_retries or not self.breaker.allow():
+                break
+            # 退避等待在信号量之外进行，不占用并发名额
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+        st.error(f"API 请求失败（已重试 {attempt} 次）: {error}")
+        return None
+
+    async def get_video_info(self, video_ids: List[str]) -> List[Dict]:
+        """
+        获取视频信息
+
+        Args:
+            video_ids: 视频 ID 列表（最多 50 个）
+
+        Returns:
+            视频信息列表
+        """
+        if not self.api_key:
+            return []
+
+        params = {
+            "part": "snippet,contentDetails,statistics",
+            "id": ",".join(video_ids)
+        }
+
+        data = await self._make_request("videos", params)
+
+        if data and "items" in data:
+            return [parse_video_item(item) for item in data["items"]]
+
+        return []
+
+    async def get_video_info_batched(self, video_ids: List[str]) -> List[Dict]:
+        """
+        批量获取任意数量视频的信息（按 50 个一组并发请求）
+
+        Args:
+            video_ids: 视频 ID 列表
+
+        Returns:
+            视频信息列表
+        """
+        results = await asyncio.gather(
+            *(self.get_video_info(chunk) for chunk in chunk_video_ids(video_ids))
+        )
+        return [video for chunk_videos in results for video in chunk_videos]
+
+    async def iter_comment_pages(self, video_id: str, page_token: str = None,
+                                 order: str = "time", page_size: int = 100) -> AsyncIterator[Dict]:
+        """
+        逐页获取视频评论，返回格式与 YouTubeAPI.iter_comment_pages 相同
+
+        同一视频的分页依赖上一页的 nextPageToken，只能顺序获取；
+        多个视频之间可以并发，见 get_comments_for_videos
+
+        Args:
+            video_id: 视频 ID
+            page_token: 起始页的 pageToken，None 表示从第一页开始
+            order: 排序方式，"time"（最新在前）或 "relevance"
+            page_size: 每页评论数（最多 100）
+
+        Yields:
+            {"comments", "page_token", "next_page_token"}
+        """
+        if not self.api_key:
+            return
+
+        while True:
+            params = {
+                "part": "snippet",
+                "videoId": video_id,
+                "maxResults": min(100, page_size),
+                "order": order
+            }
+
+            if page_token:
+                params["pageToken"] = page_token
+
+            data = await self._make_request("commentThreads", params)
+
+            if not data or "items" not in data:
+                return
+
+            next_page_token = data.get("nextPageToken")
+            yield {
+                "comments": [parse_comment_item(item) for item in data["items"]],
+                "page_token": page_token,
+                "next_page_token": next_page_token,
+            }
+
+            if not next_page_token:
+                return
+            page_token = next_page_token
+
+    async def get_video_comments(self, video_id: str, max_results: int = 100,
+                                 order: str = "relevance") -> List[Dict]:
+        """
+        获取视频评论
+
+        Args:
+            video_id: 视频 ID
+            max_results: 最大结果数
+            order: 排序方式，"relevance" 或 "time"
+
+        Returns:
+            评论列表
+        """
+        comments = []
+
+        pages = self.iter_comment_pages(video_id, order=order, page_size=min(100, max_results))
+        try:
+            async for page in pages:
+                comments.extend(page["comments"])
+                if len(comments) >= max_results:
+                    break
+        finally:
+            await pages.aclose()
+
+        return comments[:max_results]
+
+    async def get_comments_for_videos(self, video_ids: List[str],
+                                      max_results: int = 100) -> Dict[str, List[Dict]]:
+        """
+        并发获取多个视频的评论
+
+        Args:
+            video_ids: 视频 ID 列表
+            max_results: 每个视频的最大评论数
+
+        Returns:
+            {video_id: 评论列表}
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        results = await asyncio.gather(
+            *(self.get_video_comments(video_id, max_results) for video_id in video_ids)
+        )
+        return dict(zip(video_ids, results))
+
+    async def get_channel_info(self, channel_id: str) -> Optional[Dict]:
+        """
+        获取频道信息
+
+        Args:
+            channel_id: 频道 ID
+
+        Returns:
+            频道信息字典，失败时返回 None
+        """
+        if not self.api_key:
+            return None
+
+        params = {
+            "part": "snippet,statistics",
+            "id": channel_id
+        }
+
+        data = await self._make_request("channels", params)
+
+        if data and data.get("items"):
+            return parse_channel_item(data["items"][0])
+
+        return None
+
+
+def _run_sync(coro):
+    """
+    在同步代码中运行协程
+
+    Streamlit 脚本线程中通常没有正在运行的事件循环，直接 asyncio.run；
+    如果当前线程已有事件循环，则在新线程中运行
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+def fetch_comments_for_videos(video_ids: List[str], max_results: int = 100,
+                              api_key: str = None, base_url: str = None,
+                              max_concurrency: int = None) -> Dict[str, List[Dict]]:
+    """
+    同步接口：并发获取多个视频的评论（供 Streamlit 页面调用）
+
+    Args:
+        video_ids: 视频 ID 列表
+        max_results: 每个视频的最大评论数
+        api_key: YouTube Data API 密钥
+        base_url: API 根地址
+        max_concurrency: 最大并发请求数
+
+    Returns:
+        {video_id: 评论列表}
+    """
+    async def run():
+        async with AsyncYouTubeAPI(api_key, base_url, max_concurrency) as api:
+            return await api.get_comments_for_videos(video_ids, max_results)
+
+    return _run_sync(run())
+
+
+def fetch_video_info(video_ids: List[str], api_key: str = None, base_url: str = None,
+                     max_concurrency: int = None) -> List[Dict]:
+    """
+    同步接口：并发获取任意数量视频的信息（供 Streamlit 页面调用）
+
+    Args:
+        video_ids: 视频 ID 列表
+        api_key: YouTube Data API 密钥
+        base_url: API 根地址
+        max_concurrency: 最大并发请求数
+
+    Returns:
+        视频信息列表
+    """
+    async def run():
+        async with AsyncYouTubeAPI(api_key, base_url, max_concurrency) as api:
+            return await api.get_video_info_batched(video_ids)
+
+    return _run_sync(run())
@@ -0,0 +1,129 @@
+"""
+评论同步模块
+按时间倒序逐页抓取视频评论并分批写入数据库，支持增量同步和中断续传
+
+- 首次同步抓取全部评论；之后只抓取比上次同步最新评论更新的评论，遇到已同步过的评论即停止
+- 每写入一批就保存下一页的 pageToken，抓取中断（请求失败、达到页数上限）后下次从断点继续
+- 同时在内存中的评论不超过一批，评论总数再多内存占用也保持不变
+- 每批写入后立即计算分词、语言和情感得分（见 analytics.enrichment）
+
+已同步评论的点赞数变化不会被增量同步更新，需要时可先 reset_comment_sync_state 再全量同步。
+"""
+
+from typing import Any, Dict, Iterable, List
+
+from config import Config
+from database import bulk_save_comments, get_comment_sync_state, save_comment_sync_state
+from analytics.enrichment import enrich_comment_batch
+from .response_cache import ResponseCache
+from .youtube_api import YouTubeAPI
+
+
+def sync_video_comments(video_id: str, api: YouTubeAPI = None, max_pages: int = None,
+                        batch_size: int = None, restart: bool = False) -> Dict[str, Any]:
+    """
+    同步一个视频的评论
+
+    Args:
+        video_id: 视频 ID
+        api: YouTube API 客户端，默认新建一个用 ETag 重新验证的客户端
+             （按 TTL 直接返回缓存会拿到几分钟前的第一页，漏掉期间的新评论）
+        max_pages: 本次最多抓取的页数，默认使用 Config.COMMENT_SYNC_MAX_PAGES
+        batch_size: 每批写入的评论数，默认使用 Config.COMMENT_SYNC_BATCH_SIZE
+        restart: 忽略未完成抓取的断点，从第一页开始
+
+    Returns:
+        同步结果字典:
+            video_id: 视频 ID
+            pages: 抓取的页数
+            fetched: 抓取到的新评论数
+            saved: 写入成功的评论数
+            resumed: 是否从上次的断点继续
+            complete: 是否已同步到最新（为 False 时下次从断点继续）
+    """
+    api = api or YouTubeAPI(cache=ResponseCache(ttl=0))
+    max_pages = max_pages or Config.COMMENT_SYNC_MAX_PAGES
+    batch_size = batch_size or Config.COMMENT_SYNC_BATCH_SIZE
+
+    state = get_comment_sync_state(video_id) or {}
+    high_water = state.get("high_water")
+    page_token = None if restart else state.get("page_token")
+    pending = state.get("pending_high_water") if page_token else None
+
+    result = {
+        "video_id": video_id,
+        "pages": 0,
+        "fetched": 0,
+        "saved": 0,
+        "resumed": page_token is not None,
+        "complete": False,
+    }
+    batch: List[Dict] = []
+    unsaved = 0
+
+    def flush(completed: bool = False) -> None:
+        nonlocal unsaved
+        if batch:
+            report = bulk_save_comments(batch, video_id=video_id, chunk_size=batch_size)
+            result["saved"] += report["succeeded"]
+            enrich_comment_batch(batch)
+            batch.clear()
+        save_comment_sync_state(video_id, page_token, high_water, pending, unsaved, completed)
+        unsaved = 0
+
+    for page in api.iter_comment_pages(video_id, page_token=page_token, order="time"):
+        result["pages"] += 1
+        comments = page["comments"]
+
+        # 按时间倒序抓取：出现早于高水位的评论，说明之后的都已同步过。
+        # 与高水位同一秒发布的评论可能上次还没抓到，重新写入一次（按 comment_id 去重）
+        caught_up = False
+        if high_water:
+            new_comments = [c for c in comments if (c.get("published_at") or "") >= high_water]
+            caught_up = len(new_comments) < len(comments)
+            comments = new_comments
+
+        if comments:
+            newest = max(c.get("published_at") or "" for c in comments)
+            pending = max(pending or "", newest) or None
+            batch.extend(comments)
+            result["fetched"] += len(comments)
+            unsaved += len(comments)
+
+        page_token = page["next_page_token"]
+        if caught_up or not page_token:
+            result["complete"] = True
+            break
+
+        if len(batch) >= batch_size:
+            flush()
+
+        if result["pages"] >= max_pages:
+            break
+
+    if result["complete"]:
+        high_water = max(high_water or "", pending or "") or None
+        page_token = pending = None
+
+    flush(completed=result["complete"])
+    return result
+
+
+def sync_comments(video_ids: Iterable[str], api: YouTubeAPI = None,
+                  max_pages: int = None) -> List[Dict[str, Any]]:
+    """
+    依次同步多个视频的评论
+
+    Args:
+        video_ids: 视频 ID 序列
+        api: YouTube API 客户端，默认新建一个用 ETag 重新验证的客户端
+        max_pages: 每个视频本次最多抓取的页数
+
+    Returns:
+        每个视频的同步结果，见 sync_video_comments
+    """
+    api = api or YouTubeAPI(cache=ResponseCache(ttl=0))
+    return [
+        sync_video_comments(video_id, api=api, max_pages=max_pages)
+        for video_id in dict.fromkeys(video_ids)
+    ]
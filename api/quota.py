@@ -0,0 +1,246 @@
+"""
+API 配额管理模块
+按端点计算 YouTube Data API 配额消耗，按优先级分配每日配额，并在配额紧张时限速
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from config import Config
+from database import record_quota_usage, get_quota_usage
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # 没有时区数据时退化为固定的太平洋标准时间
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+# 请求优先级（数值越小越优先）
+PRIORITY_STATS = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_COMMENTS = 2
+
+# 各端点的默认优先级：统计刷新优先于评论抓取
+ENDPOINT_PRIORITIES = {
+    "videos": PRIORITY_STATS,
+    "search": PRIORITY_DEFAULT,
+    "channels": PRIORITY_DEFAULT,
+    "commentThreads": PRIORITY_COMMENTS,
+}
+
+# 与账本重新同步的间隔（秒），用于感知其他进程（如后台轮询器）的消耗
+LEDGER_SYNC_INTERVAL = 60
+
+
+class QuotaLimiter:
+    """
+    配额限速器
+
+    - 每个端点按 Config.QUOTA_COSTS 计费，消耗持久化到 api_quota_ledger 表
+    - 每个优先级最多只能用到每日配额的一定比例，为高优先级请求预留配额
+    - 剩余配额低于 Config.QUOTA_PACING_THRESHOLD 时启用令牌桶，
+      按“剩余配额 / 距重置的秒数”的速率发放令牌，让请求放慢而不是提前耗尽
+    """
+
+    def __init__(self, daily_quota: int = None):
+        """
+        初始化配额限速器
+
+        Args:
+            daily_quota: 每日配额，默认使用 Config.YOUTUBE_DAILY_QUOTA
+        """
+        self.daily_quota = daily_quota or Config.YOUTUBE_DAILY_QUOTA
+
+        self._lock = threading.Lock()
+        self._date: Optional[str] = None
+        self._used = 0
+        self._by_endpoint: Dict[str, Dict[str, int]] = {}
+        # 已计入内存、还没有写入账本的消耗（在锁外写账本期间），与账本同步时加回
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._synced_at = 0.0
+        self._tokens = float(Config.QUOTA_BURST)
+        self._refilled_at = time.monotonic()
+
+    @staticmethod
+    def quota_date(now: datetime = None) -> str:
+        """获取当前配额日期（太平洋时间）"""
+        now = now or datetime.now(QUOTA_TIMEZONE)
+        return now.astimezone(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def seconds_until_reset(now: datetime = None) -> float:
+        """距离下次配额重置（太平洋时间零点）的秒数"""
+        now = (now or datetime.now(QUOTA_TIMEZONE)).astimezone(QUOTA_TIMEZONE)
+        tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return max((tomorrow - now).total_seconds(), 1.0)
+
+    @staticmethod
+    def cost(endpoint: str) -> int:
+        """获取端点每次请求的配额单位"""
+        return Config.QUOTA_COSTS.get(endpoint, 1)
+
+    def _sync(self) -> None:
+        """跨天时清零；定期从账本读取当天消耗"""
+        today = self.quota_date()
+        if today == self._date and time.monotonic() - self._synced_at < LEDGER_SYNC_INTERVAL:
+            return
+
+        if today != self._date:
+            self._date = today
+            self._used = 0
+            self._by_endpoint = {}
+            self._pending = {}
+
+        try:
+            usage = get_quota_usage(today)
+        except Exception:
+            # 账本不可用时只在内存中计数
+            usage = None
+
+        if usage is not None:
+            usage = {endpoint: dict(item) for endpoint, item in usage.items()}
+            for endpoint, item in self._pending.items():
+                merged = usage.setdefault(endpoint, {"units": 0, "calls": 0})
+                merged["units"] += item["units"]
+                merged["calls"] += item["calls"]
+            self._by_endpoint = usage
+            self._used = sum(item["units"] for item in usage.values())
+        self._synced_at = time.monotonic()
+
+    def _remaining(self) -> int:
+        return max(self.daily_quota - self._used, 0)
+
+    def _is_tight(self) -> bool:
+        return self._remaining() < self.daily_quota * Config.QUOTA_PACING_THRESHOLD
+
+    def _refill_rate(self) -> float:
+        """令牌发放速率（配额单位/秒）"""
+        return self._remaining() / self.seconds_until_reset()
+
+    def _refill(self, cost: int) -> None:
+        now = time.monotonic()
+        capacity = max(Config.QUOTA_BURST, cost)
+        self._tokens = min(capacity, self._tokens + (now - self._refilled_at) * self._refill_rate())
+        self._refilled_at = now
+
+    def _consume(self, endpoint: str, cost: int) -> None:
+        self._used += cost
+        for counts in (self._by_endpoint, self._pending):
+            item = counts.setdefault(endpoint, {"units": 0, "calls": 0})
+            item["units"] += cost
+            item["calls"] += 1
+
+    def _settle(self, endpoint: str, cost: int) -> None:
+        """一次消耗已写入账本，不再作为待写入加回"""
+        item = self._pending.get(endpoint)
+        if item is None:
+            return
+        item["units"] -= cost
+        item["calls"] -= 1
+        if item["calls"] <= 0:
+            del self._pending[endpoint]
+
+    def acquire(self, endpoint: str, priority: int = None, wait: bool = False,
+                max_wait: float = None) -> bool:
+        """
+        为一次请求申请配额
+
+        Args:
+            endpoint: API 端点
+            priority: 请求优先级，默认按端点决定
+            wait: 配额紧张时是否等待令牌（后台任务使用），否则直接返回 False
+            max_wait: 最长等待秒数，None 表示一直等到有令牌
+
+        Returns:
+            是否获得配额
+        """
+        cost = self.cost(endpoint)
+        if priority is None:
+            priority = ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_DEFAULT)
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+
+        while True:
+            with self._lock:
+                self._sync()
+
+                limit = self.daily_quota * Config.QUOTA_PRIORITY_LIMITS.get(priority, 1.0)
+                if self._used + cost > limit:
+                    return False
+
+                quota_date = self._date
+
+                if not self._is_tight():
+                    self._consume(endpoint, cost)
+                    break
+
+                self._refill(cost)
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    self._consume(endpoint, cost)
+                    break
+
+                delay = (cost - self._tokens) / max(self._refill_rate(), 1e-6)
+
+            if not wait:
+                return False
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return False
+            # 分段睡眠，期间重新检查配额（可能已跨天重置）
+            time.sleep(min(delay, 60))
+
+        # 写账本在锁外进行；写入完成前这次消耗记在 _pending 中，期间的同步不会丢掉它
+        try:
+            record_quota_usage(quota_date, endpoint, cost)
+        except Exception:
+            # 写入失败时保留为待写入，当天内仍然计入
+            return True
+
+        with self._lock:
+            if self._date == quota_date:
+                self._settle(endpoint, cost)
+
+        return True
+
+    def status(self) -> Dict[str, object]:
+        """
+        获取当天配额使用情况
+
+        Returns:
+            配额日期、已用、剩余、各端点明细、距重置秒数以及是否处于限速状态
+        """
+        with self._lock:
+            self._sync()
+            return {
+                "quota_date": self._date,
+                "daily_quota": self.daily_quota,
+                "used": self._used,
+                "remaining": self._remaining(),
+                "by_endpoint": {k: dict(v) for k, v in self._by_endpoint.items()},
+                "seconds_until_reset": self.seconds_until_reset(),
+                "pacing": self._is_tight(),
+            }
+
+
+_limiter: Optional[QuotaLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_quota_limiter() -> QuotaLimiter:
+    """
+    获取进程内共享的配额限速器
+
+    Returns:
+        QuotaLimiter 实例
+    """
+    global _limiter
+
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = QuotaLimiter()
+    return _limiter
@@ -0,0 +1,68 @@
+"""
+视频批量刷新模块
+将视频 ID 列表分批从 YouTube API 获取，并批量写入数据库
+"""
+
+from typing import Any, Dict, Iterable
+
+from database import bulk_add_videos, bulk_save_stats, bulk_save_tags
+from .response_cache import ResponseCache
+from .youtube_api import YouTubeAPI
+
+
+def refresh_videos(video_ids: Iterable[str], api: YouTubeAPI = None,
+                   max_workers: int = None, save_info: bool = True) -> Dict[str, Any]:
+    """
+    刷新一批视频的信息和统计数据
+
+    按 50 个 ID 一组并发请求 videos.list，然后将结果
+    一次性批量写入 videos / video_stats / tags 表
+
+    Args:
+        video_ids: 视频 ID 序列
+        api: YouTube API 客户端，默认新建一个用 ETag 重新验证的客户端；
+             不能使用按 TTL 直接返回缓存的响应缓存，否则会把旧的统计数据再存一次
+        max_workers: 并发请求数，默认使用 Config.API_MAX_WORKERS
+        save_info: 是否同时更新视频信息和标签（仅刷新统计时可设为 False）
+
+    Returns:
+        刷新结果字典:
+            requested: 请求的视频数
+            fetched: 获取到的视频信息列表
+            missing: 未获取到的视频 ID（已删除、私有或请求失败）
+            videos / stats / tags: 各个批量写入的结果
+
+    Raises:
+        ValueError: api 的响应缓存 TTL 大于 0
+    """
+    # 统计需要最新值：响应缓存不走 TTL 捷径，每次都用 ETag 重新验证
+    api = api or YouTubeAPI(cache=ResponseCache(ttl=0))
+    if api.cache is not None and api.cache.ttl > 0:
+        raise ValueError("refresh_videos 需要 ResponseCache(ttl=0) 或 use_cache=False 的客户端，"
+                         f"当前响应缓存 TTL 为 {api.cache.ttl} 秒")
+    requested = list(dict.fromkeys(vid for vid in video_ids if vid))
+
+    fetched = api.get_video_info_batched(requested, max_workers=max_workers)
+    fetched_ids = {video["video_id"] for video in fetched}
+
+    result = {
+        "requested": len(requested),
+        "fetched": fetched,
+        "missing": [vid for vid in requested if vid not in fetched_ids],
+        "videos": None,
+        "stats": None,
+        "tags": None,
+    }
+
+    if not fetched:
+        return result
+
+    if save_info:
+        result["videos"] = bulk_add_videos(fetched)
+        result["tags"] = bulk_save_tags(
+            (video["video_id"], video["tags"]) for video in fetched if video.get("tags")
+        )
+
+    result["stats"] = bulk_save_stats(fetched)
+
+    return result
@@ -0,0 +1,279 @@
+"""
+API 容错模块
+对失败请求分类、计算带抖动的指数退避时间，并用熔断器在服务故障期间暂停请求
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from config import Config
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+# 可以重试的 HTTP 状态码（其余 4xx 重试也不会成功）
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# 403 中属于短时限流、可以重试的原因；quotaExceeded、keyInvalid 等不重试
+RETRYABLE_ERROR_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+
+
+def get_error_reason(response) -> str:
+    """
+    读取 YouTube API 错误响应中的原因（如 quotaExceeded）
+
+    Args:
+        response: HTTP 响应（requests 或 httpx）
+
+    Returns:
+        错误原因，无法解析时返回 HTTP 状态说明
+    """
+    # requests 使用 reason，httpx 使用 reason_phrase
+    fallback = getattr(response, "reason", None) or getattr(response, "reason_phrase", "")
+
+    try:
+        error = response.json().get("error", {})
+        errors = error.get("errors") or [{}]
+        return errors[0].get("reason") or error.get("message") or fallback
+    except Exception:
+        return fallback
+
+
+def is_retryable_response(status_code: int, reason: str) -> bool:
+    """
+    判断失败的响应是否值得重试
+
+    Args:
+        status_code: HTTP 状态码
+        reason: 错误原因
+
+    Returns:
+        5xx、429、408 以及 403 限流返回 True；配额耗尽、密钥无效等返回 False
+    """
+    if status_code in RETRYABLE_STATUS_CODES:
+        return True
+    return status_code == 403 and reason in RETRYABLE_ERROR_REASONS
+
+
+def is_retryable_exception(exc: Exception) -> bool:
+    """
+    判断请求异常是否值得重试（超时和连接错误）
+
+    Args:
+        exc: 请求抛出的异常
+
+    Returns:
+        是否可以重试
+    """
+    if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if HAS_HTTPX and isinstance(exc, (httpx.TimeoutException, httpx.NetworkError)):
+        return True
+    return False
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数或 HTTP 日期
+
+    Returns:
+        需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """
+    计算第 attempt 次重试前的等待时间
+
+    使用“完全抖动”的指数退避：在 [0, min(上限, 基数 * 2^attempt)] 中随机取值，
+    避免并发请求在同一时刻集中重试。服务端给出 Retry-After 时以其为下限。
+
+    Args:
+        attempt: 已失败的次数（从 0 开始）
+        retry_after: 服务端要求的等待秒数
+
+    Returns:
+        等待秒数
+    """
+    ceiling = min(Config.API_RETRY_MAX_DELAY, Config.API_RETRY_BASE_DELAY * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, Config.API_RETRY_AFTER_MAX))
+    return delay
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    - 关闭：正常放行请求，连续失败达到阈值后打开
+    - 打开：直接拒绝请求，等待 recovery_timeout 秒后进入半开
+    - 半开：只放行一个探测请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, recovery_timeout: float = None):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 连续失败多少次后打开，默认使用 Config.API_CIRCUIT_FAILURE_THRESHOLD
+            recovery_timeout: 打开后多少秒尝试恢复，默认使用 Config.API_CIRCUIT_RECOVERY_TIMEOUT
+        """
+        self.failure_threshold = failure_threshold or Config.API_CIRCUIT_FAILURE_THRESHOLD
+        self.recovery_timeout = recovery_timeout or Config.API_CIRCUIT_RECOVERY_TIMEOUT
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态"""
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        判断是否放行一次请求
+
+        Returns:
+            是否可以发送请求
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            if self._state == self.OPEN and now - self._opened_at >= self.recovery_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_started_at = None
+
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.HALF_OPEN:
+                # 探测请求没有回报结果（如被配额拦下）时，超时后允许新的探测
+                if self._probe_started_at is None or now - self._probe_started_at >= self.recovery_timeout:
+                    self._probe_started_at = now
+                    return True
+
+            self._rejected += 1
+            return False
+
+    def retry_in(self) -> float:
+        """距离下次允许探测的秒数"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def record_success(self) -> None:
+        """记录一次成功（服务端正常响应）"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        """记录一次可重试的失败（5xx、限流、超时等）"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started_at = None
+
+    def stats(self) -> Dict[str, object]:
+        """
+        获取熔断器状态
+
+        Returns:
+            当前状态、连续失败次数、打开次数和被拒绝的请求数
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(base_url: str = None) -> CircuitBreaker:
+    """
+    获取某个 API 根地址共享的熔断器
+
+    Args:
+        base_url: API 根地址，默认使用 Config.YOUTUBE_API_BASE_URL
+
+    Returns:
+        CircuitBreaker 实例
+    """
+    key = (base_url or Config.YOUTUBE_API_BASE_URL).rstrip("/")
+
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker()
+        return _breakers[key]
+
+
+def describe_failure(exc: Exception = None, response=None) -> Tuple[bool, str, Optional[float]]:
+    """
+    归纳一次失败的请求
+
+    Args:
+        exc: 请求抛出的异常
+        response: 失败的 HTTP 响应
+
+    Returns:
+        (是否可以重试, 错误说明, Retry-After 秒数)
+    """
+    if exc is not None:
+        return is_retryable_exception(exc), str(exc), None
+
+    reason = get_error_reason(response)
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    return (
+        is_retryable_response(response.status_code, reason),
+        f"HTTP {response.status_code} {reason}",
+        retry_after,
+    )
@@ -0,0 +1,260 @@
+"""
+API 响应缓存模块
+按端点和参数缓存 YouTube API 响应及其 ETag，支持条件请求（If-None-Match）
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from config import Config
+from database.pool import get_pool
+
+
+class ResponseCache:
+    """
+    基于 SQLite 的 API 响应缓存
+
+    - 在 TTL 内命中的请求直接返回缓存，不发起网络请求也不消耗配额
+    - 超过 TTL 的条目携带 If-None-Match 重新验证，304 时复用缓存内容
+    - 超过最长保留时间的条目会被清理；总大小超限时按最近访问时间（LRU）淘汰
+    """
+
+    def __init__(self, db_path: str = None, ttl: int = None, max_age: int = None,
+                 max_bytes: int = None):
+        """
+        初始化响应缓存
+
+        Args:
+            db_path: 缓存数据库文件路径，默认使用 Config.API_CACHE_PATH
+            ttl: 缓存视为新鲜的秒数
+            max_age: 条目最长保留秒数（用于条件请求重新验证）
+            max_bytes: 缓存内容总大小上限（压缩后字节数）
+        """
+        self.db_path = db_path or os.path.join(os.getcwd(), Config.API_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else Config.API_CACHE_TTL
+        self.max_age = max_age if max_age is not None else Config.API_CACHE_MAX_AGE
+        self.max_bytes = max_bytes if max_bytes is not None else Config.API_CACHE_MAX_BYTES
+
+        self._pool = get_pool(self.db_path)
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_saved": 0,
+        }
+
+        with self._pool.writer() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS api_response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    etag TEXT,
+                    body BLOB NOT NULL,
+                    raw_size INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_api_response_cache_accessed
+                ON api_response_cache (accessed_at)
+            """)
+            conn.commit()
+            self._total_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM api_response_cache"
+            ).fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict) -> str:
+        """
+        生成缓存键（不包含 API 密钥）
+
+        Args:
+            endpoint: API 端点
+            params: 请求参数
+
+        Returns:
+            缓存键字符串
+        """
+        cacheable = {k: v for k, v in params.items() if k != "key"}
+        return f"{endpoint}?{json.dumps(cacheable, sort_keys=True, ensure_ascii=False)}"
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._metrics[name] += amount
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        查找缓存条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            {"etag", "data", "fresh", "raw_size"}，不存在或已过期时返回 None
+        """
+        with self._pool.reader() as conn:
+            row = conn.execute("""
+                SELECT etag, body, raw_size, fetched_at
+                FROM api_response_cache
+                WHERE cache_key = ?
+            """, (key,)).fetchone()
+
+        now = time.time()
+        if row is None or now - row["fetched_at"] > self.max_age:
+            self._count("misses")
+            return None
+
+        fresh = now - row["fetched_at"] <= self.ttl
+        if fresh:
+            self._count("hits")
+            self._count("bytes_saved", row["raw_size"])
+            self._touch(key, now)
+
+        return {
+            "etag": row["etag"],
+            "data": json.loads(zlib.decompress(row["body"])),
+            "fresh": fresh,
+            "raw_size": row["raw_size"],
+        }
+
+    def _touch(self, key: str, now: float, refetched: bool = False) -> None:
+        with self._pool.writer() as conn:
+            if refetched:
+                conn.execute("""
+                    UPDATE api_response_cache SET accessed_at = ?, fetched_at = ?
+                    WHERE cache_key = ?
+                """, (now, now, key))
+            else:
+                conn.execute(
+                    "UPDATE api_response_cache SET accessed_at = ? WHERE cache_key = ?",
+                    (now, key),
+                )
+            conn.commit()
+
+    def mark_revalidated(self, key: str, entry: Dict) -> None:
+        """
+        记录一次 304 Not Modified，刷新条目的获取时间
+
+        Args:
+            key: 缓存键
+            entry: get 返回的缓存条目
+        """
+        self._count("revalidated")
+        self._count("bytes_saved", entry["raw_size"])
+        self._touch(key, time.time(), refetched=True)
+
+    def put(self, key: str, endpoint: str, etag: Optional[str], raw_body: bytes) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            endpoint: API 端点
+            etag: 响应的 ETag
+            raw_body: 未压缩的响应 JSON 字节
+        """
+        body = zlib.compress(raw_body)
+        now = time.time()
+
+        with self._pool.writer() as conn:
+            old = conn.execute(
+                "SELECT size FROM api_response_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            conn.execute("""
+                INSERT OR REPLACE INTO api_response_cache
+                (cache_key, endpoint, etag, body, raw_size, size, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, endpoint, etag, body, len(raw_body), len(body), now, now))
+            conn.commit()
+
+            with self._lock:
+                self._total_bytes += len(body) - (old["size"] if old else 0)
+                self._metrics["stores"] += 1
+                over_limit = self._total_bytes > self.max_bytes
+
+            if over_limit:
+                self._evict(conn)
+
+    def _evict(self, conn) -> None:
+        """清理过期条目，并按最近访问时间淘汰直到总大小低于上限的 90%"""
+        cutoff = time.time() - self.max_age
+        expired = conn.execute(
+            "DELETE FROM api_response_cache WHERE fetched_at < ?", (cutoff,)
+        ).rowcount
+
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM api_response_cache"
+        ).fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+
+        if total > target:
+            rows = conn.execute(
+                "SELECT cache_key, size FROM api_response_cache ORDER BY accessed_at ASC"
+            ).fetchall()
+            victims = []
+            for row in rows:
+                if total <= target:
+                    break
+                victims.append((row["cache_key"],))
+                total -= row["size"]
+            conn.executemany("DELETE FROM api_response_cache WHERE cache_key = ?", victims)
+            evicted = len(victims)
+
+        conn.commit()
+
+        with self._lock:
+            self._total_bytes = total
+            self._metrics["evictions"] += expired + evicted
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._pool.writer() as conn:
+            conn.execute("DELETE FROM api_response_cache")
+            conn.commit()
+        with self._lock:
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, object]:
+        """
+        获取缓存指标
+
+        Returns:
+            命中、304 重新验证、未命中次数，命中率，节省的字节数和当前缓存大小
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["total_bytes"] = self._total_bytes
+
+        lookups = metrics["hits"] + metrics["revalidated"] + metrics["misses"]
+        metrics["hit_ratio"] = (metrics["hits"] + metrics["revalidated"]) / lookups if lookups else 0.0
+        return metrics
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    获取进程内共享的响应缓存
+
+    Returns:
+        ResponseCache 实例
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,102 @@
+"""
+HTTP 会话模块
+提供进程内共享的 requests.Session，复用 TCP/TLS 连接
+"""
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+
+def create_session(pool_connections: int = None, pool_maxsize: int = None,
+                   pool_block: bool = True) -> requests.Session:
+    """
+    创建带连接池的 HTTP 会话
+
+    Args:
+        pool_connections: 缓存连接池的主机数量
+        pool_maxsize: 每个主机保留的最大连接数
+        pool_block: 连接数达到上限时是否等待空闲连接（即限制每个主机的并发连接）
+
+    Returns:
+        配置好的 requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or Config.HTTP_POOL_MAXSIZE,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+        "User-Agent": "youtube-dashboard/1.0 (gzip)",
+    })
+    return session
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    """
+    获取进程内共享的 HTTP 会话
+
+    Streamlit 每次重跑都会新建 YouTubeAPI 实例，
+    共享会话可以让这些实例复用同一组长连接
+
+    Returns:
+        共享的 requests.Session
+    """
+    global _shared_session
+
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = create_session()
+    return _shared_session
+
+
+def get_session_pool_stats(session: requests.Session, url: str) -> Dict[str, object]:
+    """
+    获取会话连接池统计信息
+
+    Args:
+        session: HTTP 会话
+        url: 用于选择适配器的 URL
+
+    Returns:
+        连接池配置以及每个主机的连接/请求计数
+    """
+    adapter = session.get_adapter(url)
+    pool_manager = adapter.poolmanager
+
+    hosts = {}
+    for key in list(pool_manager.pools.keys()):
+        pool = pool_manager.pools.get(key)
+        if pool is None:
+            continue
+        connections = pool.num_connections
+        requests_sent = pool.num_requests
+        # 空闲队列中预先填充了 None 占位，只统计真实连接
+        idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+        hosts[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+            "connections_created": connections,
+            "requests": requests_sent,
+            "idle_connections": idle,
+            "reuse_ratio": 1 - connections / requests_sent if requests_sent else 0.0,
+        }
+
+    return {
+        "pool_connections": adapter._pool_connections,
+        "pool_maxsize": adapter._pool_maxsize,
+        "pool_block": adapter._pool_block,
+        "hosts": hosts,
+    }
@@ -3,51 +3,252 @@ YouTube API 封装模块
 封装 YouTube Data API v3 的调用
 """
 
+import threading
+import time
 import requests
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Tuple
 import streamlit as st
 import os
 
+from config import Config
+from .session import get_shared_session, get_session_pool_stats
+from .quota import QuotaLimiter, get_quota_limiter
+from .response_cache import ResponseCache, get_response_cache
+from .resilience import CircuitBreaker, get_circuit_breaker, describe_failure, backoff_delay
+
+# videos.list 每次请求最多接受的视频 ID 数
+MAX_IDS_PER_REQUEST = 50
+
+# 线程池中的请求没有 Streamlit 的 ScriptRunContext，st.warning/st.error 会被丢弃；
+# 这些线程把提示暂存在这里，由调用线程统一显示
+_deferred_messages = threading.local()
+
+
+def chunk_video_ids(video_ids: List[str]) -> List[List[str]]:
+    """
+    去重并按 videos.list 的上限将视频 ID 分组
+    
+    Args:
+        video_ids: 视频 ID 列表
+    
+    Returns:
+        每组最多 50 个 ID 的分组列表
+    """
+    unique_ids = list(dict.fromkeys(vid for vid in video_ids if vid))
+    return [
+        unique_ids[i:i + MAX_IDS_PER_REQUEST]
+        for i in range(0, len(unique_ids), MAX_IDS_PER_REQUEST)
+    ]
+
+
+def parse_video_item(item: dict) -> Dict:
+    """
+    解析 videos.list 返回的单个视频
+    
+    Args:
+        item: API 返回的视频条目
+    
+    Returns:
+        视频信息字典
+    """
+    return {
+        "video_id": item["id"],
+        "title": item["snippet"]["title"],
+        "channel_id": item["snippet"]["channelId"],
+        "channel_title": item["snippet"]["channelTitle"],
+        "thumbnail_url": item["snippet"]["thumbnails"]["high"]["url"],
+        "published_at": item["snippet"]["publishedAt"],
+        "duration": item["contentDetails"]["duration"],
+        "category_id": item["snippet"]["categoryId"],
+        "tags": item["snippet"].get("tags", []),
+        "description": item["snippet"]["description"],
+        "view_count": int(item["statistics"].get("viewCount", 0)),
+        "like_count": int(item["statistics"].get("likeCount", 0)),
+        "comment_count": int(item["statistics"].get("commentCount", 0)),
+        "favorite_count": int(item["statistics"].get("favoriteCount", 0))
+    }
+
+
+def parse_comment_item(item: dict) -> Dict:
+    """
+    解析 commentThreads.list 返回的单条顶层评论
+    
+    Args:
+        item: API 返回的评论串条目
+    
+    Returns:
+        评论信息字典
+    """
+    comment = item["snippet"]["topLevelComment"]["snippet"]
+    return {
+        "comment_id": item["id"],
+        "author_name": comment["authorDisplayName"],
+        "author_channel_url": comment.get("authorChannelUrl", ""),
+        "like_count": comment.get("likeCount", 0),
+        "text": comment["textDisplay"],
+        "published_at": comment["publishedAt"],
+        "updated_at": comment.get("updatedAt", comment["publishedAt"])
+    }
+
+
+def parse_channel_item(item: dict) -> Dict:
+    """
+    解析 channels.list 返回的单个频道
+    
+    Args:
+        item: API 返回的频道条目
+    
+    Returns:
+        频道信息字典
+    """
+    return {
+        "channel_id": item["id"],
+        "title": item["snippet"]["title"],
+        "description": item["snippet"]["description"],
+        "thumbnail_url": item["snippet"]["thumbnails"]["high"]["url"],
+        "subscriber_count": int(item["statistics"].get("subscriberCount", 0)),
+        "video_count": int(item["statistics"].get("videoCount", 0)),
+        "view_count": int(item["statistics"].get("viewCount", 0))
+    }
+
 
 class YouTubeAPI:
     """YouTube API 客户端"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, base_url: str = None,
+                 session: requests.Session = None, quota: QuotaLimiter = None,
+                 wait_for_quota: bool = False, cache: ResponseCache = None,
+                 use_cache: bool = True, max_retries: int = None,
+                 breaker: CircuitBreaker = None):
         """
         初始化 YouTube API 客户端
         
         Args:
             api_key: YouTube Data API 密钥
+            base_url: API 根地址（测试时可指向本地模拟服务器）
+            session: HTTP 会话，默认使用进程内共享的长连接会话
+            quota: 配额限速器，默认使用进程内共享的限速器
+            wait_for_quota: 配额紧张时是否等待（后台定时任务使用），否则直接跳过请求
+            cache: 响应缓存，默认使用进程内共享的缓存
+            use_cache: 是否启用响应缓存
+            max_retries: 失败后的最大重试次数，默认使用 Config.API_MAX_RETRIES
+            breaker: 熔断器，默认使用该 API 根地址共享的熔断器
         """
         self.api_key = api_key or os.environ.get("YOUTUBE_API_KEY")
-        self.base_url = "https://www.googleapis.com/youtube/v3"
+        self.base_url = (base_url or Config.YOUTUBE_API_BASE_URL).rstrip("/")
+        self.session = session or get_shared_session()
+        self.quota = quota or get_quota_limiter()
+        self.wait_for_quota = wait_for_quota
+        self.cache = (cache or get_response_cache()) if use_cache else None
+        self.max_retries = Config.API_MAX_RETRIES if max_retries is None else max_retries
+        self.breaker = breaker or get_circuit_breaker(self.base_url)
         
         if not self.api_key:
             st.warning("未设置 YouTube API 密钥，部分功能可能无法使用")
     
-    def _make_request(self, endpoint: str, params: dict) -> Optional[dict]:
+    def _notify(self, level: str, message: str) -> None:
+        """
+        显示请求失败提示；在 get_video_info_batched 的工作线程中暂存，由调用线程显示
+        
+        Args:
+            level: "warning" 或 "error"
+            message: 提示内容
+        """
+        deferred = getattr(_deferred_messages, "items", None)
+        if deferred is not None:
+            deferred.append((level, message))
+        else:
+            getattr(st, level)(message)
+    
+    def _make_request(self, endpoint: str, params: dict, priority: int = None) -> Optional[dict]:
         """
         发送 API 请求
         
         Args:
             endpoint: API 端点
             params: 请求参数
+            priority: 配额优先级，默认按端点决定
         
         Returns:
             响应数据字典，失败时返回 None
         """
-        try:
-            params["key"] = self.api_key
-            url = f"{self.base_url}/{endpoint}"
+        cache_key = self.cache.make_key(endpoint, params) if self.cache else None
+        cached = self.cache.get(cache_key) if self.cache else None
+        
+        # 缓存仍新鲜时直接返回，不发请求也不消耗配额
+        if cached and cached["fresh"]:
+            return cached["data"]
+        
+        if not self.breaker.allow():
+            self._notify("warning", f"YouTube API 暂时不可用，约 {self.breaker.retry_in():.0f} 秒后重试，已跳过 {endpoint} 请求")
+            return None
+        
+        params["key"] = self.api_key
+        url = f"{self.base_url}/{endpoint}"
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else None
+        
+        for attempt in range(self.max_retries + 1):
+            # 每次尝试都会消耗配额
+            if not self.quota.acquire(endpoint, priority, wait=self.wait_for_quota):
+                self._notify("warning", f"今日 API 配额不足，已跳过 {endpoint} 请求")
+                return None
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            try:
+                response = self.session.get(url, params=params, headers=headers,
+                                            timeout=Config.API_REQUEST_TIMEOUT)
+                
+                if response.status_code == 304 and cached:
+                    self.breaker.record_success()
+                    self.cache.mark_revalidated(cache_key, cached)
+                    return cached["data"]
+                
+                if response.ok:
+                    data = response.json()
+                    self.breaker.record_success()
+                    
+                    if self.cache:
+                        etag = response.headers.get("ETag") or data.get("etag")
+                        self.cache.put(cache_key, endpoint, etag, response.content)
+                    
+                    return data
+                
+                retryable, error, retry_after = describe_failure(response=response)
+                
+            except requests.exceptions.RequestException as e:
+                retryable, error, retry_after = describe_failure(exc=e)
             
-            return response.json()
+            if not retryable:
+                # 配额耗尽、密钥无效等错误重试也不会成功，服务本身是可用的
+                self.breaker.record_success()
+                self._notify("error", f"API 请求失败: {error}")
+                return None
             
-        except requests.exceptions.RequestException as e:
-            st.error(f"API 请求失败: {str(e)}")
-            return None
+            self.breaker.record_failure()
+            if attempt == self.max_retries or not self.breaker.allow():
+                break
+            time.sleep(backoff_delay(attempt, retry_after))
+        
+        self._notify("error", f"API 请求失败（已重试 {attempt} 次）: {error}")
+        return None
+    
+    def get_cache_stats(self) -> Dict:
+        """
+        获取响应缓存统计信息
+        
+        Returns:
+            命中次数、304 次数、命中率和节省的字节数，未启用缓存时返回空字典
+        """
+        return self.cache.stats() if self.cache else {}
+    
+    def get_pool_stats(self) -> Dict:
+        """
+        获取 HTTP 连接池统计信息
+        
+        Returns:
+            连接池配置以及每个主机已创建的连接数、请求数和连接复用率
+        """
+        return get_session_pool_stats(self.session, self.base_url)
     
     def get_video_info(self, video_ids: List[str]) -> List[Dict]:
         """
@@ -70,28 +271,54 @@ class YouTubeAPI:
         data = self._make_request("videos", params)
         
         if data and "items" in data:
-            videos = []
-            for item in data["items"]:
-                videos.append({
-                    "video_id": item["id"],
-                    "title": item["snippet"]["title"],
-                    "channel_id": item["snippet"]["channelId"],
-                    "channel_title": item["snippet"]["channelTitle"],
-                    "thumbnail_url": item["snippet"]["thumbnails"]["high"]["url"],
-                    "published_at": item["snippet"]["publishedAt"],
-                    "duration": item["contentDetails"]["duration"],
-                    "category_id": item["snippet"]["categoryId"],
-                    "tags": item["snippet"].get("tags", []),
-                    "description": item["snippet"]["description"],
-                    "view_count": int(item["statistics"].get("viewCount", 0)),
-                    "like_count": int(item["statistics"].get("likeCount", 0)),
-                    "comment_count": int(item["statistics"].get("commentCount", 0)),
-                    "favorite_count": int(item["statistics"].get("favoriteCount", 0))
-                })
-            return videos
+            return [parse_video_item(item) for item in data["items"]]
         
         return []
     
+    def get_video_info_batched(self, video_ids: List[str], max_workers: int = None) -> List[Dict]:
+        """
+        批量获取任意数量视频的信息
+        
+        将 ID 列表按 50 个一组拆分为多个 videos.list 请求，
+        并通过有界线程池并发执行。每组请求只消耗 1 个配额单位。
+        
+        Args:
+            video_ids: 视频 ID 列表（数量不限，重复 ID 会被去除）
+            max_workers: 并发请求数，默认使用 Config.API_MAX_WORKERS
+        
+        Returns:
+            视频信息列表（顺序与分组顺序一致）
+        """
+        if not self.api_key:
+            return []
+        
+        chunks = chunk_video_ids(video_ids)
+        
+        if not chunks:
+            return []
+        
+        if len(chunks) == 1:
+            return self.get_video_info(chunks[0])
+        
+        workers = min(max_workers or Config.API_MAX_WORKERS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self._get_video_info_deferred, chunks))
+        
+        # 在调用线程中显示各组请求的失败提示，相同的提示只显示一次
+        messages = [message for _, chunk_messages in results for message in chunk_messages]
+        for level, message in dict.fromkeys(messages):
+            self._notify(level, message)
+        
+        return [video for chunk_videos, _ in results for video in chunk_videos]
+    
+    def _get_video_info_deferred(self, video_ids: List[str]) -> Tuple[List[Dict], List[Tuple[str, str]]]:
+        """在工作线程中执行 get_video_info，返回 (视频信息列表, 暂存的失败提示列表)"""
+        _deferred_messages.items = []
+        try:
+            return self.get_video_info(video_ids), _deferred_messages.items
+        finally:
+            _deferred_messages.items = None
+    
     def search_videos(self, query: str, max_results: int = 10) -> List[Dict]:
         """
         搜索视频
@@ -121,53 +348,73 @@ class YouTubeAPI:
         
         return []
     
-    def get_video_comments(self, video_id: str, max_results: int = 100) -> List[Dict]:
+    def iter_comment_pages(self, video_id: str, page_token: str = None,
+                           order: str = "time", page_size: int = 100) -> Iterator[Dict]:
         """
-        获取视频评论
+        逐页获取视频评论
+        
+        每次只请求一页，调用方处理完一页再取下一页，内存占用与评论总数无关。
+        请求失败时停止迭代，调用方可以用最后一页的 next_page_token 续传。
         
         Args:
             video_id: 视频 ID
-            max_results: 最大结果数
+            page_token: 起始页的 pageToken，None 表示从第一页开始
+            order: 排序方式，"time"（最新在前）或 "relevance"
+            page_size: 每页评论数（最多 100）
         
-        Returns:
-            评论列表
+        Yields:
+            {"comments": 本页评论列表, "page_token": 本页使用的 pageToken,
+             "next_page_token": 下一页的 pageToken，最后一页为 None}
         """
         if not self.api_key:
-            return []
-        
-        comments = []
-        next_page_token = None
+            return
         
-        while len(comments) < max_results:
+        while True:
             params = {
                 "part": "snippet",
                 "videoId": video_id,
-                "maxResults": min(100, max_results - len(comments)),
-                "order": "relevance"
+                "maxResults": min(100, page_size),
+                "order": order
             }
             
-            if next_page_token:
-                params["pageToken"] = next_page_token
+            if page_token:
+                params["pageToken"] = page_token
             
             data = self._make_request("commentThreads", params)
             
             if not data or "items" not in data:
-                break
-            
-            for item in data["items"]:
-                comment = item["snippet"]["topLevelComment"]["snippet"]
-                comments.append({
-                    "comment_id": item["id"],
-                    "author_name": comment["authorDisplayName"],
-                    "author_channel_url": comment.get("authorChannelUrl", ""),
-                    "like_count": comment.get("likeCount", 0),
-                    "text": comment["textDisplay"],
-                    "published_at": comment["publishedAt"],
-                    "updated_at": comment.get("updatedAt", comment["publishedAt"])
-                })
+                return
             
             next_page_token = data.get("nextPageToken")
+            yield {
+                "comments": [parse_comment_item(item) for item in data["items"]],
+                "page_token": page_token,
+                "next_page_token": next_page_token,
+            }
+            
             if not next_page_token:
+                return
+            page_token = next_page_token
+    
+    def get_video_comments(self, video_id: str, max_results: int = 100,
+                           order: str = "relevance") -> List[Dict]:
+        """
+        获取视频评论
+        
+        Args:
+            video_id: 视频 ID
+            max_results: 最大结果数
+            order: 排序方式，"relevance" 或 "time"
+        
+        Returns:
+            评论列表
+        """
+        comments = []
+        
+        for page in self.iter_comment_pages(video_id, order=order,
+                                            page_size=min(100, max_results)):
+            comments.extend(page["comments"])
+            if len(comments) >= max_results:
                 break
         
         return comments[:max_results]
@@ -192,17 +439,8 @@ class YouTubeAPI:
         
         data = self._make_request("channels", params)
         
-        if data and "items" in data:
-            item = data["items"][0]
-            return {
-                "channel_id": item["id"],
-                "title": item["snippet"]["title"],
-                "description": item["snippet"]["description"],
-                "thumbnail_url": item["snippet"]["thumbnails"]["high"]["url"],
-                "subscriber_count": int(item["statistics"].get("subscriberCount", 0)),
-                "video_count": int(item["statistics"].get("videoCount", 0)),
-                "view_count": int(item["statistics"].get("viewCount", 0))
-            }
+        if data and data.get("items"):
+            return parse_channel_item(data["items"][0])
         
         return None
 
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+索引基准测试
+
+生成大规模模拟数据（默认 1000 万条统计记录），对比建索引前后常用查询的耗时，
+并检查建索引后每个查询的执行计划确实使用了受管索引。
+
+用法:
+    python benchmark_indexes.py                 # 1000 万条统计记录
+    python benchmark_indexes.py --rows 200000   # 快速验证
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from database import (
+    init_database,
+    get_db_connection,
+    get_videos,
+    get_latest_stats,
+    get_comments,
+    get_all_tags,
+)
+from database.connection import MANAGED_INDEXES
+
+# 旧版 get_videos 使用的窗口函数写法，作为对照
+OLD_GET_VIDEOS_SQL = """
+    SELECT
+        v.video_id, v.title, v.channel_title, v.added_at,
+        vs.view_count, vs.like_count, vs.comment_count
+    FROM videos v
+    LEFT JOIN (
+        SELECT video_id, view_count, like_count, comment_count,
+               ROW_NUMBER() OVER (PARTITION BY video_id ORDER BY fetch_time DESC) as rn
+        FROM video_stats
+    ) vs ON v.video_id = vs.video_id AND vs.rn = 1
+    ORDER BY v.added_at DESC
+"""
+
+# 旧版 get_latest_stats 直接在历史统计上排序取第一条
+OLD_GET_LATEST_STATS_SQL = """
+    SELECT * FROM video_stats
+    WHERE video_id = ?
+    ORDER BY fetch_time DESC
+    LIMIT 1
+"""
+
+
+def populate(rows: int, videos: int, comments: int) -> list:
+    """写入模拟的视频、统计、评论和标签数据，返回视频 ID 列表"""
+    video_ids = [f"vid{i:07d}" for i in range(videos)]
+    start = datetime(2024, 1, 1)
+    per_video = max(rows // videos, 1)
+
+    def stats_rows():
+        # 按时间顺序交错写入各视频的统计，与定时刷新写入的顺序一致
+        for step in range(per_video):
+            fetch_time = (start + timedelta(minutes=10 * step)).strftime("%Y-%m-%d %H:%M:%S")
+            for index, video_id in enumerate(video_ids):
+                views = step * 100 + index
+                yield (video_id, views, views // 20, views // 200, fetch_time)
+
+    def comment_rows():
+        for i in range(comments):
+            yield (random.choice(video_ids), f"c{i}", "author", random.randint(0, 5000), "text")
+
+    def tag_rows():
+        for video_id in video_ids:
+            for tag in random.sample(range(200), 5):
+                yield (video_id, f"tag{tag}")
+
+    with get_db_connection(write=True) as conn:
+        conn.executemany(
+            "INSERT INTO videos (video_id, title, channel_title) VALUES (?, ?, ?)",
+            [(video_id, f"Video {video_id}", "Channel") for video_id in video_ids],
+        )
+        conn.executemany(
+            "INSERT INTO video_stats (video_id, view_count, like_count, comment_count, fetch_time) "
+            "VALUES (?, ?, ?, ?, ?)",
+            stats_rows(),
+        )
+        conn.executemany(
+            "INSERT INTO comments (video_id, comment_id, author_name, like_count, text) "
+            "VALUES (?, ?, ?, ?, ?)",
+            comment_rows(),
+        )
+        conn.executemany("INSERT INTO tags (video_id, tag) VALUES (?, ?)", tag_rows())
+        conn.commit()
+
+    return video_ids
+
+
+def drop_managed_indexes() -> None:
+    """删除受管索引，得到建索引前的基线"""
+    with get_db_connection(write=True) as conn:
+        for name in MANAGED_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+        conn.commit()
+
+
+def timed(func, repeat: int) -> float:
+    """运行 repeat 次，返回耗时中位数（毫秒）"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def capture_sql(func) -> list:
+    """记录函数执行的 SQL（参数已展开）"""
+    statements = []
+    with get_db_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            func()
+        finally:
+            conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+def query_plan(sql: str) -> list:
+    """获取 SQL 的执行计划"""
+    with get_db_connection() as conn:
+        return [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="受管索引基准测试")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="统计记录数")
+    parser.add_argument("--videos", type=int, default=1000, help="视频数")
+    parser.add_argument("--comments", type=int, default=500_000, help="评论数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询重复次数")
+    parser.add_argument("--skip-baseline", action="store_true", help="跳过无索引的基线测试")
+    parser.add_argument("--keep", action="store_true", help="保留生成的数据库")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="yt_index_bench_")
+    os.chdir(workdir)
+    print(f"工作目录: {workdir}")
+
+    init_database()
+    drop_managed_indexes()
+
+    started = time.perf_counter()
+    video_ids = populate(args.rows, args.videos, args.comments)
+    print(f"写入 {args.rows:,} 条统计记录，用时 {time.perf_counter() - started:.1f} 秒\n")
+
+    sample_id = random.choice(video_ids)
+    # 使用 __wrapped__ 绕过查询缓存，每次都真正查询数据库
+    queries = {
+        "get_videos": lambda: get_videos.__wrapped__(),
+        "get_latest_stats": lambda: get_latest_stats.__wrapped__(sample_id),
+        "get_comments": lambda: get_comments.__wrapped__(sample_id, 100),
+        "get_all_tags": lambda: get_all_tags.__wrapped__(50),
+    }
+    # 每个查询在执行计划中应当使用的索引
+    expected = {
+        "get_videos": "video_latest_stats",
+        "get_latest_stats": "video_latest_stats",
+        "get_comments": "idx_comments_video_likes",
+        "get_all_tags": "idx_tags_tag_video",
+    }
+
+    baseline = {}
+    if not args.skip_baseline:
+        print("== 建索引前 ==")
+        # 最新统计已由 video_latest_stats 维护，基线使用旧版直接查询历史统计的写法
+        with get_db_connection() as conn:
+            baseline["get_videos"] = timed(lambda: conn.execute(OLD_GET_VIDEOS_SQL).fetchall(), 1)
+            baseline["get_latest_stats"] = timed(
+                lambda: conn.execute(OLD_GET_LATEST_STATS_SQL, (sample_id,)).fetchall(),
+                min(args.repeat, 3),
+            )
+        print(f"  get_videos (ROW_NUMBER)  {baseline['get_videos']:10.1f} ms")
+        print(f"  get_latest_stats (排序)  {baseline['get_latest_stats']:10.1f} ms")
+        for name in ("get_comments", "get_all_tags"):
+            baseline[name] = timed(queries[name], min(args.repeat, 3))
+            print(f"  {name:<24} {baseline[name]:10.1f} ms")
+        print()
+
+    started = time.perf_counter()
+    init_database()
+    print(f"创建受管索引，用时 {time.perf_counter() - started:.1f} 秒\n")
+
+    print("== 建索引后 ==")
+    failures = []
+    for name, func in queries.items():
+        elapsed = timed(func, args.repeat)
+        speedup = f"  ({baseline[name] / elapsed:,.0f}x)" if name in baseline and elapsed else ""
+        print(f"  {name:<24} {elapsed:10.1f} ms{speedup}")
+
+        for sql in capture_sql(func):
+            plan = query_plan(sql)
+            for detail in plan:
+                print(f"      {detail}")
+            if not any(expected[name] in detail for detail in plan):
+                failures.append(f"{name} 未使用 {expected[name]}")
+            # get_videos 需要按添加时间列出全部视频，videos 表本身的扫描是预期的
+            full_scans = [d for d in plan if d.startswith("SCAN") and "INDEX" not in d
+                          and not d.startswith("SCAN v")]
+            if full_scans:
+                failures.append(f"{name} 存在全表扫描: {full_scans}")
+
+    if not args.keep:
+        os.chdir(os.path.dirname(workdir))
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ 所有查询都使用了受管索引")
+
+
+if __name__ == "__main__":
+    main()
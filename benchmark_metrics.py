@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+视频指标计算基准测试
+
+生成模拟的视频数据，对比逐行调用 utils.calculate_engagement_rate 与
+analytics.metrics 按整列计算互动率的耗时，检查两者结果一致，
+并给出一次算出全部指标（含两次百分位排名）的耗时。
+
+用法:
+    python benchmark_metrics.py                        # 1 万、10 万、100 万行
+    python benchmark_metrics.py --sizes 1000000 --skip-loop
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.metrics import compute_video_metrics, engagement_rate
+from utils import calculate_engagement_rate
+
+
+def synthetic_videos(rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    生成 get_videos_frame 格式的模拟数据（约 1% 的视频没有观看量）
+
+    Args:
+        rows: 行数
+        seed: 随机种子
+
+    Returns:
+        DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    views = rng.lognormal(8, 2.5, rows).astype("int64")
+    views[rng.random(rows) < 0.01] = 0
+    now = pd.Timestamp.now(tz="UTC")
+    published = now - pd.to_timedelta(rng.integers(0, 2000 * 86400, rows), unit="s")
+    return pd.DataFrame({
+        "video_id": [f"v{i:07d}" for i in range(rows)],
+        "channel_title": rng.integers(0, max(rows // 50, 1), rows).astype(str),
+        "added_at": published,
+        "published_at": published,
+        "view_count": views,
+        "like_count": (views * rng.uniform(0, 0.08, rows)).astype("int64"),
+        "comment_count": (views * rng.uniform(0, 0.01, rows)).astype("int64"),
+    })
+
+
+def loop_engagement(frame: pd.DataFrame) -> list:
+    """旧写法：逐行调用 calculate_engagement_rate"""
+    return [
+        calculate_engagement_rate(likes or 0, comments or 0, views or 0)
+        for views, likes, comments in zip(frame["view_count"].tolist(), frame["like_count"].tolist(),
+                                          frame["comment_count"].tolist())
+    ]
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频指标计算基准测试")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="测试的行数，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    parser.add_argument("--skip-loop", action="store_true", help="跳过逐行计算的对照组")
+    args = parser.parse_args()
+
+    print(f"{'行数':>10}{'逐行互动率':>14}{'整列互动率':>14}{'加速比':>10}{'全部指标':>12}")
+    for rows in [int(value) for value in args.sizes.split(",") if value]:
+        frame = synthetic_videos(rows)
+        vectorized = best_of(lambda: engagement_rate(frame), args.repeat)
+        full = best_of(lambda: compute_video_metrics(frame), args.repeat)
+
+        if args.skip_loop:
+            loop = None
+        else:
+            loop = best_of(lambda: loop_engagement(frame), args.repeat)
+            expected = np.asarray(loop_engagement(frame))
+            actual = engagement_rate(frame).to_numpy()
+            if not np.allclose(expected, actual):
+                print(f"❌ {rows:,} 行: 逐行与整列计算的互动率不一致")
+                return 1
+
+        loop_text = f"{loop * 1000:>12.1f}ms" if loop is not None else f"{'-':>14}"
+        speedup = f"{loop / vectorized:>9.1f}x" if loop is not None else f"{'-':>10}"
+        print(f"{rows:>12,}{loop_text}{vectorized * 1000:>12.1f}ms{speedup}{full * 1000:>10.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
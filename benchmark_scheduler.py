@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+轮询调度基准测试
+
+在统计历史上回放固定间隔和自适应调度两类策略，对比采样误差与消耗的配额。
+默认回放数据库中已记录的历史；也可以生成模拟的视频增长曲线
+（爆款、新发布、长尾、停止增长）进行回放。
+
+用法:
+    python benchmark_scheduler.py                          # 回放 youtube_dashboard.db 中的历史
+    python benchmark_scheduler.py --synthetic 500 --days 3 # 回放模拟数据
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from scheduler.simulation import VideoHistory, load_histories, compare_policies
+
+
+def synthetic_histories(videos: int, days: float, resolution: int = 300, seed: int = 42) -> list:
+    """
+    生成模拟的观看量曲线
+
+    Args:
+        videos: 视频数
+        days: 时长（天）
+        resolution: 记录间隔（秒）
+        seed: 随机种子
+
+    Returns:
+        VideoHistory 列表
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    steps = int(days * 86400 / resolution) + 1
+    times = [start + timedelta(seconds=resolution * i) for i in range(steps)]
+    histories = []
+
+    for index in range(videos):
+        kind = rng.choices(["viral", "new", "evergreen", "dormant"], weights=[2, 8, 40, 50])[0]
+        base = rng.randint(1_000, 2_000_000)
+
+        if kind == "viral":
+            # 回放期间某个时刻开始爆发，S 型增长
+            peak = rng.uniform(0.2, 0.8) * days * 24
+            total = rng.randint(200_000, 5_000_000)
+            width = rng.uniform(2, 8)
+            curve = lambda h: total / (1 + math.exp(-(h - peak) / width))
+            published = start + timedelta(hours=max(peak - 3 * width, 0))
+        elif kind == "new":
+            # 回放开始时刚发布，增长逐渐放缓
+            total = rng.randint(5_000, 300_000)
+            tau = rng.uniform(6, 48)
+            curve = lambda h: total * (1 - math.exp(-h / tau))
+            published = start
+            base = 0
+        elif kind == "evergreen":
+            rate = rng.uniform(1, 60)
+            curve = lambda h: rate * h
+            published = start - timedelta(days=rng.randint(30, 1000))
+        else:
+            curve = lambda h: 0
+            published = start - timedelta(days=rng.randint(30, 2000))
+
+        views = [base + int(curve((t - start).total_seconds() / 3600)) for t in times]
+        histories.append(VideoHistory(f"{kind}{index:05d}", times, views, published))
+
+    return histories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="轮询调度基准测试")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="使用 N 个模拟视频代替数据库中的历史")
+    parser.add_argument("--days", type=float, default=3, help="模拟数据的时长（天）")
+    parser.add_argument("--tick", type=float, default=300, help="回放的时间步长（秒）")
+    parser.add_argument("--budgets", default="100,300,1000", help="自适应调度的每日配额预算，逗号分隔")
+    parser.add_argument("--fixed", default="5,60,1440", help="固定间隔策略的刷新间隔（分钟），逗号分隔")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        histories = synthetic_histories(args.synthetic, args.days)
+        print(f"模拟数据: {len(histories)} 个视频，{args.days:g} 天")
+    else:
+        histories = load_histories()
+        print(f"数据库历史: {len(histories)} 个视频")
+    if not histories:
+        print("❌ 没有可回放的统计历史（每个视频至少需要 2 条快照），可使用 --synthetic")
+        sys.exit(1)
+
+    budgets = [float(value) for value in args.budgets.split(",") if value]
+    if any(budget <= 0 for budget in budgets):
+        parser.error("--budgets 中的预算必须大于 0")
+    fixed = [float(value) * 60 for value in args.fixed.split(",") if value]
+
+    started = time.perf_counter()
+    results = compare_policies(histories, budgets, fixed, tick=args.tick)
+    print(f"回放用时 {time.perf_counter() - started:.1f} 秒\n")
+
+    print(f"{'策略':<20}{'刷新次数':>10}{'配额/天':>10}{'平均绝对误差':>14}{'平均相对误差':>12}{'P95 相对误差':>12}")
+    for result in results:
+        print(f"{result['policy']:<20}{result['refreshes']:>12,}{result['quota_per_day']:>12,.0f}"
+              f"{result['mae']:>16,.0f}{result['mape']:>14.2f}%{result['p95']:>12.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,24 @@ class Config:
     
     # YouTube API
     YOUTUBE_API_KEY = os.environ.get("YOUTUBE_API_KEY", "")
+    YOUTUBE_API_BASE_URL = "https://www.googleapis.com/youtube/v3"
     
     # 数据库
     DB_PATH = "youtube_dashboard.db"
+    DB_BUSY_TIMEOUT = 5000   # 等待数据库锁的超时时间（毫秒）
+    DB_PRAGMAS = {
+        "synchronous": "NORMAL",    # WAL 模式下 NORMAL 已足够安全
+        "cache_size": -64000,       # 页缓存约 64MB（负数表示 KB）
+        "mmap_size": 268435456,     # 内存映射 256MB
+        "temp_store": "MEMORY",     # 临时表和排序放在内存中
+    }
+    BULK_CHUNK_SIZE = 500    # 批量写入时每次 executemany 的行数
+    
+    # 统计数据保留策略（小时/天汇总由触发器实时维护）
+    STATS_RAW_RETENTION_DAYS = 14       # 原始快照保留天数（每个视频的最新快照始终保留）
+    STATS_HOURLY_RETENTION_DAYS = 90    # 小时汇总保留天数，天汇总永久保留
+    STATS_HOURLY_MAX_RANGE_DAYS = 3     # 查询范围不超过该天数时按小时返回历史
+    STATS_PRUNE_BATCH_SIZE = 10000      # 清理时每批删除的行数
     
     # 分页
     ITEMS_PER_PAGE = 20
@@ -31,10 +46,72 @@ class Config:
     
     # 缓存
     CACHE_TTL = 300  # 缓存有效期（秒）
+    CACHE_MAX_ENTRIES = 1024  # 查询缓存最多保留的条目数（超出后按 LRU 淘汰）
+    
+    # API 响应缓存（ETag 条件请求）
+    API_CACHE_PATH = "api_cache.db"           # 缓存数据库文件
+    API_CACHE_TTL = 300                       # 在该时间内直接使用缓存，不发请求（秒）
+    API_CACHE_MAX_AGE = 7 * 24 * 3600         # 条目最长保留时间，过期前用 If-None-Match 重新验证（秒）
+    API_CACHE_MAX_BYTES = 64 * 1024 * 1024    # 缓存内容总大小上限（字节）
     
     # API 请求限制
     API_REQUEST_TIMEOUT = 10  # 超时时间（秒）
     API_MAX_RETRIES = 3      # 最大重试次数
+    API_RETRY_BASE_DELAY = 1.0   # 指数退避的基数（秒）
+    API_RETRY_MAX_DELAY = 30.0   # 单次退避的上限（秒）
+    API_RETRY_AFTER_MAX = 120.0  # 最多遵循的 Retry-After 等待时间（秒）
+    API_CIRCUIT_FAILURE_THRESHOLD = 5   # 连续失败多少次后熔断
+    API_CIRCUIT_RECOVERY_TIMEOUT = 60   # 熔断后多少秒尝试恢复
+    API_MAX_WORKERS = 4      # 批量获取时的最大并发请求数
+    API_ASYNC_CONCURRENCY = 8  # 异步客户端同时进行的最大请求数
+    
+    # YouTube Data API 配额（每天太平洋时间零点重置）
+    YOUTUBE_DAILY_QUOTA = 10000
+    QUOTA_COSTS = {              # 各端点每次请求消耗的配额单位
+        "search": 100,
+        "videos": 1,
+        "commentThreads": 1,
+        "channels": 1,
+    }
+    QUOTA_PRIORITY_LIMITS = {    # 各优先级最多可使用的每日配额比例
+        0: 1.0,                  # 统计数据刷新
+        1: 0.9,                  # 搜索、频道等普通请求
+        2: 0.7,                  # 评论抓取
+    }
+    QUOTA_PACING_THRESHOLD = 0.2  # 剩余配额低于该比例时开始限速
+    QUOTA_BURST = 50              # 限速时令牌桶的容量（配额单位）
+    
+    # 评论同步
+    COMMENT_SYNC_BATCH_SIZE = 500    # 累积多少条评论写入一次数据库并保存同步进度
+    COMMENT_SYNC_MAX_PAGES = 50      # 每个视频单次同步最多抓取的页数（每页 100 条、1 配额单位），其余下次续传
+    
+    # 评论预处理（分词、语言、情感）
+    ENRICHMENT_BATCH_SIZE = 50000    # 每批处理并写入数据库的评论数
+    ENRICHMENT_INLINE_LIMIT = 2000   # 打开分析页面时待处理评论不超过该数量则当场处理，否则转入后台补算
+    
+    # 后台统计轮询器（poller.py）
+    POLL_TICK_SECONDS = 60           # 检查到期视频的间隔（秒）
+    POLL_LOCK_TTL = 300              # 单实例租约锁时长（秒），后台每 1/3 时长续约一次
+    POLL_PRUNE_INTERVAL = 6 * 3600   # 按保留策略清理历史数据的间隔（秒）
+    POLL_COMMENT_INTERVAL = 6 * 3600 # 增量同步监控中视频评论的间隔（秒），0 表示不同步
+    POLL_DAILY_QUOTA_BUDGET = 3000   # 轮询器每天最多使用的配额单位（videos.list 每次最多 50 个视频）
+    POLL_BUDGET_BURST = 3600         # 配额预算可累积的时长（秒），允许短时集中刷新
+    POLL_VELOCITY_WINDOW_HOURS = 24  # 计算观看量增长速度时回看的小时数
+    POLL_TIERS = [                   # (分级, 每小时新增观看下限, 刷新间隔秒)，按顺序取第一个满足的
+        ("hot", 1000, 5 * 60),
+        ("warm", 100, 30 * 60),
+        ("cool", 10, 3 * 3600),
+        ("cold", 0, 24 * 3600),
+    ]
+    POLL_AGE_INTERVALS = [           # (发布不满天数, 刷新间隔秒)，新视频至少按该间隔刷新
+        (1, 10 * 60),
+        (7, 3600),
+    ]
+    POLL_NO_HISTORY_INTERVAL = 3600  # 还无法计算增长速度的视频的刷新间隔（秒）
+    
+    # HTTP 连接池
+    HTTP_POOL_CONNECTIONS = 4   # 缓存连接池的主机数
+    HTTP_POOL_MAXSIZE = 8       # 每个主机的最大连接数（不小于 API_MAX_WORKERS）
     
     @classmethod
     def set_api_key(cls, api_key: str) -> None:
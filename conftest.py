@@ -0,0 +1,161 @@
+"""
+pytest 公共夹具
+- temp_db: 在临时目录中初始化数据库，测试互不影响，也不会写入仓库中的数据库
+- stub_api: 本地模拟的 YouTube Data API（ThreadingHTTPServer），记录连接和并发情况
+"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import api.quota
+import api.response_cache
+from database import init_database, invalidate_reads
+
+# 模拟服务器每个视频的评论页数和每页评论数
+STUB_COMMENT_PAGES = 4
+STUB_COMMENTS_PER_PAGE = 3
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """
+    切换到临时目录并初始化数据库
+
+    数据库路径、API 响应缓存路径都基于当前工作目录，查询缓存的键也包含数据库路径；
+    进程内共享的配额限速器和响应缓存重置为在临时目录中重新创建
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(api.quota, "_limiter", None)
+    monkeypatch.setattr(api.response_cache, "_cache", None)
+    init_database()
+    invalidate_reads()
+    yield tmp_path
+    invalidate_reads()
+
+
+def _video_item(video_id: str) -> dict:
+    return {
+        "id": video_id,
+        "snippet": {
+            "title": f"Video {video_id}",
+            "channelId": "UC_stub",
+            "channelTitle": "Stub Channel",
+            "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hq.jpg"}},
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "categoryId": "22",
+            "description": "stub",
+            "tags": ["stub"],
+        },
+        "contentDetails": {"duration": "PT1M"},
+        "statistics": {"viewCount": "1000", "likeCount": "50", "commentCount": "12"},
+    }
+
+
+def _comment_item(video_id: str, page: int, index: int) -> dict:
+    return {
+        "id": f"{video_id}-p{page}-c{index}",
+        "snippet": {
+            "topLevelComment": {
+                "snippet": {
+                    "authorDisplayName": f"author{index}",
+                    "textDisplay": f"comment {index} on page {page}",
+                    "publishedAt": f"2024-01-{10 - page:02d}T00:00:00Z",
+                    "likeCount": index,
+                }
+            }
+        },
+    }
+
+
+class StubYouTubeServer:
+    """
+    模拟 YouTube Data API 的本地服务器
+
+    支持 videos（按 id 返回视频）和 commentThreads（每个视频 STUB_COMMENT_PAGES 页，
+    用 nextPageToken 串联）。记录每个请求的客户端端口、Accept-Encoding，
+    以及同时处理中的请求数峰值；delay 为每个请求的处理耗时（秒）。
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.client_ports = []
+        self.accept_encodings = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.client_ports.append(self.client_address[1])
+                    stub.accept_encodings.append(self.headers.get("Accept-Encoding", ""))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    self._respond()
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _respond(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                endpoint = url.path.rsplit("/", 1)[-1]
+
+                if endpoint == "videos":
+                    body = {"items": [_video_item(vid) for vid in query["id"][0].split(",")]}
+                elif endpoint == "commentThreads":
+                    video_id = query["videoId"][0]
+                    page = int(query.get("pageToken", ["0"])[0])
+                    body = {"items": [_comment_item(video_id, page, i)
+                                      for i in range(STUB_COMMENTS_PER_PAGE)]}
+                    if page + 1 < STUB_COMMENT_PAGES:
+                        body["nextPageToken"] = str(page + 1)
+                else:
+                    body = {"items": []}
+
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    data = gzip.compress(data)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "StubYouTubeServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_api():
+    """启动本地模拟 API 服务器，测试结束后关闭"""
+    server = StubYouTubeServer().start()
+    yield server
+    server.stop()
@@ -11,6 +11,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from collections import Counter
 import os
+from datetime import datetime
 
 # 导入自定义模块
 from ui import (
@@ -28,7 +29,9 @@ from ui import (
 )
 from database import (
     init_database,
-    get_videos,
+    get_videos_frame,
+    get_overview_kpis,
+    get_top_videos,
     get_video_info,
     get_latest_stats,
     get_video_stats_history,
@@ -36,30 +39,47 @@ from database import (
     get_all_tags,
     get_unread_alerts,
     mark_alert_as_read,
+    get_pool_stats,
+    memo_scope,
+    get_memo_stats,
+    get_lock_holder,
+    search_comments,
     add_video,
     save_video_stats,
     save_comment,
     save_tags,
 )
-from api import YouTubeAPI, extract_video_id
+from api import (
+    YouTubeAPI,
+    extract_video_id,
+    refresh_videos,
+    ResponseCache,
+    get_quota_limiter,
+    get_response_cache,
+    get_circuit_breaker,
+)
 from analytics import (
     analyze_video_performance,
     create_performance_chart,
     create_comparison_chart,
     generate_optimization_suggestions,
-    generate_word_cloud,
+    render_word_cloud_image,
     analyze_comment_sentiment,
     get_top_commenters,
     get_most_liked_comments,
+    compute_video_metrics,
+    engagement_rate,
 )
 from utils import (
     format_number,
     format_percentage,
     calculate_engagement_rate,
     format_duration,
+    format_numbers,
     parse_duration,
-    get_video_age,
+    get_video_ages,
     truncate_text,
+    truncate_texts,
 )
 from config import Config, set_api_key
 
@@ -86,24 +106,35 @@ if "selected_videos" not in st.session_state:
 def main():
     """主函数"""
     
+    # 同一次渲染内重复的数据库读取只查询一次
+    with memo_scope():
+        render_app()
+
+
+def render_app():
+    """渲染侧边栏和当前页面"""
+    
     # 渲染侧边栏
     current_page = render_sidebar()
     
     # 添加调试模式（在侧边栏）
-    with st.sidebar.expander("🔧 调试模式", expanded=False):
+    debug_panel = st.sidebar.expander("🔧 调试模式", expanded=False)
+    with debug_panel:
         st.write(f"当前页面: {current_page}")
         st.write(f"API Key 已配置: {bool(st.session_state.api_key)}")
         
         # 测试数据库
         try:
-            from database import get_videos
-            videos = get_videos()
+            videos = get_videos_frame()
             st.write(f"视频数量: {len(videos)}")
             
-            if videos:
+            if not videos.empty:
                 st.write("最新视频:")
-                st.write(f"ID: {videos[0][0]}")
-                st.write(f"标题: {videos[0][1][:50]}...")
+                st.write(f"ID: {videos['video_id'].iat[0]}")
+                st.write(f"标题: {videos['title'].iat[0][:50]}...")
+            
+            pool_stats = get_pool_stats()
+            st.write(f"连接池: 命中 {pool_stats['hits']} / 未命中 {pool_stats['misses']}")
         except Exception as e:
             st.error(f"数据库错误: {e}")
     
@@ -127,6 +158,35 @@ def main():
         import traceback
         with st.expander("查看错误详情"):
             st.code(traceback.format_exc())
+    
+    # 页面渲染完成后再输出查询缓存统计
+    memo_stats = get_memo_stats()
+    with debug_panel:
+        st.write(f"查询缓存（本次渲染）: 命中 {memo_stats['scope_hits']} / 未命中 {memo_stats['scope_misses']}")
+        st.write(f"查询缓存（累计）: 命中 {memo_stats['hits']} / 未命中 {memo_stats['misses']}")
+        st.write(
+            f"共享缓存: 命中 {memo_stats['shared_hits']} / 未命中 {memo_stats['shared_misses']}，"
+            f"条目 {memo_stats['shared_entries']}，淘汰 {memo_stats['shared_evictions']}"
+        )
+
+
+def _video_options(videos: pd.DataFrame) -> dict:
+    """视频选择框的选项：显示文本 -> 视频 ID"""
+    labels = videos["title"].fillna("") + " (" + videos["video_id"] + ")"
+    return dict(zip(labels, videos["video_id"]))
+
+
+def _leaderboard(metric: str, title_width: int = 40) -> pd.DataFrame:
+    """排行前 10 的视频（在 SQLite 中排序取前 N），列名与看板表格一致"""
+    top = get_top_videos(metric, limit=10)
+    return pd.DataFrame({
+        "视频标题": truncate_texts(top["title"], title_width),
+        "频道": top["channel_title"],
+        "观看量": top["view_count"],
+        "点赞量": top["like_count"],
+        "评论量": top["comment_count"],
+        "互动率": engagement_rate(top),
+    })
 
 
 # ==================== 视频管理页面 ====================
@@ -171,39 +231,20 @@ def render_video_management():
         
         if st.button("批量添加", type="primary"):
             with st.spinner(f"正在添加 {len(video_lines)} 个视频..."):
-                api = YouTubeAPI(st.session_state.api_key)
-                success_count = 0
+                # 获取的统计会写入数据库：响应缓存不走 TTL 捷径，每次都用 ETag 重新验证
+                api = YouTubeAPI(st.session_state.api_key, cache=ResponseCache(ttl=0))
+                video_ids = [vid for vid in map(extract_video_id, video_lines) if vid]
+                
+                # 每 50 个 ID 一个请求并发获取，结果批量写入数据库
+                result = refresh_videos(video_ids, api)
+                
+                for video_id in result["missing"]:
+                    st.warning(f"添加视频 {video_id} 失败: 无法获取视频信息")
                 
-                for line in video_lines:
-                    video_id = extract_video_id(line)
-                    if video_id:
-                        try:
-                            # 获取视频信息
-                            videos = api.get_video_info([video_id])
-                            if videos:
-                                video_data = videos[0]
-                                
-                                # 保存视频信息
-                                add_video(video_data)
-                                
-                                # 保存统计数据
-                                stats = {
-                                    "view_count": video_data.get("view_count", 0),
-                                    "like_count": video_data.get("like_count", 0),
-                                    "comment_count": video_data.get("comment_count", 0),
-                                    "favorite_count": video_data.get("favorite_count", 0)
-                                }
-                                save_video_stats(video_id, stats)
-                                
-                                # 保存标签
-                                tags = video_data.get("tags", [])
-                                if tags:
-                                    save_tags(video_id, tags)
-                                
-                                success_count += 1
-                        except Exception as e:
-                            st.warning(f"添加视频 {video_id} 失败: {str(e)}")
+                for failure in (result["videos"] or {}).get("failed", []):
+                    st.warning(f"添加视频 {failure['key']} 失败: {failure['error']}")
                 
+                success_count = result["videos"]["succeeded"] if result["videos"] else 0
                 render_success_box("批量添加完成", f"成功添加 {success_count} 个视频，失败 {len(video_lines) - success_count} 个")
     
     # 处理单个添加
@@ -214,7 +255,8 @@ def render_video_management():
             if not video_id:
                 render_error_box("无效的视频 URL", "请输入有效的 YouTube 视频 URL 或 11 位视频 ID")
             else:
-                api = YouTubeAPI(st.session_state.api_key)
+                # 同上：统计会写入数据库，需要最新值
+                api = YouTubeAPI(st.session_state.api_key, cache=ResponseCache(ttl=0))
                 videos = api.get_video_info([video_id])
                 
                 if videos:
@@ -244,24 +286,20 @@ def render_video_management():
     # 显示已添加的视频
     render_separator("已监控视频")
     
-    videos = get_videos()
+    videos = get_videos_frame()
     
-    if not videos:
+    if videos.empty:
         render_empty_state("暂无监控视频，请先添加视频", icon="📹")
     else:
         # 准备数据
-        video_list = []
-        for video in videos:
-            video_list.append({
-                "视频标题": video[1],
-                "频道": video[2],
-                "观看量": format_number(video[4] or 0),
-                "点赞量": format_number(video[5] or 0),
-                "评论量": format_number(video[6] or 0),
-                "发布时间": get_video_age(video[3]) if video[3] else "未知"
-            })
-        
-        df = pd.DataFrame(video_list)
+        df = pd.DataFrame({
+            "视频标题": videos["title"],
+            "频道": videos["channel_title"],
+            "观看量": format_numbers(videos["view_count"]),
+            "点赞量": format_numbers(videos["like_count"]),
+            "评论量": format_numbers(videos["comment_count"]),
+            "发布时间": get_video_ages(videos["added_at"]),
+        })
         st.dataframe(df, width='stretch', hide_index=True)
 
 
@@ -282,78 +320,58 @@ def render_overall_dashboard():
     
     st.write("---")
     
-    videos = get_videos()
+    videos = get_videos_frame()
     
-    if not videos:
+    if videos.empty:
         render_empty_state("暂无监控视频，请先添加视频", icon="📊")
         return
     
     # ==================== 1. 核心指标 ====================
     st.subheader("📈 核心指标")
     
-    # 计算总体数据
-    total_views = sum([video[4] or 0 for video in videos])
-    total_likes = sum([video[5] or 0 for video in videos])
-    total_comments = sum([video[6] or 0 for video in videos])
-    
-    # 计算平均互动率
-    engagement_rates = []
-    for video in videos:
-        er = calculate_engagement_rate(
-            video[5] or 0,
-            video[6] or 0,
-            video[4] or 0
-        )
-        engagement_rates.append(er)
-    
-    avg_engagement_rate = sum(engagement_rates) / len(engagement_rates) if engagement_rates else 0
-    
-    # 统计频道数量
-    channels = set([video[2] for video in videos])
-    channel_count = len(channels)
+    # 总体数据在 SQL 中汇总
+    kpis = get_overview_kpis()
     
     # 显示核心指标
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        render_metric_card("总视频数", len(videos))
+        render_metric_card("总视频数", kpis["video_count"])
     
     with col2:
-        render_metric_card("总频道数", channel_count)
+        render_metric_card("总频道数", kpis["channel_count"])
     
     with col3:
-        render_metric_card("总观看量", format_number(total_views))
+        render_metric_card("总观看量", format_number(kpis["total_views"]))
     
     with col4:
-        render_metric_card("总点赞量", format_number(total_likes))
+        render_metric_card("总点赞量", format_number(kpis["total_likes"]))
     
     with col5:
-        render_metric_card("平均互动率", format_percentage(avg_engagement_rate))
+        render_metric_card("平均互动率", format_percentage(kpis["avg_engagement_rate"]))
     
     st.write("---")
     
     # ==================== 2. 观看趋势 ====================
     st.subheader("📈 观看趋势")
     
+    # 分布图和洞察使用全部视频；Top 10 排行由排行查询直接取前 10
+    df = pd.DataFrame({
+        "视频标题": truncate_texts(videos["title"], 40),
+        "频道": videos["channel_title"],
+        "观看量": videos["view_count"],
+        "点赞量": videos["like_count"],
+        "评论量": videos["comment_count"],
+        "互动率": compute_video_metrics(videos)["engagement_rate"],
+    })
+    
     # 创建趋势图表
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("### 观看量排行 Top 10")
         
-        video_list = []
-        for video in videos:
-            video_list.append({
-                "视频标题": truncate_text(video[1], 40),
-                "频道": video[2],
-                "观看量": video[4] or 0,
-                "点赞量": video[5] or 0,
-                "评论量": video[6] or 0,
-                "互动率": calculate_engagement_rate(video[5] or 0, video[6] or 0, video[4] or 0)
-            })
-        
-        df = pd.DataFrame(video_list)
-        df_sorted = df.sort_values("观看量", ascending=False).head(10)
+        df_sorted = _leaderboard("views")
         
         fig = px.bar(
             df_sorted,
@@ -377,7 +395,7 @@ def render_overall_dashboard():
     with col2:
         st.write("### 互动率排行 Top 10")
         
-        df_engagement = df.sort_values("互动率", ascending=False).head(10)
+        df_engagement = _leaderboard("engagement")
         
         fig = px.bar(
             df_engagement,
@@ -599,13 +617,13 @@ def render_video_detail():
     st.write("---")
     
     # 选择视频
-    videos = get_videos()
+    videos = get_videos_frame()
     
-    if not videos:
+    if videos.empty:
         render_empty_state("暂无监控视频，请先添加视频", icon="📹")
         return
     
-    video_options = {f"{video[1]} ({video[0]})": video[0] for video in videos}
+    video_options = _video_options(videos)
     selected_video = st.selectbox("选择视频", list(video_options.keys()))
     
     video_id = video_options[selected_video]
@@ -682,15 +700,12 @@ def render_video_detail():
     
     with col1:
         st.subheader("评论词云")
-        wordcloud = generate_word_cloud(video_id)
-        
-        import matplotlib.pyplot as plt
+        image = render_word_cloud_image(video_id)
         
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis("off")
-        st.pyplot(fig)
-        plt.close()
+        if image:
+            st.image(image, width='stretch')
+        else:
+            render_empty_state("暂无评论词频数据", icon="☁️")
     
     with col2:
         st.subheader("情感分析")
@@ -711,6 +726,9 @@ def render_video_detail():
         )
         
         st.plotly_chart(fig, width='stretch')
+        
+        if sentiment.get("pending"):
+            st.caption(f"还有 {sentiment['pending']:,} 条评论正在后台分析，刷新页面查看最新结果")
 
 
 # ==================== 爆款提醒页面 ====================
@@ -766,14 +784,14 @@ def render_seo_analysis():
     
     st.write("---")
     
-    videos = get_videos()
+    videos = get_videos_frame()
     
-    if not videos:
+    if videos.empty:
         render_empty_state("暂无监控视频，请先添加视频", icon="📊")
         return
     
     # 选择视频
-    video_options = {f"{video[1]} ({video[0]})": video[0] for video in videos}
+    video_options = _video_options(videos)
     selected_video = st.selectbox("选择视频", list(video_options.keys()))
     
     video_id = video_options[selected_video]
@@ -923,18 +941,21 @@ def render_comment_analysis():
     """渲染评论分析页面"""
     st.title("💬 评论分析")
     
-    videos = get_videos()
+    videos = get_videos_frame()
     
-    if not videos:
+    if videos.empty:
         render_empty_state("暂无监控视频，请先添加视频", icon="📊")
         return
     
     # 选择视频
-    video_options = {f"{video[1]} ({video[0]})": video[0] for video in videos}
+    video_options = _video_options(videos)
     selected_video = st.selectbox("选择视频", list(video_options.keys()))
     
     video_id = video_options[selected_video]
     
+    # 评论搜索
+    render_comment_search(video_id)
+    
     # 获取最活跃评论者
     top_commenters = get_top_commenters(video_id, limit=10)
     
@@ -954,6 +975,50 @@ def render_comment_analysis():
             st.write("---")
 
 
+def render_comment_search(video_id):
+    """渲染评论搜索框和搜索结果"""
+    st.subheader("搜索评论")
+    
+    col1, col2, col3 = st.columns([3, 1, 2])
+    with col1:
+        query = st.text_input(
+            "关键词",
+            placeholder='多个关键词用空格分隔，短语用双引号，如 教程 "very helpful"',
+            label_visibility="collapsed",
+        )
+    with col2:
+        current_only = st.checkbox("仅当前视频", value=True)
+    with col3:
+        date_range = st.date_input("发布日期", value=(), label_visibility="collapsed")
+    
+    if not query.strip():
+        return
+    
+    start_date = end_date = None
+    if len(date_range) == 2:
+        start_date, end_date = (day.isoformat() for day in date_range)
+    
+    results = search_comments(
+        query,
+        video_id=video_id if current_only else None,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    
+    if not results:
+        st.info("没有找到匹配的评论")
+        return
+    
+    st.caption(f"找到 {len(results)} 条评论" + ("（仅显示前 50 条）" if len(results) >= 50 else ""))
+    for result in results:
+        published = (result["published_at"] or "")[:10]
+        source = "" if current_only else f" · {result['video_id']}"
+        st.markdown(f"**{result['author_name']}** · {published} · 👍 {result['like_count'] or 0}{source}")
+        st.markdown("> " + " ".join(result["snippet"].split()))
+    
+    st.write("---")
+
+
 def render_api_settings():
     """渲染 API 设置页面"""
     st.title("🔑 API 配置")
@@ -975,6 +1040,52 @@ def render_api_settings():
         render_success_box("保存成功", "API 密钥已更新")
 
 
+def render_quota_status():
+    """渲染 API 配额使用情况"""
+    render_section_title("API 配额", "YouTube Data API 每日配额（太平洋时间零点重置）")
+    
+    status = get_quota_limiter().status()
+    used_ratio = status["used"] / status["daily_quota"] if status["daily_quota"] else 0
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("剩余配额", format_number(status["remaining"]))
+    col2.metric("今日已用", format_number(status["used"]))
+    col3.metric("距重置", f"{status['seconds_until_reset'] / 3600:.1f} 小时")
+    
+    st.progress(min(used_ratio, 1.0), text=f"已使用 {format_percentage(used_ratio)}")
+    
+    if status["pacing"]:
+        render_warning_box("配额紧张", "剩余配额较少，后台刷新已自动放慢，评论抓取可能被暂停")
+    
+    breaker = get_circuit_breaker()
+    if breaker.state != breaker.CLOSED:
+        render_warning_box("API 熔断中", f"YouTube API 连续请求失败，约 {breaker.retry_in():.0f} 秒后自动重试")
+    
+    if status["by_endpoint"]:
+        usage_df = pd.DataFrame([
+            {"端点": endpoint, "配额单位": item["units"], "请求次数": item["calls"]}
+            for endpoint, item in status["by_endpoint"].items()
+        ])
+        st.dataframe(usage_df, width='stretch', hide_index=True)
+    
+    cache_stats = get_response_cache().stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("响应缓存命中率", format_percentage(cache_stats["hit_ratio"]))
+    col2.metric("304 未修改", format_number(cache_stats["revalidated"]))
+    col3.metric("节省流量", f"{cache_stats['bytes_saved'] / 1024 / 1024:.1f} MB")
+
+
+def render_settings():
+    """渲染系统设置页面"""
+    render_api_settings()
+    
+    st.write("---")
+    render_quota_status()
+    
+    st.write("---")
+    render_data_source()
+
+
 def render_data_source():
     """渲染数据源管理页面"""
     st.title("📊 数据源管理")
@@ -985,16 +1096,25 @@ def render_data_source():
     
     render_section_title("数据库统计")
     
-    videos = get_videos()
+    kpis = get_overview_kpis()
     
-    if videos:
-        st.metric("监控视频数", len(videos))
-        
-        total_views = sum([video[4] or 0 for video in videos])
-        st.metric("总观看量", format_number(total_views))
+    if kpis["video_count"]:
+        st.metric("监控视频数", kpis["video_count"])
+        st.metric("总观看量", format_number(kpis["total_views"]))
     else:
         render_empty_state("暂无数据", icon="📊")
 
+    st.write("---")
+
+    render_section_title("后台轮询器")
+
+    holder = get_lock_holder("stats_poller")
+    if holder:
+        st.success(f"轮询器运行中：{holder['owner']}，"
+                   f"启动于 {datetime.fromtimestamp(holder['acquired_at']):%Y-%m-%d %H:%M:%S}")
+    else:
+        st.info("轮询器未运行，统计数据只会在手动刷新时更新。运行 `python poller.py` 启动后台刷新。")
+
 
 def render_error_box(title, content):
     """渲染错误框（临时函数，使用组件中的）"""
@@ -1012,7 +1132,7 @@ def render_overview():
     st.info("使用左侧导航栏切换页面", icon="🧭")
     
     try:
-        videos = get_videos()
+        videos = get_videos_frame()
     except Exception as e:
         st.error(f"获取视频列表失败: {e}")
         import traceback
@@ -1020,32 +1140,27 @@ def render_overview():
             st.code(traceback.format_exc())
         return
     
-    if not videos:
+    if videos.empty:
         st.warning("暂无监控视频，请先添加视频", icon="📊")
         st.info("💡 提示：前往「视频管理」页面添加视频", icon="💡")
         return
     
     # 准备数据
-    video_list = []
-    for video in videos:
-        video_list.append({
-            "视频标题": truncate_text(video[1], 30),
-            "观看量": video[4] or 0,
-            "互动率": calculate_engagement_rate(video[5] or 0, video[6] or 0, video[4] or 0)
-        })
-    
-    df = pd.DataFrame(video_list)
+    df = pd.DataFrame({
+        "视频标题": truncate_texts(videos["title"], 30),
+        "观看量": videos["view_count"],
+        "互动率": compute_video_metrics(videos)["engagement_rate"],
+    })
     
-    # 核心指标
-    total_views = sum([video[4] or 0 for video in videos])
-    total_likes = sum([video[5] or 0 for video in videos])
+    # 核心指标（SQL 汇总）
+    kpis = get_overview_kpis()
     
     st.write("#### 📈 核心指标")
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("总视频数", len(videos))
-    col2.metric("总观看量", format_number(total_views))
-    col3.metric("总点赞量", format_number(total_likes))
-    col4.metric("平均互动率", format_percentage(df["互动率"].mean()))
+    col1.metric("总视频数", kpis["video_count"])
+    col2.metric("总观看量", format_number(kpis["total_views"]))
+    col3.metric("总点赞量", format_number(kpis["total_likes"]))
+    col4.metric("平均互动率", format_percentage(kpis["avg_engagement_rate"]))
     
     st.write("---")
     
@@ -1054,14 +1169,14 @@ def render_overview():
     col1, col2 = st.columns(2)
     
     with col1:
-        df_sorted = df.sort_values("观看量", ascending=False).head(10)
+        df_sorted = _leaderboard("views", title_width=30)
         fig = px.bar(df_sorted, x="观看量", y="视频标题", orientation="h", 
                     color="观看量", color_continuous_scale="viridis", height=400)
         fig.update_layout(template="plotly_dark", font=dict(color="#ffffff"))
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        df_engagement = df.sort_values("互动率", ascending=False).head(10)
+        df_engagement = _leaderboard("engagement", title_width=30)
         fig = px.bar(df_engagement, x="互动率", y="视频标题", orientation="h",
                     color="互动率", color_continuous_scale="plasma", height=400)
         fig.update_layout(template="plotly_dark", font=dict(color="#ffffff"))
@@ -21,7 +21,9 @@ import re
 # 导入自定义模块
 from database import (
     init_database,
-    get_videos,
+    get_videos_frame,
+    get_overview_kpis,
+    get_top_videos,
     get_video_info,
     get_latest_stats,
     get_video_stats_history,
@@ -29,10 +31,9 @@ from database import (
 from utils import (
     format_number,
     format_percentage,
-    calculate_engagement_rate,
-    get_video_age,
-    truncate_text,
+    truncate_texts,
 )
+from analytics import compute_video_metrics, engagement_rate
 
 # YouTube 数据分析维度
 """
@@ -92,6 +93,19 @@ def render_navigation_help():
     """, icon="🧭")
 
 
+def _leaderboard(metric: str) -> pd.DataFrame:
+    """排行前 10 的视频（在 SQLite 中排序取前 N），列名与看板表格一致"""
+    top = get_top_videos(metric, limit=10)
+    return pd.DataFrame({
+        "视频标题": truncate_texts(top["title"], 40),
+        "频道": top["channel_title"],
+        "观看量": top["view_count"],
+        "点赞量": top["like_count"],
+        "评论量": top["comment_count"],
+        "互动率": engagement_rate(top),
+    })
+
+
 def render_enhanced_overall_dashboard():
     """渲染增强的整体数据看板"""
     
@@ -101,78 +115,58 @@ def render_enhanced_overall_dashboard():
     render_navigation_help()
     
     # 获取数据
-    videos = get_videos()
+    videos = get_videos_frame()
     
-    if not videos:
+    if videos.empty:
         st.warning("暂无监控视频，请先添加视频到视频管理页面", icon="⚠️")
         return
     
     # ==================== 1. 核心指标 ====================
     st.subheader("📈 核心指标")
     
-    # 计算总体数据
-    total_views = sum([video[4] or 0 for video in videos])
-    total_likes = sum([video[5] or 0 for video in videos])
-    total_comments = sum([video[6] or 0 for video in videos])
-    
-    # 计算平均互动率
-    engagement_rates = []
-    for video in videos:
-        er = calculate_engagement_rate(
-            video[5] or 0,
-            video[6] or 0,
-            video[4] or 0
-        )
-        engagement_rates.append(er)
-    
-    avg_engagement_rate = sum(engagement_rates) / len(engagement_rates) if engagement_rates else 0
-    
-    # 统计频道数量
-    channels = set([video[2] for video in videos])
-    channel_count = len(channels)
+    # 总体数据在 SQL 中汇总
+    kpis = get_overview_kpis()
     
     # 显示核心指标
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("总视频数", len(videos))
+        st.metric("总视频数", kpis["video_count"])
     
     with col2:
-        st.metric("总频道数", channel_count)
+        st.metric("总频道数", kpis["channel_count"])
     
     with col3:
-        st.metric("总观看量", format_number(total_views))
+        st.metric("总观看量", format_number(kpis["total_views"]))
     
     with col4:
-        st.metric("总点赞量", format_number(total_likes))
+        st.metric("总点赞量", format_number(kpis["total_likes"]))
     
     with col5:
-        st.metric("平均互动率", format_percentage(avg_engagement_rate))
+        st.metric("平均互动率", format_percentage(kpis["avg_engagement_rate"]))
     
     st.markdown("---")
     
     # ==================== 2. 观看趋势 ====================
     st.subheader("📈 观看趋势")
     
+    # 分布图和洞察使用全部视频；Top 10 排行由排行查询直接取前 10
+    df = pd.DataFrame({
+        "视频标题": truncate_texts(videos["title"], 40),
+        "频道": videos["channel_title"],
+        "观看量": videos["view_count"],
+        "点赞量": videos["like_count"],
+        "评论量": videos["comment_count"],
+        "互动率": compute_video_metrics(videos)["engagement_rate"],
+    })
+    
     # 创建趋势图表
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("### 观看量排行 Top 10")
         
-        video_list = []
-        for video in videos:
-            video_list.append({
-                "视频标题": truncate_text(video[1], 40),
-                "频道": video[2],
-                "观看量": video[4] or 0,
-                "点赞量": video[5] or 0,
-                "评论量": video[6] or 0,
-                "互动率": calculate_engagement_rate(video[5] or 0, video[6] or 0, video[4] or 0)
-            })
-        
-        df = pd.DataFrame(video_list)
-        df_sorted = df.sort_values("观看量", ascending=False).head(10)
+        df_sorted = _leaderboard("views")
         
         fig = px.bar(
             df_sorted,
@@ -196,7 +190,7 @@ def render_enhanced_overall_dashboard():
     with col2:
         st.write("### 互动率排行 Top 10")
         
-        df_engagement = df.sort_values("互动率", ascending=False).head(10)
+        df_engagement = _leaderboard("engagement")
         
         fig = px.bar(
             df_engagement,
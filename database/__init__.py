@@ -4,15 +4,20 @@
 
 from .connection import (
     get_db_connection,
+    get_db_path,
+    get_pool_stats,
     init_database,
     get_video_ids,
     get_videos,
     get_video_info,
     get_latest_stats,
+    get_video_comparison,
     get_video_stats_history,
+    get_active_video_activity,
     add_video,
     save_video_stats,
     get_comments,
+    get_comment_authors,
     save_comment,
     save_tags,
     get_all_tags,
@@ -20,22 +25,104 @@ from .connection import (
     get_unread_alerts,
     mark_alert_as_read,
 )
+from .bulk import (
+    bulk_add_videos,
+    bulk_save_stats,
+    bulk_save_comments,
+    bulk_save_tags,
+    bulk_update_thumbnails,
+)
+from .frames import read_frame, get_videos_frame, get_comments_frame
+from .kpis import get_overview_kpis
+from .rankings import RANKING_METRICS, get_top_videos
+from .cache import memo_scope, invalidate_reads, get_memo_stats, get_query_cache
+from .locks import acquire_lock, renew_lock, release_lock, get_lock_holder
+from .search import search_comments, parse_search_query
+from .enrichment import (
+    get_unenriched_comments,
+    count_unenriched_comments,
+    save_comment_enrichment,
+    get_sentiment_summary,
+    get_comment_sentiments,
+    get_token_frequencies,
+    get_token_frequency_version,
+)
+from .comment_sync import (
+    get_comment_sync_state,
+    save_comment_sync_state,
+    reset_comment_sync_state,
+)
+from .quota import record_quota_usage, get_quota_usage
+from .maintenance import (
+    rebuild_latest_stats,
+    check_latest_stats,
+    rebuild_rollups,
+    rebuild_comment_search,
+    rebuild_comment_terms,
+    rebuild_video_kpis,
+    prune_stats,
+)
 
 __all__ = [
     "get_db_connection",
+    "get_db_path",
+    "get_pool_stats",
     "init_database",
     "get_video_ids",
     "get_videos",
     "get_video_info",
     "get_latest_stats",
+    "get_video_comparison",
     "get_video_stats_history",
+    "get_active_video_activity",
     "add_video",
     "save_video_stats",
     "get_comments",
+    "get_comment_authors",
     "save_comment",
     "save_tags",
     "get_all_tags",
     "create_alert",
     "get_unread_alerts",
     "mark_alert_as_read",
+    "bulk_add_videos",
+    "bulk_save_stats",
+    "bulk_save_comments",
+    "bulk_save_tags",
+    "bulk_update_thumbnails",
+    "read_frame",
+    "get_videos_frame",
+    "get_comments_frame",
+    "get_overview_kpis",
+    "RANKING_METRICS",
+    "get_top_videos",
+    "memo_scope",
+    "invalidate_reads",
+    "get_memo_stats",
+    "get_query_cache",
+    "acquire_lock",
+    "renew_lock",
+    "release_lock",
+    "get_lock_holder",
+    "search_comments",
+    "parse_search_query",
+    "get_unenriched_comments",
+    "count_unenriched_comments",
+    "save_comment_enrichment",
+    "get_sentiment_summary",
+    "get_comment_sentiments",
+    "get_token_frequencies",
+    "get_token_frequency_version",
+    "get_comment_sync_state",
+    "save_comment_sync_state",
+    "reset_comment_sync_state",
+    "record_quota_usage",
+    "get_quota_usage",
+    "rebuild_latest_stats",
+    "check_latest_stats",
+    "rebuild_rollups",
+    "rebuild_comment_search",
+    "rebuild_comment_terms",
+    "rebuild_video_kpis",
+    "prune_stats",
 ]
@@ -0,0 +1,246 @@
+"""
+批量写入模块
+在单个事务中通过 executemany 批量写入视频、统计、标签和评论
+"""
+
+import sqlite3
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import streamlit as st
+
+from config import Config
+from .connection import (
+    get_db_connection,
+    INSERT_VIDEO_SQL,
+    INSERT_STATS_SQL,
+    INSERT_COMMENT_SQL,
+    INSERT_TAG_SQL,
+    _video_row,
+    _stats_row,
+    _comment_row,
+)
+from .cache import invalidates
+
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """将可迭代对象按固定大小切块，不会一次性加载全部数据"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _new_report() -> Dict[str, Any]:
+    """创建批量写入结果"""
+    return {"total": 0, "succeeded": 0, "failed": []}
+
+
+def _record_failure(report: Dict[str, Any], key: Any, error: Union[str, Exception]) -> None:
+    report["failed"].append({"key": key, "error": str(error)})
+
+
+def _write_chunk(cursor: sqlite3.Cursor, sql: str, rows: List[Tuple[Any, tuple]],
+                 report: Dict[str, Any]) -> None:
+    """
+    写入一个数据块
+
+    先整体 executemany；如果整块失败，回滚到保存点后逐行重试，
+    记录失败的行而不影响同一事务中的其他行
+    """
+    cursor.execute("SAVEPOINT bulk_chunk")
+    try:
+        cursor.executemany(sql, [params for _, params in rows])
+        cursor.execute("RELEASE SAVEPOINT bulk_chunk")
+        report["succeeded"] += len(rows)
+        return
+    except (sqlite3.Error, ValueError, TypeError):
+        cursor.execute("ROLLBACK TO SAVEPOINT bulk_chunk")
+        cursor.execute("RELEASE SAVEPOINT bulk_chunk")
+
+    for key, params in rows:
+        try:
+            cursor.execute(sql, params)
+            report["succeeded"] += 1
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            _record_failure(report, key, e)
+
+
+def _bulk_write(sql: str, rows: Iterable[Tuple[Any, Optional[tuple]]], chunk_size: int,
+                label: str) -> Dict[str, Any]:
+    """
+    在一个事务内分块写入
+
+    Args:
+        sql: 写入语句
+        rows: (行标识, 参数) 序列；参数为 None 表示该行校验失败
+        chunk_size: 每块行数
+        label: 错误提示中使用的名称
+
+    Returns:
+        写入结果 {"total", "succeeded", "failed": [{"key", "error"}]}
+    """
+    report = _new_report()
+
+    try:
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            for chunk in _chunks(rows, chunk_size):
+                report["total"] += len(chunk)
+                valid = []
+                for key, params in chunk:
+                    if params is None:
+                        _record_failure(report, key, "缺少 video_id")
+                    else:
+                        valid.append((key, params))
+                if valid:
+                    _write_chunk(cursor, sql, valid, report)
+
+            conn.commit()
+    except Exception as e:
+        st.error(f"批量{label}失败: {str(e)}")
+        report["succeeded"] = 0
+        report["error"] = str(e)
+
+    return report
+
+
+@invalidates("videos", "video:*")
+def bulk_add_videos(videos: Iterable[dict], chunk_size: int = None) -> Dict[str, Any]:
+    """
+    批量添加视频
+
+    Args:
+        videos: 视频数据字典序列（与 add_video 的参数格式相同）
+        chunk_size: 每次 executemany 的行数
+
+    Returns:
+        写入结果 {"total", "succeeded", "failed": [{"key", "error"}]}
+    """
+    rows = (
+        (video.get("video_id"), _video_row(video) if video.get("video_id") else None)
+        for video in videos
+    )
+    return _bulk_write(INSERT_VIDEO_SQL, rows, chunk_size or Config.BULK_CHUNK_SIZE, "添加视频")
+
+
+@invalidates("stats", "stats:*")
+def bulk_save_stats(stats: Iterable[dict], chunk_size: int = None) -> Dict[str, Any]:
+    """
+    批量保存视频统计数据
+
+    Args:
+        stats: 包含 video_id 和各项统计值的字典序列
+               （可直接传入 YouTubeAPI.get_video_info 的返回结果）
+        chunk_size: 每次 executemany 的行数
+
+    Returns:
+        写入结果 {"total", "succeeded", "failed": [{"key", "error"}]}
+    """
+    rows = (
+        (item.get("video_id"), _stats_row(item["video_id"], item) if item.get("video_id") else None)
+        for item in stats
+    )
+    return _bulk_write(INSERT_STATS_SQL, rows, chunk_size or Config.BULK_CHUNK_SIZE, "保存统计数据")
+
+
+@invalidates("comments:*")
+def bulk_save_comments(comments: Iterable[dict], video_id: str = None,
+                       chunk_size: int = None) -> Dict[str, Any]:
+    """
+    批量保存评论
+
+    Args:
+        comments: 评论数据字典序列；字典中没有 video_id 时使用参数 video_id
+        video_id: 默认视频 ID
+        chunk_size: 每次 executemany 的行数
+
+    Returns:
+        写入结果 {"total", "succeeded", "failed": [{"key", "error"}]}
+    """
+    def rows():
+        for comment in comments:
+            owner = comment.get("video_id") or video_id
+            yield comment.get("comment_id"), _comment_row(owner, comment) if owner else None
+
+    return _bulk_write(INSERT_COMMENT_SQL, rows(), chunk_size or Config.BULK_CHUNK_SIZE, "保存评论")
+
+
+@invalidates("tags")
+def bulk_save_tags(video_tags: Union[Dict[str, List[str]], Iterable[Tuple[str, List[str]]]],
+                   chunk_size: int = None) -> Dict[str, Any]:
+    """
+    批量保存视频标签（每个视频的旧标签会被替换）
+
+    Args:
+        video_tags: {video_id: 标签列表} 或 (video_id, 标签列表) 序列
+        chunk_size: 每块包含的视频数
+
+    Returns:
+        写入结果，total/succeeded 按视频计数
+    """
+    if isinstance(video_tags, dict):
+        video_tags = video_tags.items()
+
+    report = _new_report()
+
+    try:
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            for chunk in _chunks(video_tags, chunk_size or Config.BULK_CHUNK_SIZE):
+                report["total"] += len(chunk)
+                for video_id, tags in chunk:
+                    if not video_id:
+                        _record_failure(report, video_id, "缺少 video_id")
+                        continue
+
+                    # 每个视频一个保存点，失败时只回滚该视频
+                    cursor.execute("SAVEPOINT bulk_tags")
+                    try:
+                        cursor.execute("DELETE FROM tags WHERE video_id = ?", (video_id,))
+                        cursor.executemany(INSERT_TAG_SQL, [(video_id, tag) for tag in tags or []])
+                        cursor.execute("RELEASE SAVEPOINT bulk_tags")
+                        report["succeeded"] += 1
+                    except (sqlite3.Error, ValueError, TypeError) as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT bulk_tags")
+                        cursor.execute("RELEASE SAVEPOINT bulk_tags")
+                        _record_failure(report, video_id, e)
+
+            conn.commit()
+    except Exception as e:
+        st.error(f"批量保存标签失败: {str(e)}")
+        report["succeeded"] = 0
+        report["error"] = str(e)
+
+    return report
+
+
+@invalidates("video:*")
+def bulk_update_thumbnails(thumbnails: Iterable[Tuple[str, str]],
+                           chunk_size: int = None) -> Dict[str, Any]:
+    """
+    批量更新视频缩略图 URL
+
+    Args:
+        thumbnails: (video_id, thumbnail_url) 序列
+        chunk_size: 每次 executemany 的行数
+
+    Returns:
+        写入结果 {"total", "succeeded", "failed": [{"key", "error"}]}
+    """
+    rows = (
+        (video_id, (thumbnail_url, video_id) if video_id else None)
+        for video_id, thumbnail_url in thumbnails
+    )
+    return _bulk_write(
+        "UPDATE videos SET thumbnail_url = ? WHERE video_id = ?",
+        rows,
+        chunk_size or Config.BULK_CHUNK_SIZE,
+        "更新缩略图",
+    )
@@ -0,0 +1,331 @@
+"""
+查询缓存模块
+为数据库读函数提供两层缓存：
+- 渲染内缓存：一次页面渲染（Streamlit 脚本的一次运行）内，同一查询只执行一次
+- 进程内共享缓存：所有会话共享，按 Config.CACHE_TTL 过期，条目数有上限（LRU）
+
+缓存条目带有标签（如 "stats:<video_id>"），写函数执行后只失效受影响标签的条目。
+"""
+
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Set, Tuple, Union
+
+import pandas as pd
+
+from config import Config
+
+# 标签可以是格式化模板（按参数名填充，如 "stats:{video_id}"），
+# 也可以是接收参数字典、返回标签列表的函数。
+# "stats:*" 表示失效所有以 "stats:" 开头的标签。
+TagSpec = Union[str, Callable[[Dict[str, Any]], Iterable[str]]]
+
+_local = threading.local()
+_lock = threading.Lock()
+
+# 每次写入都会递增：渲染内缓存据此整体作废；
+# 读取期间发生过写入时，结果不写入共享缓存，避免缓存旧数据
+_generation = 0
+
+_memo_totals = {"hits": 0, "misses": 0}
+
+
+def _copy(value):
+    # 返回浅拷贝，避免调用方修改列表或字典时污染缓存
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    return value
+
+
+class QueryCache:
+    """
+    带 TTL 和条目上限的 LRU 缓存，支持按标签失效
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最大条目数，默认使用 Config.CACHE_MAX_ENTRIES
+            ttl: 条目有效期（秒），默认使用 Config.CACHE_TTL
+        """
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.CACHE_TTL
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tag_index: Dict[str, Set[Tuple]] = {}
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidated": 0}
+
+    def _remove(self, key: Tuple) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def get(self, key: Tuple, count: bool = True) -> Tuple[bool, Any]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            count: 是否计入命中统计
+
+        Returns:
+            (是否命中, 缓存值)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += count
+                    return True, entry[1]
+                self._remove(key)
+                self._stats["expired"] += 1
+            self._stats["misses"] += count
+            return False, None
+
+    def put(self, key: Tuple, value: Any, tags: Iterable[str]) -> None:
+        """写入缓存，超出条目上限时淘汰最久未使用的条目"""
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def key_lock(self, key: Tuple) -> threading.Lock:
+        """同一个键的并发未命中只让一个线程查询数据库"""
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                # 锁表只在缓存条目规模内增长，超出时清理已不在缓存中的键
+                if len(self._key_locks) > self.max_entries * 2:
+                    self._key_locks = {k: v for k, v in self._key_locks.items() if k in self._entries}
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """
+        按标签失效缓存
+
+        Args:
+            tags: 标签列表；以 ":*" 结尾的标签匹配该前缀下的所有标签
+
+        Returns:
+            失效的条目数
+        """
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                if tag.endswith("*"):
+                    prefix = tag[:-1]
+                    matched = [t for t in self._tag_index if t.startswith(prefix)]
+                else:
+                    matched = [tag] if tag in self._tag_index else []
+
+                for matched_tag in matched:
+                    for key in list(self._tag_index.get(matched_tag, ())):
+                        self._remove(key)
+                        removed += 1
+            self._stats["invalidated"] += removed
+        return removed
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            命中、未命中、LRU 淘汰、过期、失效次数以及当前条目数
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+
+_query_cache = QueryCache()
+
+
+def get_query_cache() -> QueryCache:
+    """获取进程内共享的查询缓存"""
+    return _query_cache
+
+
+def _resolve_tags(specs: Iterable[TagSpec], arguments: Dict[str, Any]) -> Tuple[str, ...]:
+    tags = []
+    for spec in specs:
+        if callable(spec):
+            tags.extend(spec(arguments))
+        else:
+            tags.append(spec.format(**arguments))
+    return tuple(tags)
+
+
+@contextmanager
+def memo_scope():
+    """
+    开启一次渲染范围内的查询缓存
+
+    范围内对同一读函数、同一参数的重复调用只查询一次；
+    不在范围内时只使用共享缓存。可以嵌套，嵌套时沿用外层的缓存。
+
+    使用示例:
+        with memo_scope():
+            render_page()
+    """
+    if getattr(_local, "memo", None) is not None:
+        yield
+        return
+
+    _local.memo = {}
+    _local.generation = _generation
+    _local.stats = {"hits": 0, "misses": 0}
+    try:
+        yield
+    finally:
+        _local.memo = None
+
+
+def cached_read(*tags: TagSpec):
+    """
+    读函数装饰器：先查渲染内缓存，再查共享缓存，都未命中时查询数据库
+
+    Args:
+        tags: 结果依赖的数据标签，写函数失效这些标签时结果作废
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            from .connection import get_db_path
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            # 不同数据库文件（如测试时切换工作目录）的结果互不混用
+            key = (get_db_path(), func.__qualname__, tuple(bound.arguments.items()))
+
+            memo = getattr(_local, "memo", None)
+            if memo is not None:
+                if _local.generation != _generation:
+                    memo.clear()
+                    _local.generation = _generation
+                if key in memo:
+                    _local.stats["hits"] += 1
+                    with _lock:
+                        _memo_totals["hits"] += 1
+                    return _copy(memo[key])
+                _local.stats["misses"] += 1
+                with _lock:
+                    _memo_totals["misses"] += 1
+
+            hit, result = _query_cache.get(key)
+            if not hit:
+                with _query_cache.key_lock(key):
+                    # 等锁期间其他线程可能已经填充了缓存
+                    hit, result = _query_cache.get(key, count=False)
+                    if not hit:
+                        generation = _generation
+                        result = func(*args, **kwargs)
+                        entry_tags = _resolve_tags(tags, bound.arguments)
+                        # 检查和写入在 _lock 内完成：invalidate_reads 在同一把锁内递增代数并失效，
+                        # 写入不会落在两者之间而留下旧数据
+                        with _lock:
+                            if generation == _generation:
+                                _query_cache.put(key, result, entry_tags)
+
+            if memo is not None:
+                memo[key] = result
+            return _copy(result)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_reads(*tags: str) -> None:
+    """
+    使缓存的读结果失效
+
+    Args:
+        tags: 受影响的数据标签；不传时清空整个共享缓存
+    """
+    global _generation
+
+    with _lock:
+        _generation += 1
+        if tags:
+            _query_cache.invalidate(tags)
+        else:
+            _query_cache.clear()
+
+
+def invalidates(*tags: TagSpec):
+    """
+    写函数装饰器：执行后（无论成功与否）失效受影响标签的缓存
+
+    Args:
+        tags: 写入影响的数据标签
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate_reads(*_resolve_tags(tags, bound.arguments))
+
+        return wrapper
+
+    return decorator
+
+
+def get_memo_stats() -> Dict[str, int]:
+    """
+    获取查询缓存的命中统计
+
+    Returns:
+        当前渲染范围内的命中/未命中次数（scope_hits、scope_misses），
+        渲染内缓存的累计次数（hits、misses）以及共享缓存的统计（shared_*）
+    """
+    scope = getattr(_local, "stats", None) or {"hits": 0, "misses": 0}
+    with _lock:
+        stats = {
+            "scope_hits": scope["hits"],
+            "scope_misses": scope["misses"],
+            "hits": _memo_totals["hits"],
+            "misses": _memo_totals["misses"],
+        }
+    for name, value in _query_cache.stats().items():
+        stats[f"shared_{name}"] = value
+    return stats
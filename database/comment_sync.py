@@ -0,0 +1,74 @@
+"""
+评论同步状态模块
+记录每个视频的评论同步进度，支持增量同步和中断续传
+
+- high_water: 上次完整同步时见到的最新评论发布时间，之后只需抓取比它更新的评论
+- page_token: 未完成的抓取停在哪一页，下次从这一页继续
+- pending_high_water: 未完成的抓取中见到的最新评论发布时间，完成后成为新的 high_water
+"""
+
+from typing import Dict, Optional
+
+from .connection import get_db_connection
+
+
+def get_comment_sync_state(video_id: str) -> Optional[Dict]:
+    """
+    获取视频的评论同步状态
+
+    Args:
+        video_id: 视频 ID
+
+    Returns:
+        {"page_token", "high_water", "pending_high_water", "fetched", "synced_at", "updated_at"}，
+        从未同步过时返回 None
+    """
+    with get_db_connection() as conn:
+        row = conn.execute("""
+            SELECT page_token, high_water, pending_high_water, fetched, synced_at, updated_at
+            FROM comment_sync_state
+            WHERE video_id = ?
+        """, (video_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def save_comment_sync_state(video_id: str, page_token: Optional[str], high_water: Optional[str],
+                            pending_high_water: Optional[str], fetched: int = 0,
+                            completed: bool = False) -> None:
+    """
+    保存视频的评论同步进度
+
+    Args:
+        video_id: 视频 ID
+        page_token: 下一页的 pageToken，同步完成时为 None
+        high_water: 已完整同步的最新评论发布时间
+        pending_high_water: 本次抓取中见到的最新评论发布时间
+        fetched: 本次新增抓取的评论数（累加到 fetched）
+        completed: 本次是否完整同步，完成时更新 synced_at
+    """
+    with get_db_connection(write=True) as conn:
+        conn.execute("""
+            INSERT INTO comment_sync_state
+                (video_id, page_token, high_water, pending_high_water, fetched, synced_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP END, CURRENT_TIMESTAMP)
+            ON CONFLICT (video_id) DO UPDATE SET
+                page_token = excluded.page_token,
+                high_water = excluded.high_water,
+                pending_high_water = excluded.pending_high_water,
+                fetched = fetched + excluded.fetched,
+                synced_at = COALESCE(excluded.synced_at, synced_at),
+                updated_at = excluded.updated_at
+        """, (video_id, page_token, high_water, pending_high_water, fetched, completed))
+        conn.commit()
+
+
+def reset_comment_sync_state(video_id: str) -> None:
+    """
+    清除视频的评论同步状态，下次同步将从第一页重新全量抓取
+
+    Args:
+        video_id: 视频 ID
+    """
+    with get_db_connection(write=True) as conn:
+        conn.execute("DELETE FROM comment_sync_state WHERE video_id = ?", (video_id,))
+        conn.commit()
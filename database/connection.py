@@ -3,32 +3,633 @@
 封装数据库连接和基础操作
 """
 
+import json
 import sqlite3
 import os
 from contextlib import contextmanager
-from typing import List, Tuple, Any, Optional
+from typing import List, Tuple, Any, Optional, Dict, Sequence
 import streamlit as st
 
+from config import Config
+from .pool import get_pool
+from .cache import cached_read, invalidates
+
+
+def get_db_path() -> str:
+    """
+    获取数据库文件的绝对路径
+    
+    Returns:
+        数据库文件路径
+    """
+    # 在 Streamlit Cloud 上使用绝对路径
+    return os.path.join(os.getcwd(), Config.DB_PATH)
+
 
 @contextmanager
-def get_db_connection():
+def get_db_connection(write: bool = False):
     """
     获取数据库连接上下文管理器
     
+    连接来自进程级连接池，不会在上下文结束时关闭。
+    读操作使用当前线程的读连接；写操作请传入 write=True，
+    使用全局串行化的写连接，避免并发写入时出现 "database is locked"。
+    
+    Args:
+        write: 是否获取写连接
+    
     使用示例:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM videos")
             rows = cursor.fetchall()
     """
-    # 在 Streamlit Cloud 上使用绝对路径
-    db_path = os.path.join(os.getcwd(), "youtube_dashboard.db")
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    pool = get_pool(get_db_path())
+    with (pool.writer() if write else pool.reader()) as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+def get_pool_stats() -> Dict[str, int]:
+    """
+    获取连接池命中统计
+    
+    Returns:
+        连接池计数器字典
+    """
+    return get_pool(get_db_path()).stats()
+
+
+# 写入语句（单条写入与批量写入共用）
+INSERT_VIDEO_SQL = """
+    INSERT OR REPLACE INTO videos 
+    (video_id, title, channel_id, channel_title, thumbnail_url, 
+     published_at, duration, category_id, tags, description)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_STATS_SQL = """
+    INSERT INTO video_stats 
+    (video_id, view_count, like_count, comment_count, favorite_count)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# 按 comment_id 原地更新而不是 INSERT OR REPLACE：保持 comments.id 不变，
+# 全文索引的触发器才能看到删除/更新
+INSERT_COMMENT_SQL = """
+    INSERT INTO comments
+    (video_id, comment_id, author_name, author_channel_url, 
+     like_count, text, published_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (comment_id) DO UPDATE SET
+        video_id = excluded.video_id,
+        author_name = excluded.author_name,
+        author_channel_url = excluded.author_channel_url,
+        like_count = excluded.like_count,
+        text = excluded.text,
+        published_at = excluded.published_at,
+        updated_at = excluded.updated_at
+"""
+
+INSERT_TAG_SQL = """
+    INSERT INTO tags (video_id, tag)
+    VALUES (?, ?)
+"""
+
+# 按 video_stats 重新计算每个视频的最新统计（回填和修复漂移时使用）
+REBUILD_LATEST_STATS_SQL = """
+    INSERT INTO video_latest_stats
+    (video_id, stats_id, view_count, like_count, comment_count, favorite_count, fetch_time)
+    SELECT vs.video_id, vs.id, vs.view_count, vs.like_count, vs.comment_count,
+           vs.favorite_count, vs.fetch_time
+    FROM (SELECT DISTINCT video_id FROM video_stats) d
+    JOIN video_stats vs ON vs.id = (
+        SELECT id FROM video_stats
+        WHERE video_id = d.video_id
+        ORDER BY fetch_time DESC
+        LIMIT 1
+    )
+"""
+
+# 统计汇总表及其时间桶格式（由 video_stats 上的触发器增量维护）
+ROLLUP_TABLES = {
+    "video_stats_hourly": "%Y-%m-%d %H:00:00",
+    "video_stats_daily": "%Y-%m-%d",
+}
+
+# 汇总的指标：列前缀 -> video_stats 中的列
+ROLLUP_METRICS = {
+    "view": "view_count",
+    "like": "like_count",
+    "comment": "comment_count",
+}
+
+
+def _rollup_columns() -> List[str]:
+    """汇总表中各指标的列名（按 min、max、last、sum 顺序）"""
+    return [
+        f"{prefix}_{agg}"
+        for prefix in ROLLUP_METRICS
+        for agg in ("min", "max", "last", "sum")
+    ]
+
+
+def _rollup_table_sql(table: str) -> str:
+    """汇总表建表语句"""
+    metric_columns = ",\n            ".join(f"{name} INTEGER" for name in _rollup_columns())
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            video_id TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            samples INTEGER NOT NULL,
+            {metric_columns},
+            last_fetch_time TIMESTAMP,
+            PRIMARY KEY (video_id, bucket)
+        ) WITHOUT ROWID
+    """
+
+
+def _rollup_trigger_sql(table: str, bucket_format: str) -> str:
+    """新统计写入时把快照合并进对应时间桶的触发器"""
+    values = []
+    updates = []
+    for prefix, column in ROLLUP_METRICS.items():
+        value = f"COALESCE(NEW.{column}, 0)"
+        values += [value] * 4
+        updates += [
+            f"{prefix}_min = MIN({prefix}_min, excluded.{prefix}_min)",
+            f"{prefix}_max = MAX({prefix}_max, excluded.{prefix}_max)",
+            f"{prefix}_last = CASE WHEN excluded.last_fetch_time >= last_fetch_time "
+            f"THEN excluded.{prefix}_last ELSE {prefix}_last END",
+            f"{prefix}_sum = {prefix}_sum + excluded.{prefix}_sum",
+        ]
+
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}
+        AFTER INSERT ON video_stats
+        BEGIN
+            INSERT INTO {table}
+            (video_id, bucket, samples, {", ".join(_rollup_columns())}, last_fetch_time)
+            VALUES (NEW.video_id, strftime('{bucket_format}', NEW.fetch_time), 1,
+                    {", ".join(values)}, NEW.fetch_time)
+            ON CONFLICT (video_id, bucket) DO UPDATE SET
+                samples = samples + 1,
+                {", ".join(updates)},
+                last_fetch_time = MAX(last_fetch_time, excluded.last_fetch_time);
+        END
+    """
+
+
+def rollup_rebuild_sql(table: str, bucket_format: str) -> str:
+    """
+    从 video_stats 重新计算汇总的语句
+    
+    参数为起始时间，只重算该时间之后的时间桶
+    """
+    lasts = ",\n                   ".join(
+        f"LAST_VALUE({column}) OVER w AS {prefix}_last_value"
+        for prefix, column in ROLLUP_METRICS.items()
+    )
+    aggregates = ",\n               ".join(
+        f"MIN(COALESCE({column}, 0)), MAX(COALESCE({column}, 0)), "
+        f"MAX(COALESCE({prefix}_last_value, 0)), SUM(COALESCE({column}, 0))"
+        for prefix, column in ROLLUP_METRICS.items()
+    )
+    return f"""
+        INSERT INTO {table}
+        (video_id, bucket, samples, {", ".join(_rollup_columns())}, last_fetch_time)
+        SELECT video_id, bucket, COUNT(*),
+               {aggregates},
+               MAX(fetch_time)
+        FROM (
+            SELECT video_id, view_count, like_count, comment_count, fetch_time,
+                   strftime('{bucket_format}', fetch_time) AS bucket,
+                   {lasts}
+            FROM video_stats
+            WHERE fetch_time >= ?
+            WINDOW w AS (
+                PARTITION BY video_id, strftime('{bucket_format}', fetch_time)
+                ORDER BY fetch_time, id
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            )
+        )
+        GROUP BY video_id, bucket
+    """
+
+
+# init_database 会为旧数据库补齐这些列
+EXPECTED_COLUMNS = {
+    "videos": {
+        "thumbnail_url": "TEXT",
+        "channel_id": "TEXT",
+        "published_at": "TIMESTAMP",
+        "duration": "TEXT",
+        "category_id": "TEXT",
+        "tags": "TEXT",
+        "description": "TEXT",
+    },
+    "video_stats": {
+        "favorite_count": "INTEGER DEFAULT 0",
+    },
+}
+
+# video_latest_stats 一行的互动率（观看量为 0 时为 0）；排行查询的 ORDER BY 必须与索引表达式一致
+LATEST_ENGAGEMENT_SQL = (
+    "CASE WHEN view_count > 0 "
+    "THEN (COALESCE(like_count, 0) + COALESCE(comment_count, 0)) * 1.0 / view_count ELSE 0 END"
+)
+
+# init_database 维护的二级索引（索引名: (表名, 列定义)）
+MANAGED_INDEXES = {
+    # 观看量、点赞量、评论量、互动率排行：按索引顺序读取前 N 个视频即可停止
+    "idx_latest_stats_views": ("video_latest_stats", "view_count DESC"),
+    "idx_latest_stats_likes": ("video_latest_stats", "like_count DESC"),
+    "idx_latest_stats_comments": ("video_latest_stats", "comment_count DESC"),
+    "idx_latest_stats_engagement": ("video_latest_stats", f"({LATEST_ENGAGEMENT_SQL}) DESC"),
+    # 按频道筛选的排行
+    "idx_videos_channel": ("videos", "channel_title"),
+    # 近期增长排行只扫描窗口内的天汇总（覆盖 MIN/MAX 观看量）
+    "idx_video_stats_daily_bucket": ("video_stats_daily", "bucket, view_min, view_max"),
+    # 按视频取最新统计：覆盖回填最新统计和按时间范围查询历史时的查找与排序
+    "idx_video_stats_video_time": (
+        "video_stats", "video_id, fetch_time DESC, view_count, like_count, comment_count"
+    ),
+    # 按视频取点赞最多的评论
+    "idx_comments_video_likes": ("comments", "video_id, like_count DESC"),
+    # 标签频率统计（覆盖 GROUP BY tag）
+    "idx_tags_tag_video": ("tags", "tag, video_id"),
+    # save_tags / bulk_save_tags 按视频删除旧标签
+    "idx_tags_video": ("tags", "video_id"),
+}
+
+
+def _video_row(video_data: dict) -> tuple:
+    """将视频数据字典转换为 INSERT_VIDEO_SQL 的参数"""
+    tags = video_data.get("tags")
+    if isinstance(tags, (list, tuple)):
+        tags = ",".join(tags)
+    
+    return (
+        video_data.get("video_id"),
+        video_data.get("title"),
+        video_data.get("channel_id"),
+        video_data.get("channel_title"),
+        video_data.get("thumbnail_url"),
+        video_data.get("published_at"),
+        video_data.get("duration"),
+        video_data.get("category_id"),
+        tags,
+        video_data.get("description")
+    )
+
+
+def _stats_row(video_id: str, stats: dict) -> tuple:
+    """将统计数据字典转换为 INSERT_STATS_SQL 的参数"""
+    return (
+        video_id,
+        stats.get("view_count", 0),
+        stats.get("like_count", 0),
+        stats.get("comment_count", 0),
+        stats.get("favorite_count", 0)
+    )
+
+
+def _comment_row(video_id: str, comment_data: dict) -> tuple:
+    """将评论数据字典转换为 INSERT_COMMENT_SQL 的参数"""
+    return (
+        video_id,
+        comment_data.get("comment_id"),
+        comment_data.get("author_name"),
+        comment_data.get("author_channel_url"),
+        comment_data.get("like_count", 0),
+        comment_data.get("text"),
+        comment_data.get("published_at"),
+        comment_data.get("updated_at")
+    )
+
+
+def _ensure_columns(cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]) -> None:
+    """为已存在的表补齐缺失的列"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def _ensure_indexes(cursor: sqlite3.Cursor) -> List[str]:
+    """
+    创建缺失的受管索引
+    
+    Returns:
+        新创建的索引名列表
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    existing = {row[0] for row in cursor.fetchall()}
+    
+    created = []
+    for name, (table, columns) in MANAGED_INDEXES.items():
+        if name not in existing:
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+            created.append(name)
+    return created
+
+
+# 评论全文索引使用的分词器，按顺序尝试：trigram 支持中文等不以空格分词的语言
+# （SQLite 3.34+），不可用时退回 unicode61
+COMMENT_FTS_TOKENIZERS = ("trigram", "unicode61 remove_diacritics 2")
+
+# comments_fts 是以 comments 为外部内容的 FTS5 表（rowid = comments.id），由触发器同步
+COMMENT_FTS_TRIGGERS = {
+    "trg_comments_fts_insert": """
+        AFTER INSERT ON comments
+        BEGIN
+            INSERT INTO comments_fts (rowid, text) VALUES (NEW.id, NEW.text);
+        END
+    """,
+    "trg_comments_fts_delete": """
+        AFTER DELETE ON comments
+        BEGIN
+            INSERT INTO comments_fts (comments_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+        END
+    """,
+    "trg_comments_fts_update": """
+        AFTER UPDATE OF text ON comments
+        WHEN OLD.text IS NOT NEW.text
+        BEGIN
+            INSERT INTO comments_fts (comments_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+            INSERT INTO comments_fts (rowid, text) VALUES (NEW.id, NEW.text);
+        END
+    """,
+}
+
+
+# comment_terms 中全部视频合计的词频使用的 video_id
+GLOBAL_TERMS_KEY = ""
+
+
+def _comment_terms_delta_sql(row: str, sign: str) -> str:
+    """把 comment_enrichment 一行（NEW/OLD）的分词结果加到（sign 为 "+"）或减出（"-"）该视频和全局的词频"""
+    return f"""
+            INSERT INTO comment_terms (video_id, term, count)
+            SELECT v.video_id, t.value, {sign}COUNT(*)
+            FROM (SELECT video_id FROM comments WHERE id = {row}.comment_id
+                  UNION ALL SELECT '{GLOBAL_TERMS_KEY}') v,
+                 json_each({row}.tokens) t
+            GROUP BY v.video_id, t.value
+            ON CONFLICT (video_id, term) DO UPDATE SET count = count + excluded.count;"""
+
+
+def _comment_terms_prune_sql(row: str) -> str:
+    return f"""
+            DELETE FROM comment_terms
+            WHERE video_id IN ((SELECT video_id FROM comments WHERE id = {row}.comment_id), '{GLOBAL_TERMS_KEY}')
+                AND term IN (SELECT value FROM json_each({row}.tokens))
+                AND count <= 0;"""
+
+
+def _comment_terms_bump_sql(row: str) -> str:
+    return f"""
+            INSERT INTO comment_term_versions (video_id, version)
+            SELECT video_id, 1 FROM comments WHERE id = {row}.comment_id
+            UNION ALL SELECT '{GLOBAL_TERMS_KEY}', 1
+            ON CONFLICT (video_id) DO UPDATE SET version = version + 1;"""
+
+
+# comment_terms 按视频（及全局）累计 comment_enrichment.tokens 中的词频，
+# 由 comment_enrichment 上的触发器按分词结果的增减维护；每次变化递增 comment_term_versions
+COMMENT_TERM_TRIGGERS = {
+    "trg_comment_enrichment_terms_insert": f"""
+        AFTER INSERT ON comment_enrichment
+        WHEN NEW.tokens != '[]'
+        BEGIN{_comment_terms_delta_sql("NEW", "+")}{_comment_terms_bump_sql("NEW")}
+        END
+    """,
+    "trg_comment_enrichment_terms_delete": f"""
+        AFTER DELETE ON comment_enrichment
+        WHEN OLD.tokens != '[]'
+        BEGIN{_comment_terms_delta_sql("OLD", "-")}{_comment_terms_prune_sql("OLD")}{_comment_terms_bump_sql("OLD")}
+        END
+    """,
+    "trg_comment_enrichment_terms_update": f"""
+        AFTER UPDATE OF tokens ON comment_enrichment
+        WHEN OLD.tokens IS NOT NEW.tokens
+        BEGIN{_comment_terms_delta_sql("OLD", "-")}{_comment_terms_delta_sql("NEW", "+")}{_comment_terms_prune_sql("OLD")}{_comment_terms_bump_sql("NEW")}
+        END
+    """,
+}
+
+# 按 comment_enrichment 重新计算全部词频（回填和修复漂移时使用），并递增所有版本号
+REBUILD_COMMENT_TERMS_SQL = (
+    f"""
+    INSERT INTO comment_terms (video_id, term, count)
+    SELECT c.video_id, t.value, COUNT(*)
+    FROM comment_enrichment e
+    JOIN comments c ON c.id = e.comment_id, json_each(e.tokens) t
+    GROUP BY c.video_id, t.value
+    """,
+    f"""
+    INSERT INTO comment_terms (video_id, term, count)
+    SELECT '{GLOBAL_TERMS_KEY}', term, SUM(count) FROM comment_terms
+    WHERE video_id != '{GLOBAL_TERMS_KEY}'
+    GROUP BY term
+    """,
+    f"""
+    INSERT INTO comment_term_versions (video_id, version)
+    SELECT video_id, 1 FROM (SELECT DISTINCT video_id FROM comment_terms UNION SELECT '{GLOBAL_TERMS_KEY}')
+    WHERE true
+    ON CONFLICT (video_id) DO UPDATE SET version = version + 1
+    """,
+)
+
+
+# video_kpi_rollup 按 (频道, 是否监控中, 添加日期) 汇总视频数和最新统计，
+# 概览指标只需读取汇总行，耗时与视频总数无关
+VIDEO_KPI_KEYS = ("channel_title", "is_active", "added_date")
+
+# 汇总的指标：列名 -> 由视频行 v 和最新统计行 l 计算单个视频贡献值的表达式
+VIDEO_KPI_MEASURES = {
+    "video_count": "v.videos",
+    "stats_count": "COALESCE(l.has_stats, 0)",
+    "view_count": "COALESCE(l.view_count, 0)",
+    "like_count": "COALESCE(l.like_count, 0)",
+    "comment_count": "COALESCE(l.comment_count, 0)",
+    # 各视频互动率之和（观看量为 0 的视频计为 0），除以视频数即平均互动率
+    "engagement_sum": "CASE WHEN l.view_count > 0 THEN "
+                      "(COALESCE(l.like_count, 0) + COALESCE(l.comment_count, 0)) * 1.0 / l.view_count "
+                      "ELSE 0 END",
+}
+
+_VIDEO_KPI_KEY_EXPRESSIONS = (
+    "COALESCE(v.channel_title, '')",
+    "COALESCE(v.is_active, 1)",
+    "COALESCE(date(v.added_at), '')",
+)
+
+
+def _video_kpi_delta_sql(source: str, sign: str) -> str:
+    """
+    把 source 中视频的贡献加到（sign 为 "+"）或减出（"-"）汇总行
+
+    source 是 FROM 子句，需提供视频行 v（channel_title、is_active、added_at、videos：计入的视频数）
+    和最新统计行 l（has_stats、view_count、like_count、comment_count）
+    """
+    columns = ", ".join(VIDEO_KPI_KEYS + tuple(VIDEO_KPI_MEASURES))
+    values = ", ".join(_VIDEO_KPI_KEY_EXPRESSIONS + tuple(
+        f"{sign}({expression})" for expression in VIDEO_KPI_MEASURES.values()
+    ))
+    updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in VIDEO_KPI_MEASURES)
+    return f"""
+            INSERT INTO video_kpi_rollup ({columns})
+            SELECT {values}
+            FROM {source}
+            WHERE true
+            ON CONFLICT ({", ".join(VIDEO_KPI_KEYS)}) DO UPDATE SET {updates};"""
+
+
+def _video_kpi_prune_sql(row: str) -> str:
+    return f"""
+            DELETE FROM video_kpi_rollup
+            WHERE channel_title = COALESCE({row}.channel_title, '')
+                AND is_active = COALESCE({row}.is_active, 1)
+                AND added_date = COALESCE(date({row}.added_at), '')
+                AND video_count <= 0;"""
+
+
+def _video_source(video: str, video_id: str) -> str:
+    """videos 触发器的数据来源：video 查询给出的视频行及该视频当前的最新统计"""
+    return f"""({video}) v
+            LEFT JOIN (SELECT 1 AS has_stats, view_count, like_count, comment_count
+                       FROM video_latest_stats WHERE video_id = {video_id}) l ON true"""
+
+
+def _video_row_source(row: str) -> str:
+    return _video_source(
+        f"SELECT {row}.channel_title AS channel_title, {row}.is_active AS is_active, "
+        f"{row}.added_at AS added_at, 1 AS videos",
+        f"{row}.video_id",
+    )
+
+
+def _stats_row_source(row: str) -> str:
+    """video_latest_stats 触发器的数据来源：NEW/OLD 统计及其所属视频（不计视频数）"""
+    return f"""(SELECT channel_title, is_active, added_at, 0 AS videos
+                  FROM videos WHERE video_id = {row}.video_id) v,
+                 (SELECT 1 AS has_stats, {row}.view_count AS view_count, {row}.like_count AS like_count,
+                         {row}.comment_count AS comment_count) l"""
+
+
+# 视频增删、修改频道/状态/添加时间，以及最新统计变化时增量维护 video_kpi_rollup。
+# INSERT OR REPLACE 替换视频时不会触发删除触发器，由插入前触发器先减出被替换的旧行
+VIDEO_KPI_TRIGGERS = {
+    "trg_videos_kpi_replace": f"""
+        BEFORE INSERT ON videos
+        WHEN EXISTS (SELECT 1 FROM videos WHERE video_id = NEW.video_id)
+        BEGIN{_video_kpi_delta_sql(_video_source(
+            "SELECT channel_title, is_active, added_at, 1 AS videos FROM videos WHERE video_id = NEW.video_id",
+            "NEW.video_id"), "-")}
+            DELETE FROM video_kpi_rollup
+            WHERE video_count <= 0
+                AND (channel_title, is_active, added_date) IN (
+                    SELECT COALESCE(channel_title, ''), COALESCE(is_active, 1), COALESCE(date(added_at), '')
+                    FROM videos WHERE video_id = NEW.video_id
+                );
+        END
+    """,
+    "trg_videos_kpi_insert": f"""
+        AFTER INSERT ON videos
+        BEGIN{_video_kpi_delta_sql(_video_row_source("NEW"), "+")}
+        END
+    """,
+    "trg_videos_kpi_delete": f"""
+        AFTER DELETE ON videos
+        BEGIN{_video_kpi_delta_sql(_video_row_source("OLD"), "-")}{_video_kpi_prune_sql("OLD")}
+        END
+    """,
+    "trg_videos_kpi_update": f"""
+        AFTER UPDATE OF channel_title, is_active, added_at ON videos
+        WHEN OLD.channel_title IS NOT NEW.channel_title
+            OR OLD.is_active IS NOT NEW.is_active
+            OR OLD.added_at IS NOT NEW.added_at
+        BEGIN{_video_kpi_delta_sql(_video_row_source("OLD"), "-")}{_video_kpi_delta_sql(_video_row_source("NEW"), "+")}{_video_kpi_prune_sql("OLD")}
+        END
+    """,
+    "trg_latest_stats_kpi_insert": f"""
+        AFTER INSERT ON video_latest_stats
+        BEGIN{_video_kpi_delta_sql(_stats_row_source("NEW"), "+")}
+        END
+    """,
+    "trg_latest_stats_kpi_delete": f"""
+        AFTER DELETE ON video_latest_stats
+        BEGIN{_video_kpi_delta_sql(_stats_row_source("OLD"), "-")}
+        END
+    """,
+    "trg_latest_stats_kpi_update": f"""
+        AFTER UPDATE OF view_count, like_count, comment_count ON video_latest_stats
+        WHEN OLD.view_count IS NOT NEW.view_count
+            OR OLD.like_count IS NOT NEW.like_count
+            OR OLD.comment_count IS NOT NEW.comment_count
+        BEGIN{_video_kpi_delta_sql(_stats_row_source("OLD"), "-")}{_video_kpi_delta_sql(_stats_row_source("NEW"), "+")}
+        END
+    """,
+}
+
+# 按 videos 和 video_latest_stats 重新计算概览汇总（回填和修复漂移时使用）
+REBUILD_VIDEO_KPIS_SQL = f"""
+    INSERT INTO video_kpi_rollup ({", ".join(VIDEO_KPI_KEYS + tuple(VIDEO_KPI_MEASURES))})
+    SELECT {", ".join(_VIDEO_KPI_KEY_EXPRESSIONS)},
+           {", ".join(f"SUM({expression})" for expression in VIDEO_KPI_MEASURES.values())}
+    FROM (SELECT video_id, channel_title, is_active, added_at, 1 AS videos FROM videos) v
+    LEFT JOIN (SELECT video_id, 1 AS has_stats, view_count, like_count, comment_count
+               FROM video_latest_stats) l ON l.video_id = v.video_id
+    GROUP BY {", ".join(_VIDEO_KPI_KEY_EXPRESSIONS)}
+"""
+
+def get_comment_fts_tokenizer(cursor) -> Optional[str]:
+    """
+    查看评论全文索引使用的分词器
+    
+    Args:
+        cursor: 数据库游标或连接
+    
+    Returns:
+        "trigram" / "unicode61"，没有全文索引（SQLite 未编译 FTS5）时返回 None
+    """
+    row = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'comments_fts'"
+    ).fetchone()
+    if row is None:
+        return None
+    return "trigram" if "trigram" in row[0] else "unicode61"
+
+
+def _ensure_comment_fts(cursor: sqlite3.Cursor) -> Optional[str]:
+    """
+    创建评论全文索引和同步触发器，新建时从现有评论回填
+    
+    Returns:
+        使用的分词器，SQLite 不支持 FTS5 时返回 None
+    """
+    tokenizer = get_comment_fts_tokenizer(cursor)
+    if tokenizer is None:
+        for candidate in COMMENT_FTS_TOKENIZERS:
+            try:
+                cursor.execute(f"""
+                CREATE VIRTUAL TABLE comments_fts USING fts5(
+                    text, content = 'comments', content_rowid = 'id', tokenize = '{candidate}'
+                )
+                """)
+            except sqlite3.OperationalError:
+                continue
+            cursor.execute("INSERT INTO comments_fts (comments_fts) VALUES ('rebuild')")
+            tokenizer = candidate.split()[0]
+            break
+        else:
+            return None
+    
+    for name, body in COMMENT_FTS_TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    return tokenizer
 
 
 def init_database():
@@ -38,7 +639,7 @@ def init_database():
     如果表不存在，则创建必要的表
     如果表存在但缺少列，则自动添加缺失的列
     """
-    with get_db_connection() as conn:
+    with get_db_connection(write=True) as conn:
         cursor = conn.cursor()
         
         # 创建视频表
@@ -67,6 +668,23 @@ def init_database():
         )
         """)
         
+        # 创建最新统计表（每个视频一行，由下方触发器在写入统计时维护）
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_latest_stats'")
+        needs_backfill = cursor.fetchone() is None
+        
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS video_latest_stats (
+            video_id TEXT PRIMARY KEY,
+            stats_id INTEGER NOT NULL,
+            view_count INTEGER,
+            like_count INTEGER,
+            comment_count INTEGER,
+            favorite_count INTEGER,
+            fetch_time TIMESTAMP,
+            FOREIGN KEY (video_id) REFERENCES videos(video_id)
+        )
+        """)
+        
         # 创建预警表
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS alerts (
@@ -82,9 +700,227 @@ def init_database():
         )
         """)
         
+        # 创建评论表
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            video_id TEXT NOT NULL,
+            comment_id TEXT UNIQUE,
+            author_name TEXT,
+            author_channel_url TEXT,
+            like_count INTEGER,
+            text TEXT,
+            published_at TEXT,
+            updated_at TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (video_id) REFERENCES videos(video_id)
+        )
+        """)
+        
+        # 创建标签表
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            video_id TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (video_id) REFERENCES videos(video_id)
+        )
+        """)
+        
+        # 创建 API 配额账本表
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS api_quota_ledger (
+            quota_date TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            units INTEGER NOT NULL DEFAULT 0,
+            calls INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (quota_date, endpoint)
+        )
+        """)
+        
+        # 创建任务锁表（后台轮询器等单实例任务的租约锁）
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_locks (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            acquired_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """)
+        
+        # 创建评论同步状态表（增量同步的高水位和中断续传的分页 token）
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS comment_sync_state (
+            video_id TEXT PRIMARY KEY,
+            page_token TEXT,
+            high_water TEXT,
+            pending_high_water TEXT,
+            fetched INTEGER DEFAULT 0,
+            synced_at TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        
+        # 创建评论预处理表（comment_id 对应 comments.id）：分词结果（JSON 数组）、语言和情感打分，
+        # 分词规则和情感词典各自带版本号，版本落后的行由后台重新计算
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS comment_enrichment (
+            comment_id INTEGER PRIMARY KEY,
+            token_version INTEGER NOT NULL,
+            lexicon_version INTEGER NOT NULL,
+            language TEXT,
+            tokens TEXT NOT NULL DEFAULT '[]',
+            positive INTEGER NOT NULL,
+            negative INTEGER NOT NULL,
+            score REAL NOT NULL
+        )
+        """)
+        # 创建评论词频表（video_id 为 GLOBAL_TERMS_KEY 的行是全部视频的合计）和词频版本表，
+        # 由 comment_enrichment 上的触发器维护；新建时从已有的分词结果回填
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'comment_terms'")
+        needs_terms_backfill = cursor.fetchone() is None
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS comment_terms (
+            video_id TEXT NOT NULL,
+            term TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (video_id, term)
+        ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS comment_term_versions (
+            video_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+        
+        # 创建概览汇总表（由 videos 和 video_latest_stats 上的触发器维护），新建时从现有数据回填
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_kpi_rollup'")
+        needs_kpi_backfill = cursor.fetchone() is None
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS video_kpi_rollup (
+            channel_title TEXT NOT NULL,
+            is_active INTEGER NOT NULL,
+            added_date TEXT NOT NULL,
+            video_count INTEGER NOT NULL,
+            stats_count INTEGER NOT NULL,
+            view_count INTEGER NOT NULL,
+            like_count INTEGER NOT NULL,
+            comment_count INTEGER NOT NULL,
+            engagement_sum REAL NOT NULL,
+            PRIMARY KEY (channel_title, is_active, added_date)
+        ) WITHOUT ROWID
+        """)
+        
+        # 旧版本只缓存情感打分的表已并入 comment_enrichment
+        cursor.execute("DROP TRIGGER IF EXISTS trg_comments_sentiment_update")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_comments_sentiment_delete")
+        cursor.execute("DROP TABLE IF EXISTS comment_sentiment")
+        
+        # 补齐旧数据库缺失的列
+        for table, columns in EXPECTED_COLUMNS.items():
+            _ensure_columns(cursor, table, columns)
+        
+        # 新统计写入时更新最新统计（同一时间戳以后写入的为准）
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_video_stats_latest_insert
+        AFTER INSERT ON video_stats
+        BEGIN
+            INSERT INTO video_latest_stats
+            (video_id, stats_id, view_count, like_count, comment_count, favorite_count, fetch_time)
+            VALUES (NEW.video_id, NEW.id, NEW.view_count, NEW.like_count,
+                    NEW.comment_count, NEW.favorite_count, NEW.fetch_time)
+            ON CONFLICT (video_id) DO UPDATE SET
+                stats_id = excluded.stats_id,
+                view_count = excluded.view_count,
+                like_count = excluded.like_count,
+                comment_count = excluded.comment_count,
+                favorite_count = excluded.favorite_count,
+                fetch_time = excluded.fetch_time
+            WHERE excluded.fetch_time >= COALESCE(video_latest_stats.fetch_time, '');
+        END
+        """)
+        
+        # 删除的恰好是最新统计时，从剩余记录中重新取最新一条
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_video_stats_latest_delete
+        AFTER DELETE ON video_stats
+        WHEN OLD.id = (SELECT stats_id FROM video_latest_stats WHERE video_id = OLD.video_id)
+        BEGIN
+            DELETE FROM video_latest_stats WHERE video_id = OLD.video_id;
+            INSERT INTO video_latest_stats
+            (video_id, stats_id, view_count, like_count, comment_count, favorite_count, fetch_time)
+            SELECT video_id, id, view_count, like_count, comment_count, favorite_count, fetch_time
+            FROM video_stats
+            WHERE video_id = OLD.video_id
+            ORDER BY fetch_time DESC
+            LIMIT 1;
+        END
+        """)
+        
+        if needs_backfill:
+            cursor.execute(REBUILD_LATEST_STATS_SQL)
+        
+        for name, body in VIDEO_KPI_TRIGGERS.items():
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        if needs_kpi_backfill:
+            cursor.execute(REBUILD_VIDEO_KPIS_SQL)
+        
+        # 评论文本被修改或评论被删除时，作废对应的预处理结果
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_comments_enrichment_update
+        AFTER UPDATE OF text ON comments
+        WHEN OLD.text IS NOT NEW.text
+        BEGIN
+            DELETE FROM comment_enrichment WHERE comment_id = OLD.id;
+        END
+        """)
+        # 删除前触发：词频触发器需要通过 comments 查到所属视频
+        cursor.execute("""
+        SELECT 1 FROM sqlite_master
+        WHERE type = 'trigger' AND name = 'trg_comments_enrichment_delete' AND sql LIKE '%AFTER DELETE%'
+        """)
+        if cursor.fetchone() is not None:
+            cursor.execute("DROP TRIGGER trg_comments_enrichment_delete")
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_comments_enrichment_delete
+        BEFORE DELETE ON comments
+        BEGIN
+            DELETE FROM comment_enrichment WHERE comment_id = OLD.id;
+        END
+        """)
+        
+        for name, body in COMMENT_TERM_TRIGGERS.items():
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        if needs_terms_backfill:
+            for statement in REBUILD_COMMENT_TERMS_SQL:
+                cursor.execute(statement)
+        
+        # 创建小时/天汇总表和维护触发器，新建的汇总表从现有历史统计回填
+        for table, bucket_format in ROLLUP_TABLES.items():
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            rollup_exists = cursor.fetchone() is not None
+            
+            cursor.execute(_rollup_table_sql(table))
+            cursor.execute(_rollup_trigger_sql(table, bucket_format))
+            
+            if not rollup_exists:
+                cursor.execute(rollup_rebuild_sql(table, bucket_format), ("",))
+        
+        # 创建评论全文索引
+        _ensure_comment_fts(cursor)
+        
+        # 创建缺失的索引，并让查询规划器拿到新索引的统计信息
+        if _ensure_indexes(cursor):
+            cursor.execute("PRAGMA analysis_limit = 1000")
+            cursor.execute("ANALYZE")
+        
         conn.commit()
 
 
+@cached_read("videos")
 def get_video_ids() -> List[str]:
     """
     获取所有视频 ID
@@ -99,6 +935,7 @@ def get_video_ids() -> List[str]:
         return [row[0] for row in rows]
 
 
+@cached_read("videos", "stats")
 def get_videos() -> List[Tuple[Any, ...]]:
     """
     获取所有视频信息
@@ -113,16 +950,13 @@ def get_videos() -> List[Tuple[Any, ...]]:
                 v.video_id, v.title, v.channel_title, v.added_at, 
                 vs.view_count, vs.like_count, vs.comment_count
             FROM videos v
-            LEFT JOIN (
-                SELECT video_id, view_count, like_count, comment_count,
-                       ROW_NUMBER() OVER (PARTITION BY video_id ORDER BY fetch_time DESC) as rn
-                FROM video_stats
-            ) vs ON v.video_id = vs.video_id AND vs.rn = 1
+            LEFT JOIN video_latest_stats vs ON vs.video_id = v.video_id
             ORDER BY v.added_at DESC
         """)
         return cursor.fetchall()
 
 
+@cached_read("video:{video_id}")
 def get_video_info(video_id: str) -> Optional[sqlite3.Row]:
     """
     获取单个视频信息
@@ -140,6 +974,7 @@ def get_video_info(video_id: str) -> Optional[sqlite3.Row]:
         return dict(row) if row else None
 
 
+@cached_read("stats:{video_id}")
 def get_latest_stats(video_id: str) -> Optional[sqlite3.Row]:
     """
     获取视频的最新统计数据
@@ -153,43 +988,138 @@ def get_latest_stats(video_id: str) -> Optional[sqlite3.Row]:
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT * FROM video_stats 
-            WHERE video_id = ? 
-            ORDER BY fetch_time DESC 
-            LIMIT 1
+            SELECT vs.* FROM video_latest_stats l
+            JOIN video_stats vs ON vs.id = l.stats_id
+            WHERE l.video_id = ?
         """, (video_id,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
 
-def get_video_stats_history(video_id: str, days: int = 30) -> List[Tuple[Any, ...]]:
+# get_video_comparison 返回的列
+COMPARISON_COLUMNS = (
+    "video_id", "title", "channel_title", "published_at",
+    "view_count", "like_count", "comment_count", "favorite_count", "fetch_time",
+)
+
+
+def get_video_comparison(video_ids: Sequence[str]) -> Dict[str, List[Any]]:
+    """
+    批量获取多个视频的信息和最新统计（一次查询）
+    
+    Args:
+        video_ids: 视频 ID 序列，重复的 ID 只保留第一次出现
+    
+    Returns:
+        按列组织的数据 {列名: 值列表}，列见 COMPARISON_COLUMNS，顺序与 video_ids 一致；
+        不存在的视频被跳过，没有统计的视频统计列为 None
+    """
+    return _load_video_comparison(tuple(dict.fromkeys(video_ids)))
+
+
+@cached_read("videos", "stats")
+def _load_video_comparison(video_ids: Tuple[str, ...]) -> Dict[str, List[Any]]:
+    columns = {name: [] for name in COMPARISON_COLUMNS}
+    if not video_ids:
+        return columns
+    
+    # ID 集合作为一个 JSON 数组参数传入，不受 SQLite 参数个数限制
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT v.video_id, v.title, v.channel_title, v.published_at,
+                   l.view_count, l.like_count, l.comment_count, l.favorite_count, l.fetch_time
+            FROM json_each(?) j
+            JOIN videos v ON v.video_id = j.value
+            LEFT JOIN video_latest_stats l ON l.video_id = v.video_id
+            ORDER BY j.key
+        """, (json.dumps(video_ids),))
+        for row in cursor.fetchall():
+            for name in COMPARISON_COLUMNS:
+                columns[name].append(row[name])
+    return columns
+
+
+@cached_read("stats:{video_id}")
+def get_video_stats_history(video_id: str, days: int = 30,
+                            granularity: str = None) -> List[Tuple[Any, ...]]:
     """
     获取视频统计数据历史
     
+    从汇总表读取，不扫描原始快照：
+    范围不超过 Config.STATS_HOURLY_MAX_RANGE_DAYS 天时按小时返回，否则按天返回
+    
     Args:
         video_id: 视频 ID
         days: 获取最近多少天的数据
+        granularity: 强制指定粒度，"hour" 或 "day"
     
     Returns:
-        统计数据历史列表
+        统计数据历史列表（时间, 平均观看量, 平均点赞量, 平均评论量）
     """
+    if granularity is None:
+        granularity = "hour" if days <= Config.STATS_HOURLY_MAX_RANGE_DAYS else "day"
+    
+    if granularity == "hour":
+        table = "video_stats_hourly"
+        since_sql = "strftime('%Y-%m-%d %H:00:00', 'now', ? || ' days')"
+    else:
+        table = "video_stats_daily"
+        since_sql = "DATE('now', ? || ' days')"
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
-                DATE(fetch_time) as date,
-                AVG(view_count) as avg_views,
-                AVG(like_count) as avg_likes,
-                AVG(comment_count) as avg_comments
-            FROM video_stats
+                bucket as date,
+                CAST(view_sum AS REAL) / samples as avg_views,
+                CAST(like_sum AS REAL) / samples as avg_likes,
+                CAST(comment_sum AS REAL) / samples as avg_comments
+            FROM {table}
             WHERE video_id = ? 
-                AND fetch_time >= DATE('now', ? || ' days')
-            GROUP BY DATE(fetch_time)
-            ORDER BY date ASC
+                AND bucket >= {since_sql}
+            ORDER BY bucket ASC
         """, (video_id, -days))
         return cursor.fetchall()
 
 
+def get_active_video_activity(window_hours: int = 24) -> List[sqlite3.Row]:
+    """
+    获取所有监控中视频（is_active = 1）的最新统计和近期观看量增长
+    
+    供后台轮询器决定刷新频率，不经过查询缓存
+    
+    Args:
+        window_hours: 计算增长时回看的小时数
+    
+    Returns:
+        每个视频一行: video_id, published_at, added_at, view_count, fetch_time,
+        baseline_views, baseline_time（窗口内最早一次快照的观看量和时间）
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # 子查询按 (video_id, fetch_time) 索引定位窗口内的第一条快照
+        cursor.execute("""
+            SELECT
+                v.video_id, v.published_at, v.added_at,
+                l.view_count, l.fetch_time,
+                b.view_count AS baseline_views,
+                b.fetch_time AS baseline_time
+            FROM videos v
+            LEFT JOIN video_latest_stats l ON l.video_id = v.video_id
+            LEFT JOIN video_stats b ON b.id = (
+                SELECT id FROM video_stats
+                WHERE video_id = v.video_id
+                    AND fetch_time >= datetime('now', ? || ' hours')
+                ORDER BY fetch_time
+                LIMIT 1
+            )
+            WHERE v.is_active = 1
+        """, (-window_hours,))
+        return cursor.fetchall()
+
+
+@invalidates(lambda args: ["videos", f"video:{args['video_data'].get('video_id')}"])
 def add_video(video_data: dict) -> bool:
     """
     添加视频
@@ -201,25 +1131,9 @@ def add_video(video_data: dict) -> bool:
         是否成功
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO videos 
-                (video_id, title, channel_id, channel_title, thumbnail_url, 
-                 published_at, duration, category_id, tags, description)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                video_data.get("video_id"),
-                video_data.get("title"),
-                video_data.get("channel_id"),
-                video_data.get("channel_title"),
-                video_data.get("thumbnail_url"),
-                video_data.get("published_at"),
-                video_data.get("duration"),
-                video_data.get("category_id"),
-                video_data.get("tags"),
-                video_data.get("description")
-            ))
+            cursor.execute(INSERT_VIDEO_SQL, _video_row(video_data))
             conn.commit()
             return True
     except Exception as e:
@@ -227,6 +1141,7 @@ def add_video(video_data: dict) -> bool:
         return False
 
 
+@invalidates("stats", "stats:{video_id}")
 def save_video_stats(video_id: str, stats: dict) -> bool:
     """
     保存视频统计数据
@@ -239,19 +1154,9 @@ def save_video_stats(video_id: str, stats: dict) -> bool:
         是否成功
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO video_stats 
-                (video_id, view_count, like_count, comment_count, favorite_count)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                video_id,
-                stats.get("view_count", 0),
-                stats.get("like_count", 0),
-                stats.get("comment_count", 0),
-                stats.get("favorite_count", 0)
-            ))
+            cursor.execute(INSERT_STATS_SQL, _stats_row(video_id, stats))
             conn.commit()
             return True
     except Exception as e:
@@ -259,6 +1164,7 @@ def save_video_stats(video_id: str, stats: dict) -> bool:
         return False
 
 
+@cached_read("comments:{video_id}")
 def get_comments(video_id: str, limit: int = 100) -> List[Tuple[Any, ...]]:
     """
     获取视频评论
@@ -281,6 +1187,32 @@ def get_comments(video_id: str, limit: int = 100) -> List[Tuple[Any, ...]]:
         return cursor.fetchall()
 
 
+@cached_read("comments:{video_id}")
+def get_comment_authors(video_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    按评论数统计视频的评论者
+    
+    Args:
+        video_id: 视频 ID
+        limit: 返回数量
+    
+    Returns:
+        [{"author_name", "comment_count", "channel_url"}]，按评论数降序
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT author_name, COUNT(*) AS comment_count, MIN(author_channel_url) AS channel_url
+            FROM comments
+            WHERE video_id = ?
+            GROUP BY author_name
+            ORDER BY comment_count DESC, author_name
+            LIMIT ?
+        """, (video_id, limit))
+        return [dict(row) for row in cursor.fetchall()]
+
+
+@invalidates("comments:{video_id}")
 def save_comment(video_id: str, comment_data: dict) -> bool:
     """
     保存评论
@@ -293,23 +1225,9 @@ def save_comment(video_id: str, comment_data: dict) -> bool:
         是否成功
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO comments
-                (video_id, comment_id, author_name, author_channel_url, 
-                 like_count, text, published_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                video_id,
-                comment_data.get("comment_id"),
-                comment_data.get("author_name"),
-                comment_data.get("author_channel_url"),
-                comment_data.get("like_count", 0),
-                comment_data.get("text"),
-                comment_data.get("published_at"),
-                comment_data.get("updated_at")
-            ))
+            cursor.execute(INSERT_COMMENT_SQL, _comment_row(video_id, comment_data))
             conn.commit()
             return True
     except Exception as e:
@@ -317,6 +1235,7 @@ def save_comment(video_id: str, comment_data: dict) -> bool:
         return False
 
 
+@invalidates("tags")
 def save_tags(video_id: str, tags: List[str]) -> bool:
     """
     保存视频标签
@@ -329,17 +1248,13 @@ def save_tags(video_id: str, tags: List[str]) -> bool:
         是否成功
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
             # 删除旧标签
             cursor.execute("DELETE FROM tags WHERE video_id = ?", (video_id,))
             
             # 插入新标签
-            for tag in tags:
-                cursor.execute("""
-                    INSERT INTO tags (video_id, tag)
-                    VALUES (?, ?)
-                """, (video_id, tag))
+            cursor.executemany(INSERT_TAG_SQL, [(video_id, tag) for tag in tags])
             
             conn.commit()
             return True
@@ -348,6 +1263,7 @@ def save_tags(video_id: str, tags: List[str]) -> bool:
         return False
 
 
+@cached_read("tags")
 def get_all_tags(limit: int = 50) -> List[Tuple[Any, ...]]:
     """
     获取所有标签及其出现频率
@@ -370,6 +1286,7 @@ def get_all_tags(limit: int = 50) -> List[Tuple[Any, ...]]:
         return cursor.fetchall()
 
 
+@invalidates("alerts")
 def create_alert(video_id: str, alert_type: str, threshold_value: int, 
                  current_value: int, message: str) -> bool:
     """
@@ -386,7 +1303,7 @@ def create_alert(video_id: str, alert_type: str, threshold_value: int,
         是否成功
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO alerts
@@ -400,6 +1317,7 @@ def create_alert(video_id: str, alert_type: str, threshold_value: int,
         return False
 
 
+@cached_read("alerts", "videos")
 def get_unread_alerts() -> List[Tuple[Any, ...]]:
     """
     获取未读预警
@@ -419,6 +1337,7 @@ def get_unread_alerts() -> List[Tuple[Any, ...]]:
         return cursor.fetchall()
 
 
+@invalidates("alerts")
 def mark_alert_as_read(alert_id: int) -> bool:
     """
     标记预警为已读
@@ -430,7 +1349,7 @@ def mark_alert_as_read(alert_id: int) -> bool:
         是否成功
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute("UPDATE alerts SET is_read = 1 WHERE id = ?", (alert_id,))
             conn.commit()
@@ -0,0 +1,247 @@
+"""
+评论预处理存储模块
+comment_enrichment 表按 comments.id 保存每条评论的分词结果、语言和情感打分，
+分析页面直接用 SQL 汇总这些列，不再重复读取和处理评论文本。
+
+每行记录分词规则版本（token_version）和情感词典版本（lexicon_version），
+任一版本落后于当前代码时视为待处理。评论文本被修改或评论被删除时，触发器会删除对应的行。
+"""
+
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from .connection import get_db_connection, GLOBAL_TERMS_KEY
+
+ENRICHMENT_COLUMNS = ("token_version", "lexicon_version", "language", "tokens",
+                      "positive", "negative", "score")
+
+_UPSERT_SET = ",\n        ".join(f"{column} = excluded.{column}" for column in ENRICHMENT_COLUMNS)
+
+UPSERT_ENRICHMENT_SQL = f"""
+    INSERT INTO comment_enrichment (comment_id, {", ".join(ENRICHMENT_COLUMNS)})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (comment_id) DO UPDATE SET
+        {_UPSERT_SET}
+"""
+
+# 按 YouTube 评论 ID 写入（入库时还不知道 comments.id）
+UPSERT_ENRICHMENT_BY_KEY_SQL = f"""
+    INSERT INTO comment_enrichment (comment_id, {", ".join(ENRICHMENT_COLUMNS)})
+    SELECT id, ?, ?, ?, ?, ?, ?, ? FROM comments WHERE comment_id = ?
+    ON CONFLICT (comment_id) DO UPDATE SET
+        {_UPSERT_SET}
+"""
+
+
+def _enrichment_rows(enriched: pd.DataFrame, token_version: int, lexicon_version: int) -> List[tuple]:
+    count = len(enriched)
+    return list(zip(
+        [token_version] * count,
+        [lexicon_version] * count,
+        enriched["language"].tolist(),
+        enriched["tokens"].tolist(),
+        enriched["positive"].tolist(),
+        enriched["negative"].tolist(),
+        enriched["score"].tolist(),
+    ))
+
+
+def get_unenriched_comments(token_version: int, lexicon_version: int, video_id: str = None,
+                            after_id: int = 0, limit: int = 50000) -> pd.DataFrame:
+    """
+    获取还没有预处理或版本落后的评论
+
+    Args:
+        token_version: 当前分词规则版本
+        lexicon_version: 当前情感词典版本
+        video_id: 只查询该视频的评论，None 表示全部评论
+        after_id: 只返回 comments.id 大于该值的评论（按 id 分页）
+        limit: 最多返回的条数
+
+    Returns:
+        按 id 排序的 DataFrame，列为 id、text
+    """
+    video_filter = "AND c.video_id = ?" if video_id else ""
+    params = [after_id, token_version, lexicon_version] + ([video_id] if video_id else []) + [limit]
+
+    with get_db_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT c.id, c.text
+            FROM comments c
+            LEFT JOIN comment_enrichment e ON e.comment_id = c.id
+            WHERE c.id > ?
+                AND (e.comment_id IS NULL OR e.token_version != ? OR e.lexicon_version != ?)
+                {video_filter}
+            ORDER BY c.id
+            LIMIT ?
+        """, params).fetchall()
+
+    return pd.DataFrame.from_records(rows, columns=["id", "text"])
+
+
+def count_unenriched_comments(token_version: int, lexicon_version: int,
+                              video_id: str = None) -> int:
+    """
+    统计还没有预处理或版本落后的评论数
+
+    Args:
+        token_version: 当前分词规则版本
+        lexicon_version: 当前情感词典版本
+        video_id: 只统计该视频的评论，None 表示全部评论
+
+    Returns:
+        待处理的评论数
+    """
+    video_filter = "AND c.video_id = ?" if video_id else ""
+    params = [token_version, lexicon_version] + ([video_id] if video_id else [])
+
+    with get_db_connection() as conn:
+        return conn.execute(f"""
+            SELECT COUNT(*)
+            FROM comments c
+            LEFT JOIN comment_enrichment e ON e.comment_id = c.id
+            WHERE (e.comment_id IS NULL OR e.token_version != ? OR e.lexicon_version != ?)
+                {video_filter}
+        """, params).fetchone()[0]
+
+
+def save_comment_enrichment(enriched: pd.DataFrame, token_version: int,
+                            lexicon_version: int) -> int:
+    """
+    保存评论的预处理结果
+
+    Args:
+        enriched: 包含 comment_id（comments.id 或 YouTube 评论 ID）、language、tokens（JSON 数组）、
+                  positive、negative、score 列的 DataFrame
+        token_version: 使用的分词规则版本
+        lexicon_version: 使用的情感词典版本
+
+    Returns:
+        提交写入的条数（按 YouTube 评论 ID 写入时，数据库中不存在的评论会被跳过）
+    """
+    if enriched.empty:
+        return 0
+
+    rows = _enrichment_rows(enriched, token_version, lexicon_version)
+    keys = enriched["comment_id"].tolist()
+
+    with get_db_connection(write=True) as conn:
+        if isinstance(keys[0], str):
+            conn.executemany(UPSERT_ENRICHMENT_BY_KEY_SQL,
+                             [row + (key,) for key, row in zip(keys, rows)])
+        else:
+            conn.executemany(UPSERT_ENRICHMENT_SQL,
+                             [(key,) + row for key, row in zip(keys, rows)])
+        conn.commit()
+    return len(rows)
+
+
+def get_sentiment_summary(video_id: str, lexicon_version: int) -> Dict[str, Any]:
+    """
+    汇总视频评论的情感分布和语言分布
+
+    Args:
+        video_id: 视频 ID
+        lexicon_version: 情感词典版本，只统计该版本打分的评论
+
+    Returns:
+        {"positive", "neutral", "negative", "total": 已打分的评论数, "average_score": 平均得分,
+         "languages": {语言: 评论数}}
+    """
+    with get_db_connection() as conn:
+        row = conn.execute("""
+            SELECT
+                COUNT(*) AS total,
+                COALESCE(SUM(e.score > 0), 0) AS positive,
+                COALESCE(SUM(e.score = 0), 0) AS neutral,
+                COALESCE(SUM(e.score < 0), 0) AS negative,
+                COALESCE(AVG(e.score), 0) AS average_score
+            FROM comments c
+            JOIN comment_enrichment e ON e.comment_id = c.id
+            WHERE c.video_id = ? AND e.lexicon_version = ?
+        """, (video_id, lexicon_version)).fetchone()
+        languages = conn.execute("""
+            SELECT e.language, COUNT(*) AS count
+            FROM comments c
+            JOIN comment_enrichment e ON e.comment_id = c.id
+            WHERE c.video_id = ?
+            GROUP BY e.language
+            ORDER BY count DESC
+        """, (video_id,)).fetchall()
+
+    return {
+        "positive": row["positive"],
+        "neutral": row["neutral"],
+        "negative": row["negative"],
+        "total": row["total"],
+        "average_score": row["average_score"],
+        "languages": {language["language"]: language["count"] for language in languages},
+    }
+
+
+def get_comment_sentiments(video_id: str, lexicon_version: int) -> pd.DataFrame:
+    """
+    获取视频每条评论的情感打分
+
+    Args:
+        video_id: 视频 ID
+        lexicon_version: 情感词典版本
+
+    Returns:
+        DataFrame，列为 comment_id、author_name、text、like_count、language、positive、negative、score，
+        按点赞数降序
+    """
+    columns = ["comment_id", "author_name", "text", "like_count", "language",
+               "positive", "negative", "score"]
+    with get_db_connection() as conn:
+        rows = conn.execute("""
+            SELECT c.comment_id, c.author_name, c.text, c.like_count, e.language,
+                   e.positive, e.negative, e.score
+            FROM comments c
+            JOIN comment_enrichment e ON e.comment_id = c.id
+            WHERE c.video_id = ? AND e.lexicon_version = ?
+            ORDER BY c.like_count DESC
+        """, (video_id, lexicon_version)).fetchall()
+
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def get_token_frequencies(video_id: str = None, limit: int = 200) -> Dict[str, int]:
+    """
+    获取评论词频（来自触发器维护的 comment_terms，覆盖全部已预处理的评论）
+
+    Args:
+        video_id: 视频 ID，None 表示全部视频合计
+        limit: 返回的词数
+
+    Returns:
+        {词: 出现次数}，按次数降序
+    """
+    with get_db_connection() as conn:
+        rows = conn.execute("""
+            SELECT term, count FROM comment_terms
+            WHERE video_id = ?
+            ORDER BY count DESC, term
+            LIMIT ?
+        """, (GLOBAL_TERMS_KEY if video_id is None else video_id, limit)).fetchall()
+
+    return {row["term"]: row["count"] for row in rows}
+
+
+def get_token_frequency_version(video_id: str = None) -> int:
+    """
+    获取词频的版本号，词频每次变化时递增，可作为词云等派生结果的缓存键
+
+    Args:
+        video_id: 视频 ID，None 表示全部视频合计
+
+    Returns:
+        版本号，还没有任何词频时为 0
+    """
+    with get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT version FROM comment_term_versions WHERE video_id = ?",
+            (GLOBAL_TERMS_KEY if video_id is None else video_id,),
+        ).fetchone()
+    return row["version"] if row else 0
@@ -0,0 +1,90 @@
+"""
+DataFrame 读取模块
+查询结果直接构建为带类型的 pandas DataFrame，供看板页面按列计算，不再逐行拼装字典
+
+- 计数列为 int64，没有统计数据时记为 0
+- 时间列为 datetime64（UTC），无法解析或缺失时为 NaT
+"""
+
+from typing import Iterable, Sequence
+
+import pandas as pd
+
+from .connection import get_db_connection
+from .cache import cached_read
+
+
+def read_frame(sql: str, params: Sequence = (), counts: Iterable[str] = (),
+               timestamps: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    执行查询并返回带类型的 DataFrame
+
+    Args:
+        sql: 查询语句
+        params: 查询参数
+        counts: 转换为 int64 的列（NULL 记为 0）
+        timestamps: 转换为 datetime64[UTC] 的列
+
+    Returns:
+        列名与查询结果一致的 DataFrame
+    """
+    with get_db_connection() as conn:
+        # 普通元组比 sqlite3.Row 构建更快，DataFrame 只需要按位置取值
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        frame = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    for column in counts:
+        frame[column] = pd.to_numeric(frame[column]).fillna(0).astype("int64")
+    for column in timestamps:
+        frame[column] = pd.to_datetime(frame[column], format="ISO8601", utc=True, errors="coerce")
+    return frame
+
+
+@cached_read("videos", "stats")
+def get_videos_frame() -> pd.DataFrame:
+    """
+    获取所有视频及其最新统计
+
+    Returns:
+        按添加时间倒序的 DataFrame，列为:
+            video_id、title、channel_title、is_active (bool)、
+            added_at、published_at、fetch_time (datetime64[UTC]，fetch_time 为最新统计时间)、
+            view_count、like_count、comment_count (int64)
+    """
+    frame = read_frame("""
+        SELECT
+            v.video_id, v.title, v.channel_title, v.is_active,
+            v.added_at, v.published_at, l.fetch_time,
+            l.view_count, l.like_count, l.comment_count
+        FROM videos v
+        LEFT JOIN video_latest_stats l ON l.video_id = v.video_id
+        ORDER BY v.added_at DESC
+    """, counts=("view_count", "like_count", "comment_count"),
+        timestamps=("added_at", "published_at", "fetch_time"))
+    frame["is_active"] = frame["is_active"].fillna(1).astype(bool)
+    return frame
+
+
+@cached_read("comments:{video_id}")
+def get_comments_frame(video_id: str, limit: int = 100) -> pd.DataFrame:
+    """
+    获取视频点赞最多的评论
+
+    Args:
+        video_id: 视频 ID
+        limit: 返回的评论数
+
+    Returns:
+        按点赞数降序的 DataFrame，列为 comment_id、author_name、author_channel_url、text、
+        like_count (int64)、published_at (datetime64[UTC])
+    """
+    return read_frame("""
+        SELECT comment_id, author_name, author_channel_url, text, like_count, published_at
+        FROM comments
+        WHERE video_id = ?
+        ORDER BY like_count DESC
+        LIMIT ?
+    """, (video_id, limit), counts=("like_count",), timestamps=("published_at",))
@@ -0,0 +1,94 @@
+"""
+概览指标模块
+总观看量、总点赞量、频道数、平均互动率等概览指标在 SQLite 中汇总，
+读取由触发器维护的 video_kpi_rollup（按 频道、是否监控中、添加日期 分组），
+不再把所有视频读进 Python 求和；筛选条件同样下推到 SQL。
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from .connection import get_db_connection
+from .cache import cached_read
+
+DateLike = Union[str, date]
+
+
+def _as_day(value: Optional[DateLike]) -> Optional[str]:
+    """日期或时间（date/datetime/ISO 字符串）转换为 YYYY-MM-DD，与 added_date 列比较"""
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def get_overview_kpis(channels: Union[str, Iterable[str], None] = None,
+                      active: Optional[bool] = None,
+                      added_from: Optional[DateLike] = None,
+                      added_to: Optional[DateLike] = None) -> Dict[str, Any]:
+    """
+    获取概览指标
+
+    Args:
+        channels: 只统计这些频道（频道名或频道名序列），None 表示全部频道
+        active: True 只统计监控中的视频，False 只统计已停止监控的视频，None 表示全部
+        added_from: 添加日期下限（含），按天比较
+        added_to: 添加日期上限（含），按天比较
+
+    Returns:
+        {"video_count": 视频数, "channel_count": 频道数, "stats_count": 有统计数据的视频数,
+         "total_views", "total_likes", "total_comments": 最新统计之和,
+         "avg_engagement_rate": 各视频互动率的平均值（没有统计或观看量为 0 的视频计为 0）}
+    """
+    if isinstance(channels, str):
+        channels = (channels,)
+    elif channels is not None:
+        channels = tuple(dict.fromkeys(channels))
+    return _load_overview_kpis(channels, active, _as_day(added_from), _as_day(added_to))
+
+
+@cached_read("videos", "stats")
+def _load_overview_kpis(channels: Optional[Tuple[str, ...]], active: Optional[bool],
+                        added_from: Optional[str], added_to: Optional[str]) -> Dict[str, Any]:
+    conditions = []
+    params = []
+    if channels is not None:
+        # 汇总表中没有频道名的视频记为空字符串
+        conditions.append(f"channel_title IN ({', '.join('?' * len(channels)) or 'NULL'})")
+        params += [channel or "" for channel in channels]
+    if active is not None:
+        conditions.append("is_active = ?")
+        params.append(int(active))
+    if added_from is not None:
+        conditions.append("added_date >= ?")
+        params.append(added_from)
+    if added_to is not None:
+        conditions.append("added_date <= ?")
+        params.append(added_to)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with get_db_connection() as conn:
+        row = conn.execute(f"""
+            SELECT
+                COALESCE(SUM(video_count), 0),
+                COUNT(DISTINCT CASE WHEN video_count > 0 THEN channel_title END),
+                COALESCE(SUM(stats_count), 0),
+                COALESCE(SUM(view_count), 0),
+                COALESCE(SUM(like_count), 0),
+                COALESCE(SUM(comment_count), 0),
+                COALESCE(SUM(engagement_sum), 0)
+            FROM video_kpi_rollup
+            {where}
+        """, params).fetchone()
+
+    video_count, channel_count, stats_count, views, likes, comments, engagement_sum = row
+    return {
+        "video_count": video_count,
+        "channel_count": channel_count,
+        "stats_count": stats_count,
+        "total_views": views,
+        "total_likes": likes,
+        "total_comments": comments,
+        "avg_engagement_rate": engagement_sum / video_count if video_count else 0.0,
+    }
@@ -0,0 +1,105 @@
+"""
+任务锁模块
+基于 SQLite 的租约锁，保证同一时间只有一个后台任务（如统计轮询器）在运行
+
+持有者需要在租约过期前续约；进程崩溃后租约到期，其他进程即可接管。
+"""
+
+import time
+from typing import Dict, Optional
+
+from .connection import get_db_connection
+
+
+def acquire_lock(name: str, owner: str, ttl: float) -> bool:
+    """
+    获取租约锁
+
+    Args:
+        name: 锁名称
+        owner: 持有者标识（如 主机名:进程号）
+        ttl: 租约时长（秒）
+
+    Returns:
+        是否获得锁（锁空闲、已过期或已由自己持有时返回 True）
+    """
+    now = time.time()
+
+    with get_db_connection(write=True) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT owner, expires_at FROM job_locks WHERE name = ?", (name,)
+            ).fetchone()
+
+            if row is not None and row["owner"] != owner and row["expires_at"] > now:
+                conn.rollback()
+                return False
+
+            conn.execute("""
+                INSERT INTO job_locks (name, owner, acquired_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    owner = excluded.owner,
+                    acquired_at = excluded.acquired_at,
+                    expires_at = excluded.expires_at
+            """, (name, owner, now, now + ttl))
+            conn.commit()
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def renew_lock(name: str, owner: str, ttl: float) -> bool:
+    """
+    续约租约锁
+
+    Args:
+        name: 锁名称
+        owner: 持有者标识
+        ttl: 从现在起的租约时长（秒）
+
+    Returns:
+        是否续约成功（锁已被其他进程接管时返回 False）
+    """
+    with get_db_connection(write=True) as conn:
+        updated = conn.execute("""
+            UPDATE job_locks SET expires_at = ?
+            WHERE name = ? AND owner = ?
+        """, (time.time() + ttl, name, owner)).rowcount
+        conn.commit()
+    return updated == 1
+
+
+def release_lock(name: str, owner: str) -> None:
+    """
+    释放租约锁（只会释放自己持有的锁）
+
+    Args:
+        name: 锁名称
+        owner: 持有者标识
+    """
+    with get_db_connection(write=True) as conn:
+        conn.execute("DELETE FROM job_locks WHERE name = ? AND owner = ?", (name, owner))
+        conn.commit()
+
+
+def get_lock_holder(name: str) -> Optional[Dict]:
+    """
+    查看租约锁的当前持有者
+
+    Args:
+        name: 锁名称
+
+    Returns:
+        {"owner", "acquired_at", "expires_at"}，锁空闲或已过期时返回 None
+    """
+    with get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT owner, acquired_at, expires_at FROM job_locks WHERE name = ?", (name,)
+        ).fetchone()
+
+    if row is None or row["expires_at"] <= time.time():
+        return None
+    return dict(row)
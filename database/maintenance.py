@@ -0,0 +1,294 @@
+"""
+数据库维护模块
+检查、重建由触发器维护的派生表，并按保留策略清理历史数据
+
+命令行用法:
+    python -m database.maintenance check-latest
+    python -m database.maintenance rebuild-latest
+    python -m database.maintenance rebuild-rollups [--since YYYY-MM-DD | --full]
+    python -m database.maintenance rebuild-search
+    python -m database.maintenance rebuild-terms
+    python -m database.maintenance rebuild-kpis
+    python -m database.maintenance prune
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from config import Config
+from .connection import (
+    get_db_connection,
+    init_database,
+    REBUILD_LATEST_STATS_SQL,
+    ROLLUP_TABLES,
+    rollup_rebuild_sql,
+    get_comment_fts_tokenizer,
+    REBUILD_COMMENT_TERMS_SQL,
+    REBUILD_VIDEO_KPIS_SQL,
+)
+from .cache import invalidates
+
+
+@invalidates("stats", "stats:*")
+def rebuild_latest_stats() -> int:
+    """
+    按 video_stats 全量重建 video_latest_stats
+
+    Returns:
+        重建后的视频数
+    """
+    with get_db_connection(write=True) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM video_latest_stats")
+            count = conn.execute(REBUILD_LATEST_STATS_SQL).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return count
+
+
+def check_latest_stats() -> Dict[str, int]:
+    """
+    检查 video_latest_stats 与 video_stats 是否一致
+
+    Returns:
+        {"videos": 有统计的视频数, "missing": 缺失的视频数, "stale": 不是最新记录的视频数,
+         "orphaned": 没有对应统计记录的行数}
+    """
+    with get_db_connection() as conn:
+        videos, missing, stale = conn.execute("""
+            SELECT
+                COUNT(*),
+                SUM(l.video_id IS NULL),
+                SUM(l.video_id IS NOT NULL AND l.fetch_time IS NOT d.latest)
+            FROM (
+                SELECT video_id, MAX(fetch_time) AS latest
+                FROM video_stats
+                GROUP BY video_id
+            ) d
+            LEFT JOIN video_latest_stats l ON l.video_id = d.video_id
+        """).fetchone()
+        orphaned = conn.execute("""
+            SELECT COUNT(*) FROM video_latest_stats l
+            WHERE NOT EXISTS (SELECT 1 FROM video_stats vs WHERE vs.id = l.stats_id)
+        """).fetchone()[0]
+
+    return {
+        "videos": videos,
+        "missing": missing or 0,
+        "stale": stale or 0,
+        "orphaned": orphaned,
+    }
+
+
+def default_rollup_since(now: datetime = None) -> str:
+    """
+    原始快照仍然完整的最早日期
+
+    早于原始快照保留期的数据已被清理，重建汇总时不能覆盖这些时间桶
+
+    Returns:
+        YYYY-MM-DD 格式的日期
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=Config.STATS_RAW_RETENTION_DAYS)
+    return (cutoff + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+@invalidates("stats:*")
+def rebuild_rollups(since: Optional[str] = None) -> Dict[str, int]:
+    """
+    从原始快照重建小时/天汇总
+
+    Args:
+        since: 只重建该日期（YYYY-MM-DD）及之后的时间桶；None 表示全量重建，
+               仅适用于原始快照还没有被清理过的数据库
+
+    Returns:
+        {汇总表名: 重建的时间桶数}
+    """
+    since = since or ""
+    result = {}
+
+    with get_db_connection(write=True) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table, bucket_format in ROLLUP_TABLES.items():
+                conn.execute(f"DELETE FROM {table} WHERE bucket >= ?", (since,))
+                result[table] = conn.execute(
+                    rollup_rebuild_sql(table, bucket_format), (since,)
+                ).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return result
+
+
+def rebuild_comment_search() -> Optional[int]:
+    """
+    从 comments 表重建评论全文索引
+
+    Returns:
+        索引的评论数，没有全文索引（SQLite 不支持 FTS5）时返回 None
+    """
+    with get_db_connection(write=True) as conn:
+        if get_comment_fts_tokenizer(conn) is None:
+            return None
+        conn.execute("INSERT INTO comments_fts (comments_fts) VALUES ('rebuild')")
+        conn.commit()
+        return conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+
+
+def rebuild_comment_terms() -> int:
+    """
+    按 comment_enrichment 全量重建评论词频表
+
+    Returns:
+        重建后的（视频, 词）行数，含全局合计
+    """
+    with get_db_connection(write=True) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM comment_terms")
+            for statement in REBUILD_COMMENT_TERMS_SQL:
+                conn.execute(statement)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return conn.execute("SELECT COUNT(*) FROM comment_terms").fetchone()[0]
+
+
+@invalidates("videos", "stats")
+def rebuild_video_kpis() -> int:
+    """
+    按 videos 和 video_latest_stats 全量重建概览汇总表
+
+    Returns:
+        重建后的汇总行数
+    """
+    with get_db_connection(write=True) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM video_kpi_rollup")
+            count = conn.execute(REBUILD_VIDEO_KPIS_SQL).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return count
+
+
+@invalidates("stats:*")
+def prune_stats(now: datetime = None) -> Dict[str, int]:
+    """
+    按保留策略清理过期数据
+
+    - 删除超过 Config.STATS_RAW_RETENTION_DAYS 天的原始快照，但保留每个视频的最新快照
+    - 删除超过 Config.STATS_HOURLY_RETENTION_DAYS 天的小时汇总
+    天汇总永久保留。分批删除，每批单独提交，避免长时间占用写锁。
+
+    Args:
+        now: 当前时间（UTC），默认使用系统时间
+
+    Returns:
+        {"raw": 删除的原始快照数, "hourly": 删除的小时汇总数}
+    """
+    now = now or datetime.utcnow()
+    raw_cutoff = (now - timedelta(days=Config.STATS_RAW_RETENTION_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+    hourly_cutoff = (now - timedelta(days=Config.STATS_HOURLY_RETENTION_DAYS)).strftime("%Y-%m-%d %H:00:00")
+    removed = {"raw": 0, "hourly": 0}
+
+    while True:
+        with get_db_connection(write=True) as conn:
+            deleted = conn.execute("""
+                DELETE FROM video_stats
+                WHERE id IN (
+                    SELECT id FROM video_stats
+                    WHERE fetch_time < ?
+                        AND id NOT IN (SELECT stats_id FROM video_latest_stats)
+                    LIMIT ?
+                )
+            """, (raw_cutoff, Config.STATS_PRUNE_BATCH_SIZE)).rowcount
+            conn.commit()
+        removed["raw"] += deleted
+        if deleted < Config.STATS_PRUNE_BATCH_SIZE:
+            break
+
+    with get_db_connection(write=True) as conn:
+        removed["hourly"] = conn.execute(
+            "DELETE FROM video_stats_hourly WHERE bucket < ?", (hourly_cutoff,)
+        ).rowcount
+        conn.commit()
+
+    return removed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="YouTube 数据看板数据库维护")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("check-latest", help="检查最新统计表是否与历史统计一致")
+    subparsers.add_parser("rebuild-latest", help="从历史统计全量重建最新统计表")
+    rollups = subparsers.add_parser("rebuild-rollups", help="从原始快照重建小时/天汇总")
+    rollups.add_argument("--since", help="只重建该日期（YYYY-MM-DD）之后的时间桶，默认为原始快照保留期内")
+    rollups.add_argument("--full", action="store_true", help="全量重建（仅适用于从未清理过的数据库）")
+    subparsers.add_parser("rebuild-search", help="从评论表重建评论全文索引")
+    subparsers.add_parser("rebuild-terms", help="从评论预处理结果重建词频表")
+    subparsers.add_parser("rebuild-kpis", help="从视频和最新统计重建概览汇总表")
+    subparsers.add_parser("prune", help="按保留策略清理过期的原始快照和小时汇总")
+    args = parser.parse_args(argv)
+
+    init_database()
+
+    if args.command == "check-latest":
+        report = check_latest_stats()
+        print(f"视频数: {report['videos']}，缺失: {report['missing']}，"
+              f"过期: {report['stale']}，孤立: {report['orphaned']}")
+        return 1 if report["missing"] or report["stale"] or report["orphaned"] else 0
+
+    if args.command == "rebuild-latest":
+        count = rebuild_latest_stats()
+        print(f"✅ 已重建 {count} 个视频的最新统计")
+        return 0
+
+    if args.command == "rebuild-rollups":
+        since = None if args.full else (args.since or default_rollup_since())
+        result = rebuild_rollups(since)
+        for table, count in result.items():
+            print(f"✅ {table}: 已重建 {count} 个时间桶" + (f"（自 {since} 起）" if since else ""))
+        return 0
+
+    if args.command == "rebuild-search":
+        count = rebuild_comment_search()
+        if count is None:
+            print("❌ 当前 SQLite 不支持 FTS5，评论搜索使用 LIKE 匹配")
+            return 1
+        print(f"✅ 已重建 {count} 条评论的全文索引")
+        return 0
+
+    if args.command == "rebuild-terms":
+        count = rebuild_comment_terms()
+        print(f"✅ 已重建 {count} 条词频记录")
+        return 0
+
+    if args.command == "rebuild-kpis":
+        count = rebuild_video_kpis()
+        print(f"✅ 已重建 {count} 条概览汇总记录")
+        return 0
+
+    if args.command == "prune":
+        removed = prune_stats()
+        print(f"✅ 已删除 {removed['raw']} 条原始快照、{removed['hourly']} 条小时汇总")
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+数据库连接池模块
+为整个进程提供共享的 SQLite 连接：每个线程一个读连接，全局一个串行化的写连接
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from config import Config
+
+
+class ConnectionPool:
+    """
+    SQLite 连接池
+
+    - 读连接按线程缓存（threading.local），线程结束后随之释放
+    - 写连接全局唯一，通过锁串行化，避免多个会话同时写入导致 "database is locked"
+    - 每个连接创建时只设置一次 PRAGMA，之后直接复用
+    """
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, object]] = None,
+                 busy_timeout: int = 5000):
+        """
+        初始化连接池
+
+        Args:
+            db_path: 数据库文件路径
+            pragmas: 每个连接创建时应用的 PRAGMA 设置
+            busy_timeout: 等待锁释放的超时时间（毫秒）
+        """
+        self.db_path = db_path
+        self.pragmas = dict(pragmas if pragmas is not None else Config.DB_PRAGMAS)
+        self.busy_timeout = busy_timeout
+
+        self._local = threading.local()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+        self._stats_lock = threading.Lock()
+        self._wal_enabled = False
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "writer_hits": 0,
+            "writer_misses": 0,
+            "writer_waits": 0,
+        }
+
+    def _create_connection(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """创建新连接并应用 PRAGMA 设置"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000,
+            check_same_thread=check_same_thread,
+        )
+        conn.row_factory = sqlite3.Row
+
+        # WAL 模式是持久化到数据库文件的，每个进程只需设置一次
+        if not self._wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._wal_enabled = True
+
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout)}")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+
+        return conn
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    @contextmanager
+    def reader(self):
+        """
+        获取当前线程的读连接
+
+        连接在上下文结束后不会关闭；未提交的事务会被回滚，
+        与原先“关闭连接即丢弃未提交修改”的行为保持一致
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._count("misses")
+            conn = self._create_connection()
+            self._local.conn = conn
+            self._local.depth = 0
+        else:
+            self._count("hits")
+
+        self._local.depth += 1
+        try:
+            yield conn
+        finally:
+            self._local.depth -= 1
+            # 只在最外层上下文结束时回滚，避免嵌套调用丢弃外层事务
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def writer(self):
+        """
+        获取全局写连接
+
+        同一时间只有一个线程持有写连接，其他线程在锁上排队等待
+        """
+        if not self._writer_lock.acquire(blocking=False):
+            self._count("writer_waits")
+            self._writer_lock.acquire()
+
+        try:
+            if self._writer is None:
+                self._count("writer_misses")
+                self._writer = self._create_connection(check_same_thread=False)
+            else:
+                self._count("writer_hits")
+
+            conn = self._writer
+            self._writer_depth += 1
+            try:
+                yield conn
+            finally:
+                self._writer_depth -= 1
+                if self._writer_depth == 0 and conn.in_transaction:
+                    conn.rollback()
+        finally:
+            self._writer_lock.release()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取连接池统计信息
+
+        Returns:
+            命中/未命中次数等计数器
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """关闭写连接和当前线程的读连接"""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """
+    获取指定数据库文件对应的连接池（进程内共享）
+
+    Args:
+        db_path: 数据库文件路径
+
+    Returns:
+        连接池实例
+    """
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = ConnectionPool(db_path, busy_timeout=Config.DB_BUSY_TIMEOUT)
+                _pools[db_path] = pool
+    return pool
@@ -0,0 +1,53 @@
+"""
+API 配额账本模块
+按天记录每个 YouTube API 端点消耗的配额单位
+"""
+
+from typing import Dict
+
+from .connection import get_db_connection
+
+
+def record_quota_usage(quota_date: str, endpoint: str, units: int, calls: int = 1) -> None:
+    """
+    记录一次配额消耗
+
+    Args:
+        quota_date: 配额日期（YYYY-MM-DD，太平洋时间）
+        endpoint: API 端点
+        units: 消耗的配额单位
+        calls: 请求次数
+    """
+    with get_db_connection(write=True) as conn:
+        conn.execute("""
+            INSERT INTO api_quota_ledger (quota_date, endpoint, units, calls)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (quota_date, endpoint) DO UPDATE SET
+                units = units + excluded.units,
+                calls = calls + excluded.calls,
+                updated_at = CURRENT_TIMESTAMP
+        """, (quota_date, endpoint, units, calls))
+        conn.commit()
+
+
+def get_quota_usage(quota_date: str) -> Dict[str, Dict[str, int]]:
+    """
+    获取某天各端点的配额消耗
+
+    Args:
+        quota_date: 配额日期（YYYY-MM-DD）
+
+    Returns:
+        {endpoint: {"units": 配额单位, "calls": 请求次数}}
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT endpoint, units, calls
+            FROM api_quota_ledger
+            WHERE quota_date = ?
+        """, (quota_date,))
+        return {
+            row["endpoint"]: {"units": row["units"], "calls": row["calls"]}
+            for row in cursor.fetchall()
+        }
@@ -0,0 +1,118 @@
+"""
+排行模块
+排行榜只取前 N 个视频：按 video_latest_stats 上的索引顺序读取（ORDER BY … LIMIT），
+不把所有视频读进 DataFrame 再排序。结果经查询缓存按 Config.CACHE_TTL 缓存，写入统计时失效。
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+from .connection import LATEST_ENGAGEMENT_SQL
+from .cache import cached_read
+from .frames import read_frame
+
+# 排行指标 -> 排序表达式（l 为 video_latest_stats，v 为 videos）
+RANKING_METRICS = {
+    "views": "l.view_count",
+    "likes": "l.like_count",
+    "comments": "l.comment_count",
+    # 与 idx_latest_stats_engagement 的表达式一致，才能按索引顺序读取
+    "engagement": LATEST_ENGAGEMENT_SQL,
+    # 发布至最新一次统计的日均观看量（年龄不足 1 天按 1 天计），依赖 videos 中的时间，需要排序
+    "velocity": "l.view_count / MAX(julianday(l.fetch_time) - "
+                "julianday(COALESCE(v.published_at, v.added_at)), 1.0)",
+    # 最近 window_days 天内观看量的增长，来自天汇总表
+    "growth": "g.growth",
+}
+
+_RANKING_COLUMNS = """
+    v.video_id, v.title, v.channel_title, v.published_at, l.fetch_time,
+    l.view_count, l.like_count, l.comment_count"""
+
+
+def get_top_videos(metric: str = "views", limit: int = 10, channel: Optional[str] = None,
+                   active: Optional[bool] = None, min_views: int = 0,
+                   window_days: int = 7) -> pd.DataFrame:
+    """
+    获取排行前 N 的视频
+
+    Args:
+        metric: 排行指标，见 RANKING_METRICS（views、likes、comments、engagement、velocity、growth）
+        limit: 返回的视频数
+        channel: 只在该频道内排行，None 表示全部频道
+        active: True 只包含监控中的视频，False 只包含已停止监控的视频，None 表示全部
+        min_views: 最低观看量（互动率排行中排除观看量很少的视频）
+        window_days: growth 排行回看的天数
+
+    Returns:
+        按指标降序的 DataFrame，列为 video_id、title、channel_title、
+        published_at、fetch_time (datetime64[UTC])、view_count、like_count、comment_count (int64)、
+        value（指标值，float64）；没有统计数据的视频不参与排行
+
+    Raises:
+        ValueError: 指标不存在
+    """
+    if metric not in RANKING_METRICS:
+        raise ValueError(f"未知的排行指标: {metric}，可选: {', '.join(RANKING_METRICS)}")
+    return _load_top_videos(metric, limit, channel, active, min_views,
+                            window_days if metric == "growth" else None)
+
+
+@cached_read("videos", "stats")
+def _load_top_videos(metric: str, limit: int, channel: Optional[str], active: Optional[bool],
+                     min_views: int, window_days: Optional[int]) -> pd.DataFrame:
+    conditions = []
+    params = []
+    if channel is not None:
+        conditions.append("v.channel_title = ?")
+        params.append(channel)
+    if active is not None:
+        conditions.append("COALESCE(v.is_active, 1) = ?")
+        params.append(int(active))
+    if min_views:
+        conditions.append("l.view_count >= ?")
+        params.append(min_views)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = RANKING_METRICS[metric]
+
+    if metric == "growth":
+        # 先在天汇总表上按窗口聚合出每个视频的增长，再取前 N；
+        # 按频道筛选时只聚合该频道的视频（按主键查找各视频的天汇总）
+        in_channel = ""
+        if channel is not None:
+            in_channel = "AND video_id IN (SELECT video_id FROM videos WHERE channel_title = ?)"
+            params = [channel] + params
+        sql = f"""
+            SELECT {_RANKING_COLUMNS}, {order} AS value
+            FROM (
+                SELECT video_id, MAX(view_max) - MIN(view_min) AS growth
+                FROM video_stats_daily
+                WHERE bucket >= date('now', ?) {in_channel}
+                GROUP BY video_id
+            ) g
+            JOIN videos v ON v.video_id = g.video_id
+            JOIN video_latest_stats l ON l.video_id = g.video_id
+            {where}
+            ORDER BY value DESC
+            LIMIT ?
+        """
+        params = [f"-{int(window_days)} days"] + params
+    else:
+        # 不按频道筛选时固定从 video_latest_stats 的排行索引开始读；按频道筛选时由规划器选择
+        # 频道索引（频道内视频通常很少）
+        join = "JOIN" if channel is not None else "CROSS JOIN"
+        sql = f"""
+            SELECT {_RANKING_COLUMNS}, {order} AS value
+            FROM video_latest_stats l
+            {join} videos v ON v.video_id = l.video_id
+            {where}
+            ORDER BY {order} DESC
+            LIMIT ?
+        """
+
+    frame = read_frame(sql, params + [limit],
+                       counts=("view_count", "like_count", "comment_count"),
+                       timestamps=("published_at", "fetch_time"))
+    frame["value"] = pd.to_numeric(frame["value"]).astype("float64")
+    return frame
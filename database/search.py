@@ -0,0 +1,139 @@
+"""
+评论搜索模块
+基于 comments_fts 全文索引的关键词/短语搜索，按相关度（bm25）排序并返回高亮片段
+
+查询语法: 空格分隔的多个关键词需要同时出现，双引号括起的内容按短语匹配，
+例如 `教程 "very helpful"`。trigram 分词下少于 3 个字符的关键词、unicode61 分词下的
+中文关键词无法使用全文索引，这时退回 LIKE 子串匹配（按发布时间倒序）。
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from .connection import get_db_connection, get_comment_fts_tokenizer
+
+# 片段中关键词的高亮标记（Markdown 加粗）
+HIGHLIGHT_START = "**"
+HIGHLIGHT_END = "**"
+# 片段最多包含的词元数（FTS5 允许的最大值；trigram 分词下约等于字符数）
+SNIPPET_TOKENS = 64
+
+_TERM_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]")
+
+
+def parse_search_query(query: str) -> List[str]:
+    """
+    将搜索框输入拆分为关键词和短语
+
+    Args:
+        query: 用户输入
+
+    Returns:
+        关键词/短语列表（已去掉引号）
+    """
+    terms = []
+    for phrase, word in _TERM_PATTERN.findall(query or ""):
+        term = (phrase or word).strip()
+        if term:
+            terms.append(term)
+    return terms
+
+
+def _can_use_fts(terms: List[str], tokenizer: Optional[str]) -> bool:
+    if tokenizer == "trigram":
+        return all(len(term) >= 3 for term in terms)
+    if tokenizer == "unicode61":
+        return not any(_CJK_PATTERN.search(term) for term in terms)
+    return False
+
+
+def _fts_query(terms: List[str]) -> str:
+    # 每个关键词都作为带引号的短语，避免用户输入被解析成 FTS5 运算符
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _highlight(text: str, terms: List[str], width: int = 60) -> str:
+    """LIKE 匹配的结果没有 FTS 片段，截取第一个关键词附近的文本并高亮"""
+    lowered = text.lower()
+    position = min((lowered.find(term.lower()) for term in terms if term.lower() in lowered), default=0)
+    start = max(position - width // 2, 0)
+    excerpt = text[start:start + width * 2]
+
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    excerpt = pattern.sub(lambda match: f"{HIGHLIGHT_START}{match.group(0)}{HIGHLIGHT_END}", excerpt)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width * 2 < len(text) else ""
+    return f"{prefix}{excerpt}{suffix}"
+
+
+def search_comments(query: str, video_id: str = None, start_date: str = None,
+                    end_date: str = None, limit: int = 50) -> List[Dict]:
+    """
+    搜索评论
+
+    Args:
+        query: 搜索内容，见模块说明中的查询语法
+        video_id: 只搜索该视频的评论
+        start_date: 发布日期下限（YYYY-MM-DD，含当天）
+        end_date: 发布日期上限（YYYY-MM-DD，含当天）
+        limit: 最多返回的条数
+
+    Returns:
+        评论字典列表，按相关度排序；每项包含 comment_id、video_id、author_name、
+        like_count、published_at、text、snippet（关键词已高亮的片段）和 score（越大越相关）
+    """
+    terms = parse_search_query(query)
+    if not terms:
+        return []
+
+    filters, params = [], []
+    if video_id:
+        filters.append("c.video_id = ?")
+        params.append(video_id)
+    if start_date:
+        filters.append("c.published_at >= ?")
+        params.append(start_date)
+    if end_date:
+        filters.append("c.published_at < date(?, '+1 day')")
+        params.append(end_date)
+
+    with get_db_connection() as conn:
+        if _can_use_fts(terms, get_comment_fts_tokenizer(conn)):
+            where = " AND ".join(["comments_fts MATCH ?"] + filters)
+            rows = conn.execute(f"""
+                SELECT
+                    c.comment_id, c.video_id, c.author_name, c.like_count, c.published_at, c.text,
+                    snippet(comments_fts, 0, ?, ?, '…', ?) AS snippet,
+                    -bm25(comments_fts) AS score
+                FROM comments_fts
+                JOIN comments c ON c.id = comments_fts.rowid
+                WHERE {where}
+                ORDER BY bm25(comments_fts)
+                LIMIT ?
+            """, [HIGHLIGHT_START, HIGHLIGHT_END, SNIPPET_TOKENS, _fts_query(terms)]
+                + params + [limit]).fetchall()
+            return [dict(row) for row in rows]
+
+        where = " AND ".join(["c.text LIKE ? ESCAPE '\\'"] * len(terms) + filters)
+        rows = conn.execute(f"""
+            SELECT
+                c.comment_id, c.video_id, c.author_name, c.like_count, c.published_at, c.text
+            FROM comments c
+            WHERE {where}
+            ORDER BY c.published_at DESC
+            LIMIT ?
+        """, [f"%{_escape_like(term)}%" for term in terms] + params + [limit]).fetchall()
+
+    results = []
+    for row in rows:
+        result = dict(row)
+        result["snippet"] = _highlight(result["text"] or "", terms)
+        result["score"] = None
+        results.append(result)
+    return results
+
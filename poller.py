@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+后台统计轮询器
+
+独立于 Streamlit 运行，定时刷新所有监控中视频（videos.is_active = 1）的统计数据，
+并按 Config.POLL_COMMENT_INTERVAL 增量同步这些视频的评论。
+刷新频率由 scheduler.PollScheduler 根据视频发布时长和近期观看量增长分级决定，
+总刷新量不超过 Config.POLL_DAILY_QUOTA_BUDGET；
+通过数据库租约锁保证同一时间只有一个轮询器在运行。
+
+用法:
+    python poller.py            # 持续运行
+    python poller.py --once     # 只刷新一轮到期的视频
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+
+from config import Config
+from database import (
+    init_database,
+    get_active_video_activity,
+    acquire_lock,
+    renew_lock,
+    release_lock,
+    get_lock_holder,
+    prune_stats,
+)
+from api import YouTubeAPI, ResponseCache, refresh_videos, sync_comments
+from scheduler import PollScheduler
+from analytics.enrichment import enrich_pending_comments
+
+LOCK_NAME = "stats_poller"
+
+
+def run_once(api: YouTubeAPI, scheduler: PollScheduler, now: datetime = None) -> Dict[str, int]:
+    """
+    刷新一轮到期的视频
+
+    Args:
+        api: YouTube API 客户端
+        scheduler: 调度器，跨轮次复用以保留配额预算和刷新记录
+        now: 当前时间（UTC），默认使用系统时间
+
+    Returns:
+        {"active": 监控中的视频数, "due": 到期的视频数, "refreshed": 写入统计的视频数,
+         "missing": 未获取到的视频数}
+    """
+    now = now or datetime.utcnow()
+    rows = get_active_video_activity(Config.POLL_VELOCITY_WINDOW_HOURS)
+    scheduler.load(rows, now)
+    due = scheduler.pop_due(now)
+
+    summary = {"active": len(rows), "due": len(due), "refreshed": 0, "missing": 0}
+    if not due:
+        return summary
+
+    # 只写统计：视频信息使用 INSERT OR REPLACE，会重置 added_at 和 is_active
+    result = refresh_videos(due, api=api, save_info=False)
+    summary["refreshed"] = result["stats"]["succeeded"] if result["stats"] else 0
+    summary["missing"] = len(result["missing"])
+    return summary
+
+
+def _keep_lease(owner: str, stop: threading.Event, lost: threading.Event) -> None:
+    """后台续约：刷新时可能长时间等待配额，不能只在每轮开始时续约"""
+    while not stop.wait(Config.POLL_LOCK_TTL / 3):
+        if not renew_lock(LOCK_NAME, owner, Config.POLL_LOCK_TTL):
+            lost.set()
+            return
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="YouTube 视频统计后台轮询器")
+    parser.add_argument("--once", action="store_true", help="只刷新一轮后退出")
+    parser.add_argument("--tick", type=float, default=Config.POLL_TICK_SECONDS,
+                        help="检查到期视频的间隔（秒）")
+    parser.add_argument("--api-key", help="YouTube Data API 密钥，默认读取 YOUTUBE_API_KEY")
+    args = parser.parse_args(argv)
+
+    init_database()
+
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    if not acquire_lock(LOCK_NAME, owner, Config.POLL_LOCK_TTL):
+        holder = get_lock_holder(LOCK_NAME)
+        print(f"❌ 已有轮询器在运行: {holder['owner'] if holder else '未知'}")
+        return 1
+
+    # 统计需要最新值：响应缓存不走 TTL 捷径，每次都用 ETag 重新验证
+    api = YouTubeAPI(
+        api_key=args.api_key,
+        cache=ResponseCache(ttl=0),
+        wait_for_quota=True,
+    )
+    if not api.api_key:
+        release_lock(LOCK_NAME, owner)
+        print("❌ 未设置 YouTube API 密钥")
+        return 1
+
+    print(f"✅ 轮询器已启动 ({owner})")
+    scheduler = PollScheduler()
+    stop, lost = threading.Event(), threading.Event()
+    threading.Thread(target=_keep_lease, args=(owner, stop, lost), daemon=True).start()
+    last_prune = None
+    last_comment_sync = None
+
+    try:
+        while not lost.is_set():
+            started = time.monotonic()
+            summary = run_once(api, scheduler)
+            if summary["due"]:
+                status = scheduler.stats()
+                tiers = "、".join(f"{name} {count}" for name, count in sorted(status["tiers"].items()))
+                print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] 监控 {summary['active']} 个视频（{tiers}），"
+                      f"刷新 {summary['refreshed']}/{summary['due']} 个，未获取 {summary['missing']} 个，"
+                      f"间隔倍数 {status['stretch']:.1f}")
+
+            if last_prune is None or time.monotonic() - last_prune >= Config.POLL_PRUNE_INTERVAL:
+                removed = prune_stats()
+                last_prune = time.monotonic()
+                if removed["raw"] or removed["hourly"]:
+                    print(f"🧹 已清理 {removed['raw']} 条原始快照、{removed['hourly']} 条小时汇总")
+
+            if Config.POLL_COMMENT_INTERVAL and (
+                    last_comment_sync is None
+                    or time.monotonic() - last_comment_sync >= Config.POLL_COMMENT_INTERVAL):
+                results = sync_comments(
+                    [row["video_id"] for row in get_active_video_activity()], api=api
+                )
+                last_comment_sync = time.monotonic()
+                fetched = sum(result["fetched"] for result in results)
+                pending = sum(not result["complete"] for result in results)
+                if fetched or pending:
+                    print(f"💬 同步了 {fetched} 条新评论，{pending} 个视频下次继续")
+                # 补算分词规则或情感词典更新后版本落后的评论
+                enriched = enrich_pending_comments()
+                if enriched:
+                    print(f"🏷️ 预处理了 {enriched} 条评论")
+
+            if args.once:
+                return 0
+
+            lost.wait(max(args.tick - (time.monotonic() - started), 1))
+
+        print("❌ 租约锁已被其他轮询器接管，退出")
+        return 1
+    except KeyboardInterrupt:
+        print("轮询器已停止")
+        return 0
+    finally:
+        stop.set()
+        release_lock(LOCK_NAME, owner)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+调度模块初始化文件
+"""
+
+from .adaptive import (
+    PollScheduler,
+    view_velocity,
+    parse_time,
+)
+
+__all__ = [
+    "PollScheduler",
+    "view_velocity",
+    "parse_time",
+]
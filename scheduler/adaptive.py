@@ -0,0 +1,241 @@
+"""
+自适应轮询调度模块
+按视频近期的观看量增长速度分级决定刷新间隔，用优先队列（堆顶是最早到期的视频）
+取出到期的视频，并用令牌桶保证总刷新量不超过每日配额预算。
+
+分级需求超出预算时，所有视频的刷新间隔按同一比例拉长，保持各级之间的相对频率。
+"""
+
+import heapq
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from api.youtube_api import MAX_IDS_PER_REQUEST
+
+# 两次快照间隔太短时增长速度噪声很大，不据此分级
+MIN_VELOCITY_HOURS = 0.25
+
+
+def parse_time(value) -> Optional[datetime]:
+    """
+    解析数据库或 API 中的时间（UTC）
+
+    Args:
+        value: 时间字符串或 datetime
+
+    Returns:
+        不带时区的 datetime，无法解析时返回 None
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed.replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def view_velocity(row) -> Optional[float]:
+    """
+    计算视频近期的观看量增长速度
+
+    Args:
+        row: get_active_video_activity 返回的一行（或同样字段的字典）
+
+    Returns:
+        每小时新增观看量，数据不足时返回 None
+    """
+    latest_time = parse_time(row["fetch_time"])
+    baseline_time = parse_time(row["baseline_time"])
+    if latest_time is None or baseline_time is None or row["baseline_views"] is None:
+        return None
+
+    hours = (latest_time - baseline_time).total_seconds() / 3600
+    if hours < MIN_VELOCITY_HOURS:
+        return None
+    return max((row["view_count"] or 0) - row["baseline_views"], 0) / hours
+
+
+class PollScheduler:
+    """
+    视频刷新调度器
+
+    使用示例:
+        scheduler = PollScheduler()
+        scheduler.load(get_active_video_activity(), now)
+        video_ids = scheduler.pop_due(now)
+    """
+
+    def __init__(self, daily_budget: float = None, tiers: List[Tuple[str, float, float]] = None,
+                 age_intervals: List[Tuple[float, float]] = None,
+                 batch_size: int = MAX_IDS_PER_REQUEST):
+        """
+        初始化调度器
+
+        Args:
+            daily_budget: 每天最多使用的配额单位，默认使用 Config.POLL_DAILY_QUOTA_BUDGET
+            tiers: 增长速度分级，默认使用 Config.POLL_TIERS
+            age_intervals: 新视频的刷新间隔上限，默认使用 Config.POLL_AGE_INTERVALS
+            batch_size: 每次 videos.list 请求最多刷新的视频数
+
+        Raises:
+            ValueError: 每日预算不是正数（预算为 0 时刷新间隔会被拉长为无穷大）
+        """
+        self.daily_budget = daily_budget if daily_budget is not None else Config.POLL_DAILY_QUOTA_BUDGET
+        if not self.daily_budget > 0:
+            raise ValueError(f"每日配额预算必须大于 0，当前为 {self.daily_budget}")
+        self.tiers = tiers or Config.POLL_TIERS
+        self.age_intervals = age_intervals if age_intervals is not None else Config.POLL_AGE_INTERVALS
+        self.batch_size = batch_size
+        self.unit_cost = Config.QUOTA_COSTS["videos"]
+
+        # 刷新间隔被拉长的倍数（需求未超出预算时为 1）
+        self.stretch = 1.0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[Tuple[datetime, str]] = []
+        # 最近一次取出刷新的时间：刷新失败时不会在下一轮立即重试
+        self._attempts: Dict[str, datetime] = {}
+
+        self._allowance: Optional[float] = None
+        self._allowance_time: Optional[datetime] = None
+        self.spent = 0
+
+    @property
+    def daily_capacity(self) -> float:
+        """预算每天最多能刷新的视频次数（按满批计算）"""
+        return self.daily_budget / self.unit_cost * self.batch_size
+
+    def classify(self, velocity: Optional[float], age_days: Optional[float]) -> Tuple[str, float]:
+        """
+        按增长速度和发布时长确定视频的分级和基础刷新间隔
+
+        Args:
+            velocity: 每小时新增观看量，None 表示历史不足
+            age_days: 发布天数，None 表示未知
+
+        Returns:
+            (分级名称, 刷新间隔秒)
+        """
+        if velocity is None:
+            tier, interval = "unknown", Config.POLL_NO_HISTORY_INTERVAL
+        else:
+            tier, interval = self.tiers[-1][0], self.tiers[-1][2]
+            for name, min_velocity, tier_interval in self.tiers:
+                if velocity >= min_velocity:
+                    tier, interval = name, tier_interval
+                    break
+
+        if age_days is not None:
+            for max_days, age_interval in self.age_intervals:
+                if age_days < max_days:
+                    if age_interval < interval:
+                        tier, interval = "new", age_interval
+                    break
+
+        return tier, interval
+
+    def load(self, rows: Iterable, now: datetime) -> None:
+        """
+        根据最新的视频活动数据重建调度队列
+
+        Args:
+            rows: get_active_video_activity 的返回值（或同样字段的字典）
+            now: 当前时间（UTC）
+        """
+        entries = {}
+        for row in rows:
+            published = parse_time(row["published_at"]) or parse_time(row["added_at"])
+            age_days = (now - published).total_seconds() / 86400 if published else None
+            velocity = view_velocity(row)
+            tier, interval = self.classify(velocity, age_days)
+            entries[row["video_id"]] = {
+                "tier": tier,
+                "velocity": velocity,
+                "base_interval": interval,
+                "last_fetch": parse_time(row["fetch_time"]),
+            }
+
+        demand = sum(86400 / entry["base_interval"] for entry in entries.values())
+        self.stretch = max(demand / self.daily_capacity, 1.0)
+
+        self._attempts = {vid: t for vid, t in self._attempts.items() if vid in entries}
+        self._heap = []
+        for video_id, entry in entries.items():
+            entry["interval"] = entry["base_interval"] * self.stretch
+            last = max(filter(None, (entry["last_fetch"], self._attempts.get(video_id))), default=None)
+            # 从未刷新过的视频排在最前
+            entry["due"] = datetime.min if last is None else last + timedelta(seconds=entry["interval"])
+            self._heap.append((entry["due"], video_id))
+        heapq.heapify(self._heap)
+        self._entries = entries
+
+    def _refill(self, now: datetime) -> None:
+        rate = self.daily_budget / 86400
+        burst = max(rate * Config.POLL_BUDGET_BURST, self.unit_cost)
+        if self._allowance_time is None:
+            self._allowance = burst
+        else:
+            elapsed = max((now - self._allowance_time).total_seconds(), 0)
+            self._allowance = min(self._allowance + rate * elapsed, burst)
+        self._allowance_time = now
+
+    def pop_due(self, now: datetime, limit: int = None) -> List[str]:
+        """
+        取出已到期的视频，按到期时间先后排序，数量受配额预算限制
+
+        Args:
+            now: 当前时间（UTC）
+            limit: 最多取出的视频数
+
+        Returns:
+            需要刷新的视频 ID 列表
+        """
+        self._refill(now)
+        capacity = int(self._allowance // self.unit_cost) * self.batch_size
+        if limit is not None:
+            capacity = min(capacity, limit)
+
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < capacity:
+            due_time, video_id = heapq.heappop(self._heap)
+            entry = self._entries[video_id]
+            if entry["due"] != due_time:
+                continue
+            due.append(video_id)
+            self._attempts[video_id] = now
+            entry["due"] = now + timedelta(seconds=entry["interval"])
+            heapq.heappush(self._heap, (entry["due"], video_id))
+
+        if due:
+            cost = -(-len(due) // self.batch_size) * self.unit_cost
+            self._allowance -= cost
+            self.spent += cost
+        return due
+
+    def next_due(self) -> Optional[datetime]:
+        """最早到期的时间，队列为空时返回 None"""
+        return self._heap[0][0] if self._heap else None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取调度状态
+
+        Returns:
+            视频数、各分级的视频数、按分级间隔每天需要的配额、每日预算、间隔拉长倍数、
+            当前可用配额以及累计使用的配额
+        """
+        demand = sum(86400 / entry["base_interval"] for entry in self._entries.values())
+        return {
+            "videos": len(self._entries),
+            "tiers": dict(Counter(entry["tier"] for entry in self._entries.values())),
+            "demand": demand / self.batch_size * self.unit_cost,
+            "budget": self.daily_budget,
+            "stretch": self.stretch,
+            "allowance": self._allowance,
+            "spent": self.spent,
+        }
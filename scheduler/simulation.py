@@ -0,0 +1,213 @@
+"""
+轮询策略回放模块
+用已记录的统计历史作为“真实”观看量曲线，模拟不同轮询策略在同一时间段内的采样，
+比较采样误差（看板显示的最新值与真实值之差）和消耗的配额。
+"""
+
+import bisect
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import Config
+from database import get_db_connection
+from api.youtube_api import MAX_IDS_PER_REQUEST
+from .adaptive import PollScheduler, parse_time
+
+
+class VideoHistory:
+    """一个视频的观看量历史，按时间线性插值"""
+
+    def __init__(self, video_id: str, times: List[datetime], views: List[float],
+                 published_at: Optional[datetime] = None):
+        self.video_id = video_id
+        self.times = times
+        self.views = views
+        self.published_at = published_at
+
+    @property
+    def start(self) -> datetime:
+        return self.times[0]
+
+    @property
+    def end(self) -> datetime:
+        return self.times[-1]
+
+    def views_at(self, when: datetime) -> float:
+        """某一时刻的观看量，两次记录之间线性插值"""
+        index = bisect.bisect_right(self.times, when)
+        if index == 0:
+            return self.views[0]
+        if index == len(self.times):
+            return self.views[-1]
+
+        t0, t1 = self.times[index - 1], self.times[index]
+        v0, v1 = self.views[index - 1], self.views[index]
+        return v0 + (v1 - v0) * (when - t0).total_seconds() / (t1 - t0).total_seconds()
+
+
+def load_histories(min_samples: int = 2) -> List[VideoHistory]:
+    """
+    从数据库读取所有视频的原始统计快照
+
+    Args:
+        min_samples: 快照数少于该值的视频不参与回放
+
+    Returns:
+        VideoHistory 列表
+    """
+    with get_db_connection() as conn:
+        published = {
+            row["video_id"]: parse_time(row["published_at"])
+            for row in conn.execute("SELECT video_id, published_at FROM videos")
+        }
+        rows = conn.execute("""
+            SELECT video_id, fetch_time, view_count FROM video_stats
+            ORDER BY video_id, fetch_time
+        """).fetchall()
+
+    samples: Dict[str, List] = {}
+    for row in rows:
+        fetch_time = parse_time(row["fetch_time"])
+        if fetch_time is not None:
+            samples.setdefault(row["video_id"], []).append((fetch_time, row["view_count"] or 0))
+
+    return [
+        VideoHistory(video_id, [t for t, _ in points], [v for _, v in points], published.get(video_id))
+        for video_id, points in samples.items()
+        if len(points) >= min_samples
+    ]
+
+
+class FixedIntervalScheduler:
+    """对照组：所有视频按同一间隔刷新，不受预算限制"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.spent = 0
+        self._heap = []
+
+    def load(self, rows: Iterable, now: datetime) -> None:
+        self._heap = []
+        for row in rows:
+            last = parse_time(row["fetch_time"])
+            due = datetime.min if last is None else last + timedelta(seconds=self.interval)
+            self._heap.append((due, row["video_id"]))
+        heapq.heapify(self._heap)
+
+    def pop_due(self, now: datetime, limit: int = None) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        if due:
+            self.spent += -(-len(due) // MAX_IDS_PER_REQUEST) * Config.QUOTA_COSTS["videos"]
+        return due
+
+
+def replay(histories: List[VideoHistory], scheduler, tick: float = 300,
+           window_hours: float = None, start: datetime = None,
+           end: datetime = None) -> Dict[str, Any]:
+    """
+    在历史数据上回放一个轮询策略
+
+    每个时间步先按调度器取出到期的视频并“刷新”（读取该时刻的真实观看量），
+    再对所有已发布的视频比较最近一次采样值与真实值。
+
+    Args:
+        histories: 视频历史列表
+        scheduler: 调度器，需要提供 load(rows, now) 和 pop_due(now)
+        tick: 时间步长（秒），与轮询器检查到期视频的间隔对应
+        window_hours: 计算增长速度时回看的小时数，默认使用 Config.POLL_VELOCITY_WINDOW_HOURS
+        start: 回放开始时间，默认为最早的历史记录
+        end: 回放结束时间，默认为最晚的历史记录
+
+    Returns:
+        {"days": 回放天数, "refreshes": 刷新次数, "quota": 消耗的配额单位,
+         "quota_per_day": 折算的每日配额, "mae": 平均绝对误差（观看量）,
+         "mape": 平均相对误差（%）, "p95": 相对误差的 95 分位（%）}
+    """
+    window = timedelta(hours=window_hours or Config.POLL_VELOCITY_WINDOW_HOURS)
+    start = start or min(history.start for history in histories)
+    end = end or max(history.end for history in histories)
+    by_id = {history.video_id: history for history in histories}
+    # 每个视频已采样到的 (时间, 观看量)
+    observed: Dict[str, List] = {video_id: [] for video_id in by_id}
+
+    abs_errors, rel_errors = [], []
+    refreshes = 0
+    now = start
+    step = timedelta(seconds=tick)
+
+    while now <= end:
+        rows = []
+        for video_id, history in by_id.items():
+            if now < history.start:
+                continue
+            points = observed[video_id]
+            row = {
+                "video_id": video_id,
+                "published_at": history.published_at or history.start,
+                "added_at": None,
+                "view_count": None,
+                "fetch_time": None,
+                "baseline_views": None,
+                "baseline_time": None,
+            }
+            if points:
+                row["fetch_time"], row["view_count"] = points[-1]
+                index = min(bisect.bisect_left(points, (now - window,)), len(points) - 1)
+                row["baseline_time"], row["baseline_views"] = points[index]
+            rows.append(row)
+
+        scheduler.load(rows, now)
+        for video_id in scheduler.pop_due(now):
+            observed[video_id].append((now, by_id[video_id].views_at(now)))
+            refreshes += 1
+
+        for row in rows:
+            points = observed[row["video_id"]]
+            actual = by_id[row["video_id"]].views_at(now)
+            estimate = points[-1][1] if points else 0
+            error = abs(actual - estimate)
+            abs_errors.append(error)
+            rel_errors.append(error / max(actual, 1) * 100)
+
+        now += step
+
+    days = max((end - start).total_seconds() / 86400, tick / 86400)
+    rel_errors.sort()
+    return {
+        "days": days,
+        "refreshes": refreshes,
+        "quota": scheduler.spent,
+        "quota_per_day": scheduler.spent / days,
+        "mae": sum(abs_errors) / len(abs_errors) if abs_errors else 0.0,
+        "mape": sum(rel_errors) / len(rel_errors) if rel_errors else 0.0,
+        "p95": rel_errors[int(len(rel_errors) * 0.95)] if rel_errors else 0.0,
+    }
+
+
+def compare_policies(histories: List[VideoHistory], budgets: Iterable[float],
+                     fixed_intervals: Iterable[float], tick: float = 300) -> List[Dict[str, Any]]:
+    """
+    对比固定间隔与不同预算下的自适应调度
+
+    Args:
+        histories: 视频历史列表
+        budgets: 自适应调度的每日配额预算
+        fixed_intervals: 固定间隔策略的刷新间隔（秒）
+        tick: 时间步长（秒）
+
+    Returns:
+        每个策略一项，包含 policy 名称和 replay 的结果
+    """
+    results = []
+    for interval in fixed_intervals:
+        result = replay(histories, FixedIntervalScheduler(interval), tick=tick)
+        result["policy"] = f"固定 {interval / 60:g} 分钟"
+        results.append(result)
+    for budget in budgets:
+        result = replay(histories, PollScheduler(daily_budget=budget), tick=tick)
+        result["policy"] = f"自适应 预算 {budget:g}/天"
+        results.append(result)
+    return results
@@ -0,0 +1,76 @@
+"""
+测试 HTTP 会话的连接复用、gzip 和连接池上限（使用本地模拟服务器）
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from api.session import create_session, get_session_pool_stats
+from api.youtube_api import YouTubeAPI
+from api.quota import QuotaLimiter
+
+
+def _get_many(session, url, count, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            lambda i: session.get(f"{url}/videos", params={"id": f"vid{i}"}, timeout=10),
+            range(count),
+        ))
+
+
+def test_repeated_requests_reuse_one_connection(temp_db, stub_api):
+    """顺序调用 get_video_info 只建立一个连接"""
+    api = YouTubeAPI("test-key", base_url=stub_api.url, session=create_session(),
+                     quota=QuotaLimiter(), use_cache=False)
+
+    for i in range(5):
+        videos = api.get_video_info([f"vid{i}"])
+        assert [video["video_id"] for video in videos] == [f"vid{i}"]
+
+    hosts = api.get_pool_stats()["hosts"]
+    assert len(hosts) == 1
+    host = next(iter(hosts.values()))
+    assert host["requests"] == 5
+    assert host["connections_created"] == 1
+    assert host["reuse_ratio"] > 0
+    assert len(stub_api.client_ports) == 5
+    assert len(set(stub_api.client_ports)) == 1
+
+
+def test_requests_accept_gzip(temp_db, stub_api):
+    """请求声明接受 gzip，压缩的响应可以正常解析"""
+    api = YouTubeAPI("test-key", base_url=stub_api.url, session=create_session(),
+                     quota=QuotaLimiter(), use_cache=False)
+
+    videos = api.get_video_info(["abc"])
+
+    assert videos[0]["title"] == "Video abc"
+    assert stub_api.accept_encodings
+    assert all("gzip" in value for value in stub_api.accept_encodings)
+
+
+def test_pool_block_caps_concurrent_sockets(stub_api):
+    """pool_block=True 时并发连接数不超过 Config.HTTP_POOL_MAXSIZE"""
+    stub_api.delay = 0.05
+    session = create_session()
+    workers = Config.HTTP_POOL_MAXSIZE * 3
+
+    responses = _get_many(session, stub_api.url, workers * 2, workers)
+
+    assert all(response.ok for response in responses)
+    assert 1 < stub_api.max_in_flight <= Config.HTTP_POOL_MAXSIZE
+    assert len(set(stub_api.client_ports)) <= Config.HTTP_POOL_MAXSIZE
+    host = next(iter(get_session_pool_stats(session, stub_api.url)["hosts"].values()))
+    assert host["connections_created"] <= Config.HTTP_POOL_MAXSIZE
+
+
+def test_without_pool_block_sockets_exceed_pool(stub_api):
+    """对照：pool_block=False 时并发请求会打开超出连接池上限的连接"""
+    stub_api.delay = 0.05
+    session = create_session(pool_block=False)
+    workers = Config.HTTP_POOL_MAXSIZE * 3
+
+    responses = _get_many(session, stub_api.url, workers * 2, workers)
+
+    assert all(response.ok for response in responses)
+    assert stub_api.max_in_flight > Config.HTTP_POOL_MAXSIZE
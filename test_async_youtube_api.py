@@ -0,0 +1,100 @@
+"""
+测试异步 YouTube API 客户端（使用本地模拟服务器）
+
+httpx 和 “requests 会话 + 线程” 两种传输方式都会测试；没有安装 httpx 时跳过前者
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from config import Config
+import api.async_youtube_api as async_youtube_api
+from api.async_youtube_api import AsyncYouTubeAPI, _run_sync, fetch_comments_for_videos
+from api.youtube_api import YouTubeAPI
+from api.quota import QuotaLimiter
+
+VIDEO_IDS = [f"vid{i:02d}" for i in range(12)]
+
+
+@pytest.fixture(params=["httpx", "threads"])
+def transport(request, monkeypatch):
+    """切换异步客户端的传输方式"""
+    if request.param == "httpx":
+        pytest.importorskip("httpx")
+        monkeypatch.setattr(async_youtube_api, "HAS_HTTPX", True)
+    else:
+        # 强制走回退路径：即使安装了 httpx 也不使用
+        monkeypatch.setattr(async_youtube_api, "HAS_HTTPX", False)
+        monkeypatch.setattr(async_youtube_api, "httpx", None, raising=False)
+    return request.param
+
+
+def _get_comments(base_url, video_ids, max_results, **kwargs):
+    async def run():
+        async with AsyncYouTubeAPI("test-key", base_url, quota=QuotaLimiter(),
+                                   use_cache=False, **kwargs) as api:
+            return await api.get_comments_for_videos(video_ids, max_results)
+
+    return asyncio.run(run())
+
+
+def test_comments_match_sequential_client(temp_db, stub_api, transport):
+    """并发获取的评论与同步客户端逐个获取的结果一致"""
+    sync_api = YouTubeAPI("test-key", base_url=stub_api.url, quota=QuotaLimiter(),
+                          use_cache=False)
+    expected = {vid: sync_api.get_video_comments(vid, max_results=10) for vid in VIDEO_IDS}
+
+    result = _get_comments(stub_api.url, VIDEO_IDS, 10)
+
+    assert result == expected
+    assert all(len(comments) == 10 for comments in result.values())
+
+
+def test_concurrency_is_capped(temp_db, stub_api, transport):
+    """服务器同时处理的请求数不超过 Config.API_ASYNC_CONCURRENCY"""
+    stub_api.delay = 0.05
+
+    result = _get_comments(stub_api.url, VIDEO_IDS, 100)
+
+    assert set(result) == set(VIDEO_IDS)
+    assert 1 < stub_api.max_in_flight <= Config.API_ASYNC_CONCURRENCY
+
+
+def test_sync_facade_inside_running_loop(temp_db, stub_api, transport):
+    """在已有事件循环的线程中调用同步接口"""
+    outcome = {}
+
+    def worker():
+        async def main():
+            # 当前线程的事件循环正在运行，_run_sync 需要换到新线程执行
+            asyncio.get_running_loop()
+            return fetch_comments_for_videos(VIDEO_IDS[:3], max_results=5,
+                                             api_key="test-key", base_url=stub_api.url)
+
+        try:
+            outcome["value"] = asyncio.run(main())
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive()
+    assert "error" not in outcome, outcome.get("error")
+    assert list(outcome["value"]) == VIDEO_IDS[:3]
+    assert all(len(comments) == 5 for comments in outcome["value"].values())
+
+
+def test_run_sync_propagates_errors_inside_running_loop():
+    """新线程中协程抛出的异常会传回调用方"""
+    async def fail():
+        raise ValueError("boom")
+
+    async def main():
+        return _run_sync(fail())
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+测试评论增量同步（使用本地模拟服务器）：高水位截止、断点续传、高水位只在同步完成后推进
+
+模拟服务器每个视频返回 STUB_COMMENT_PAGES 页评论，第 page 页的评论都发布于
+2024-01-(10 - page)，即按时间倒序，同一页的评论发布时间相同。
+"""
+
+import api.comments as comments
+from api import ResponseCache, YouTubeAPI, sync_comments, sync_video_comments
+from api.quota import QuotaLimiter
+from conftest import STUB_COMMENT_PAGES, STUB_COMMENTS_PER_PAGE
+from database import get_comment_sync_state, save_comment_sync_state, get_db_connection
+
+VIDEO = "v1"
+
+
+def _api(stub_api):
+    return YouTubeAPI("test-key", base_url=stub_api.url, quota=QuotaLimiter(),
+                      cache=ResponseCache(ttl=0))
+
+
+def _published(page: int) -> str:
+    return f"2024-01-{10 - page:02d}T00:00:00Z"
+
+
+def _saved_comment_ids() -> set:
+    with get_db_connection() as conn:
+        rows = conn.execute("SELECT comment_id FROM comments WHERE video_id = ?", (VIDEO,)).fetchall()
+    return {row["comment_id"] for row in rows}
+
+
+def test_first_sync_fetches_everything(temp_db, stub_api):
+    result = sync_video_comments(VIDEO, _api(stub_api))
+
+    assert result["complete"] and not result["resumed"]
+    assert result["pages"] == STUB_COMMENT_PAGES
+    assert result["fetched"] == result["saved"] == STUB_COMMENT_PAGES * STUB_COMMENTS_PER_PAGE
+
+    state = get_comment_sync_state(VIDEO)
+    assert state["high_water"] == _published(0)
+    assert state["page_token"] is None and state["pending_high_water"] is None
+
+
+def test_high_water_cuts_off_and_keeps_same_second(temp_db, stub_api):
+    """早于高水位的评论不再抓取；与高水位同一秒的评论重新抓取一次"""
+    save_comment_sync_state(VIDEO, None, _published(1), None, completed=True)
+
+    result = sync_video_comments(VIDEO, _api(stub_api))
+
+    # 第 0 页更新，第 1 页与高水位同一秒，第 2 页早于高水位后停止
+    assert result["complete"]
+    assert result["pages"] == 3
+    assert result["fetched"] == 2 * STUB_COMMENTS_PER_PAGE
+    assert _saved_comment_ids() == {f"{VIDEO}-p{page}-c{index}"
+                                    for page in (0, 1) for index in range(STUB_COMMENTS_PER_PAGE)}
+    assert get_comment_sync_state(VIDEO)["high_water"] == _published(0)
+
+    # 没有新评论时只重新抓取与高水位同一秒的一页
+    result = sync_video_comments(VIDEO, _api(stub_api))
+    assert result["complete"]
+    assert result["pages"] == 2
+    assert result["fetched"] == STUB_COMMENTS_PER_PAGE
+    assert len(_saved_comment_ids()) == 2 * STUB_COMMENTS_PER_PAGE
+
+
+def test_resume_from_saved_page_token(temp_db, stub_api):
+    """达到页数上限后保存 pageToken，下次从断点继续"""
+    api = _api(stub_api)
+
+    first = sync_video_comments(VIDEO, api, max_pages=2, batch_size=1)
+    assert not first["complete"] and not first["resumed"]
+    assert first["pages"] == 2
+    state = get_comment_sync_state(VIDEO)
+    assert state["page_token"] == "2"
+    assert state["fetched"] == 2 * STUB_COMMENTS_PER_PAGE
+
+    requests_before = len(stub_api.client_ports)
+    second = sync_video_comments(VIDEO, api)
+    assert second["resumed"] and second["complete"]
+    assert second["pages"] == STUB_COMMENT_PAGES - 2
+    assert len(stub_api.client_ports) - requests_before == STUB_COMMENT_PAGES - 2
+    assert len(_saved_comment_ids()) == STUB_COMMENT_PAGES * STUB_COMMENTS_PER_PAGE
+
+    state = get_comment_sync_state(VIDEO)
+    assert state["page_token"] is None
+    assert state["fetched"] == STUB_COMMENT_PAGES * STUB_COMMENTS_PER_PAGE
+
+
+def test_restart_ignores_saved_page_token(temp_db, stub_api):
+    api = _api(stub_api)
+    sync_video_comments(VIDEO, api, max_pages=2)
+
+    result = sync_video_comments(VIDEO, api, restart=True)
+
+    assert not result["resumed"] and result["complete"]
+    assert result["pages"] == STUB_COMMENT_PAGES
+
+
+def test_pending_high_water_promoted_only_on_completion(temp_db, stub_api):
+    """中断的同步只记录 pending_high_water，完成后才推进高水位"""
+    api = _api(stub_api)
+    save_comment_sync_state(VIDEO, None, _published(2), None, completed=True)
+
+    result = sync_video_comments(VIDEO, api, max_pages=1)
+    assert not result["complete"]
+    state = get_comment_sync_state(VIDEO)
+    assert state["high_water"] == _published(2)
+    assert state["pending_high_water"] == _published(0)
+    assert state["page_token"] == "1"
+
+    # 续传时仍按旧高水位截止：第 1、2 页照常抓取，第 3 页早于旧高水位
+    result = sync_video_comments(VIDEO, api)
+    assert result["resumed"] and result["complete"]
+    assert result["pages"] == 3
+    assert result["fetched"] == 2 * STUB_COMMENTS_PER_PAGE
+
+    state = get_comment_sync_state(VIDEO)
+    assert state["high_water"] == _published(0)
+    assert state["pending_high_water"] is None and state["page_token"] is None
+
+
+def test_default_client_revalidates(temp_db, stub_api, monkeypatch):
+    """默认客户端用 ETag 重新验证，不按 TTL 返回缓存的旧评论页"""
+    created = []
+
+    def make_api(**kwargs):
+        created.append(kwargs)
+        return YouTubeAPI("test-key", base_url=stub_api.url, quota=QuotaLimiter(), **kwargs)
+
+    monkeypatch.setattr(comments, "YouTubeAPI", make_api)
+
+    results = sync_comments([VIDEO, VIDEO])
+
+    assert len(results) == 1 and results[0]["complete"]
+    assert len(created) == 1
+    assert created[0]["cache"].ttl == 0
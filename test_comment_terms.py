@@ -0,0 +1,142 @@
+"""
+测试评论词频表 comment_terms 的触发器维护和词云缓存的刷新
+"""
+
+import random
+import sqlite3
+
+import pytest
+
+from config import Config
+import analytics.comment_analytics as comment_analytics
+from analytics import enrich_pending_comments, generate_word_cloud
+from database import save_comment, get_token_frequencies, get_token_frequency_version
+from database.connection import REBUILD_COMMENT_TERMS_SQL, GLOBAL_TERMS_KEY
+
+WORDS = ["great", "video", "music", "awesome", "tutorial", "editing", "camera", "lighting",
+         "音乐", "视频", "教程"]
+
+
+def _connect(db_dir) -> sqlite3.Connection:
+    return sqlite3.connect(str(db_dir / Config.DB_PATH), isolation_level=None)
+
+
+def _terms(conn: sqlite3.Connection) -> dict:
+    return {(video_id, term): count for video_id, term, count in conn.execute(
+        "SELECT video_id, term, count FROM comment_terms"
+    )}
+
+
+def _rebuilt_terms(conn: sqlite3.Connection) -> dict:
+    """在回滚的事务中按 REBUILD_COMMENT_TERMS_SQL 重新计算词频"""
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DELETE FROM comment_terms")
+        for statement in REBUILD_COMMENT_TERMS_SQL:
+            conn.execute(statement)
+        return _terms(conn)
+    finally:
+        conn.execute("ROLLBACK")
+
+
+def _text(rng: random.Random) -> str:
+    # 允许同一条评论中重复出现的词，以及没有任何词的评论
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))) or "ok"
+
+
+def _save(video_id: str, comment_id: str, text: str) -> None:
+    assert save_comment(video_id, {"comment_id": comment_id, "author_name": "author", "text": text})
+
+
+def test_terms_match_rebuild_after_edits_and_deletes(temp_db):
+    """新增、修改、删除评论并重新预处理后，词频表与全量重建的结果一致"""
+    rng = random.Random(42)
+    conn = _connect(temp_db)
+    comments = {}
+
+    for step in range(200):
+        action = rng.randrange(4)
+        if action < 2 or not comments:
+            comment_id = f"c{step}"
+            comments[comment_id] = rng.choice(["v1", "v2", "v3"])
+            _save(comments[comment_id], comment_id, _text(rng))
+        elif action == 2:
+            # 修改文本：触发器删除旧的预处理结果，重新预处理后写入新的分词
+            comment_id = rng.choice(sorted(comments))
+            _save(comments[comment_id], comment_id, _text(rng))
+        else:
+            comment_id = rng.choice(sorted(comments))
+            conn.execute("DELETE FROM comments WHERE comment_id = ?", (comment_id,))
+            del comments[comment_id]
+
+        if step % 20 == 19:
+            enrich_pending_comments()
+            terms = _terms(conn)
+            assert terms == _rebuilt_terms(conn)
+            assert all(count > 0 for count in terms.values())
+
+    assert any(video_id == GLOBAL_TERMS_KEY for video_id, _ in _terms(conn))
+    conn.close()
+
+
+def test_versions_bump_on_changes(temp_db):
+    """词频变化时递增该视频和全局的版本号，其他视频不受影响"""
+    _save("v1", "a", "great music video")
+    _save("v2", "b", "camera tutorial")
+    enrich_pending_comments()
+    before = {vid: get_token_frequency_version(vid) for vid in ("v1", "v2", None)}
+    assert all(version > 0 for version in before.values())
+
+    _save("v1", "a", "great lighting")
+    enrich_pending_comments()
+    after_edit = {vid: get_token_frequency_version(vid) for vid in ("v1", "v2", None)}
+    assert after_edit["v1"] > before["v1"]
+    assert after_edit[None] > before[None]
+    assert after_edit["v2"] == before["v2"]
+    assert get_token_frequencies("v1") == {"great": 1, "lighting": 1}
+
+    conn = _connect(temp_db)
+    conn.execute("DELETE FROM comments WHERE comment_id = 'a'")
+    conn.close()
+    assert get_token_frequency_version("v1") > after_edit["v1"]
+    assert get_token_frequency_version(None) > after_edit[None]
+    assert get_token_frequencies("v1") == {}
+    assert get_token_frequencies() == {"camera": 1, "tutorial": 1}
+
+
+class FakeWordCloud:
+    """代替 wordcloud.WordCloud，记录生成时使用的词频"""
+
+    def __init__(self, **kwargs):
+        self.frequencies = None
+
+    def generate_from_frequencies(self, frequencies):
+        self.frequencies = dict(frequencies)
+        return self
+
+
+@pytest.fixture
+def fake_word_cloud(monkeypatch):
+    monkeypatch.setattr(comment_analytics, "HAS_WORDCLOUD", True)
+    monkeypatch.setattr(comment_analytics, "WordCloud", FakeWordCloud, raising=False)
+    comment_analytics._build_word_cloud.cache_clear()
+    yield
+    comment_analytics._build_word_cloud.cache_clear()
+
+
+def test_word_cloud_cache_refreshes_after_edit(temp_db, fake_word_cloud):
+    """词频没有变化时复用缓存的词云，评论修改后重新生成"""
+    _save("v1", "a", "great music video")
+    enrich_pending_comments()
+
+    first = generate_word_cloud("v1")
+    assert first.frequencies == {"great": 1, "music": 1, "video": 1}
+    assert generate_word_cloud("v1") is first
+
+    _save("v1", "a", "awesome awesome tutorial")
+    enrich_pending_comments()
+
+    refreshed = generate_word_cloud("v1")
+    assert refreshed is not first
+    assert refreshed.frequencies == {"awesome": 2, "tutorial": 1}
+    assert generate_word_cloud().frequencies == refreshed.frequencies
@@ -0,0 +1,79 @@
+"""
+测试租约锁：租约有效期内互斥、过期后接管、被接管后续约失败、只能释放自己的锁
+"""
+
+import pytest
+
+import database.locks as locks
+from database import acquire_lock, renew_lock, release_lock, get_lock_holder
+
+LOCK = "poller"
+TTL = 60
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(locks, "time", fake)
+    return fake
+
+
+def test_second_owner_refused_while_lease_live(temp_db, clock):
+    """租约有效期内其他持有者获取失败，持有者自己可以重复获取"""
+    assert acquire_lock(LOCK, "a", TTL)
+
+    clock.now += TTL - 1
+    assert not acquire_lock(LOCK, "b", TTL)
+    assert acquire_lock(LOCK, "a", TTL)
+    assert get_lock_holder(LOCK)["owner"] == "a"
+
+
+def test_expired_lease_is_taken_over(temp_db, clock):
+    """租约到期后其他持有者可以接管"""
+    assert acquire_lock(LOCK, "a", TTL)
+
+    clock.now += TTL
+    assert get_lock_holder(LOCK) is None
+    assert acquire_lock(LOCK, "b", TTL)
+
+    holder = get_lock_holder(LOCK)
+    assert holder["owner"] == "b"
+    assert holder["expires_at"] == clock.now + TTL
+
+
+def test_renew_fails_after_takeover(temp_db, clock):
+    """续约延长租约；锁被接管后原持有者续约失败，也不会改动新持有者的租约"""
+    assert acquire_lock(LOCK, "a", TTL)
+    clock.now += TTL / 2
+    assert renew_lock(LOCK, "a", TTL)
+    assert get_lock_holder(LOCK)["expires_at"] == clock.now + TTL
+
+    clock.now += TTL
+    assert acquire_lock(LOCK, "b", TTL)
+    expires_at = get_lock_holder(LOCK)["expires_at"]
+
+    clock.now += 1
+    assert not renew_lock(LOCK, "a", TTL)
+    assert get_lock_holder(LOCK) == {"owner": "b", "acquired_at": clock.now - 1,
+                                     "expires_at": expires_at}
+
+
+def test_release_by_non_owner_keeps_lock(temp_db, clock):
+    """其他持有者释放不影响当前的锁，持有者释放后锁立即空闲"""
+    assert acquire_lock(LOCK, "a", TTL)
+
+    release_lock(LOCK, "b")
+    assert get_lock_holder(LOCK)["owner"] == "a"
+    assert not acquire_lock(LOCK, "b", TTL)
+
+    release_lock(LOCK, "a")
+    assert get_lock_holder(LOCK) is None
+    assert acquire_lock(LOCK, "b", TTL)
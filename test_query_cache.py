@@ -0,0 +1,137 @@
+"""
+测试查询缓存：读取期间发生写入时不缓存旧数据，以及写函数按标签精确失效
+"""
+
+import threading
+
+import pytest
+
+import database.cache as cache
+from database import (
+    add_video,
+    save_video_stats,
+    save_comment,
+    save_tags,
+    get_video_ids,
+    get_videos,
+    get_video_info,
+    get_latest_stats,
+    get_comments,
+    get_comment_authors,
+    get_all_tags,
+    get_query_cache,
+)
+
+SOURCE = {"value": "old"}
+
+
+@cache.cached_read("race")
+def read_value():
+    return SOURCE["value"]
+
+
+class RacingQueryCache(cache.QueryCache):
+    """写入缓存前在另一个线程中执行一次“写入数据 + 失效”，模拟与读取并发的写函数"""
+
+    def __init__(self):
+        super().__init__()
+        self.writer = None
+
+    def put(self, key, value, tags):
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.start()
+            # 修复前写线程可以在这里完成失效；修复后它要等本次写入结束才能拿到锁
+            writer.join(timeout=0.2)
+        super().put(key, value, tags)
+
+
+def _write():
+    SOURCE["value"] = "new"
+    cache.invalidate_reads("race")
+
+
+def test_write_between_read_and_put_is_not_cached(monkeypatch):
+    """读取完成后、写入缓存前发生的写入不会留下旧数据"""
+    racing = RacingQueryCache()
+    monkeypatch.setattr(cache, "_query_cache", racing)
+    monkeypatch.setitem(SOURCE, "value", "old")
+    writer = racing.writer = threading.Thread(target=_write)
+
+    assert read_value() == "old"
+    writer.join(timeout=5)
+
+    assert not writer.is_alive()
+    assert read_value() == "new"
+
+
+def test_write_during_read_skips_put(monkeypatch):
+    """读取期间已完成的写入使本次结果不写入共享缓存"""
+    monkeypatch.setattr(cache, "_query_cache", cache.QueryCache())
+    monkeypatch.setitem(SOURCE, "value", "old")
+
+    @cache.cached_read("race")
+    def read_then_write():
+        value = SOURCE["value"]
+        _write()
+        return value
+
+    assert read_then_write() == "old"
+    assert cache._query_cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def warm_cache(temp_db):
+    """两个视频的信息、统计、评论和标签，并预先读取一遍填充缓存"""
+    for video_id in ("v1", "v2"):
+        add_video({"video_id": video_id, "title": video_id, "channel_title": "C"})
+        save_video_stats(video_id, {"view_count": 100, "like_count": 5, "comment_count": 1})
+        save_comment(video_id, {"comment_id": f"{video_id}-c", "author_name": "a", "text": "hello"})
+        save_tags(video_id, ["tag"])
+
+    for read, args in READS.values():
+        read(*args)
+
+
+READS = {
+    "video_ids": (get_video_ids, ()),
+    "videos": (get_videos, ()),
+    "info:v1": (get_video_info, ("v1",)),
+    "info:v2": (get_video_info, ("v2",)),
+    "stats:v1": (get_latest_stats, ("v1",)),
+    "stats:v2": (get_latest_stats, ("v2",)),
+    "comments:v1": (get_comments, ("v1",)),
+    "comments:v2": (get_comments, ("v2",)),
+    "authors:v1": (get_comment_authors, ("v1",)),
+    "tags": (get_all_tags, ()),
+}
+
+
+def _invalidated() -> set:
+    """重新读取一遍，返回未命中共享缓存的读取"""
+    missed = set()
+    for name, (read, args) in READS.items():
+        before = get_query_cache().stats()["hits"]
+        read(*args)
+        if get_query_cache().stats()["hits"] == before:
+            missed.add(name)
+    return missed
+
+
+@pytest.mark.parametrize("write, expected", [
+    (lambda: add_video({"video_id": "v1", "title": "renamed"}),
+     {"video_ids", "videos", "info:v1"}),
+    (lambda: save_video_stats("v1", {"view_count": 200}),
+     {"videos", "stats:v1"}),
+    (lambda: save_comment("v1", {"comment_id": "v1-new", "text": "more"}),
+     {"comments:v1", "authors:v1"}),
+    (lambda: save_tags("v1", ["other"]),
+     {"tags"}),
+], ids=["add_video", "save_video_stats", "save_comment", "save_tags"])
+def test_writes_invalidate_only_their_tags(warm_cache, write, expected):
+    """写函数只失效依赖其标签的缓存条目"""
+    assert _invalidated() == set()
+
+    write()
+
+    assert _invalidated() == expected
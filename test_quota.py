@@ -0,0 +1,151 @@
+"""
+测试配额限速器与账本同步：锁外写账本期间发生的同步不会丢掉进行中的消耗
+"""
+
+import pytest
+
+import api.quota as quota
+from api.quota import LEDGER_SYNC_INTERVAL, QuotaLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class StubLedger:
+    """内存中的配额账本；during_record 在写入生效前调用，模拟此时另一个线程与账本同步"""
+
+    def __init__(self):
+        self.rows = {}
+        self.during_record = None
+        self.fail = False
+
+    def record(self, quota_date, endpoint, units, calls=1):
+        if self.during_record is not None:
+            self.during_record()
+        if self.fail:
+            raise RuntimeError("ledger unavailable")
+        item = self.rows.setdefault((quota_date, endpoint), {"units": 0, "calls": 0})
+        item["units"] += units
+        item["calls"] += calls
+
+    def usage(self, quota_date):
+        return {endpoint: item for (day, endpoint), item in self.rows.items() if day == quota_date}
+
+    def total(self) -> int:
+        return sum(item["units"] for item in self.rows.values())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(quota, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    stub = StubLedger()
+    monkeypatch.setattr(quota, "record_quota_usage", stub.record)
+    monkeypatch.setattr(quota, "get_quota_usage", stub.usage)
+    return stub
+
+
+@pytest.fixture
+def quota_day(monkeypatch):
+    day = {"value": "2024-06-01"}
+    monkeypatch.setattr(QuotaLimiter, "quota_date", staticmethod(lambda now=None: day["value"]))
+    return day
+
+
+def test_sync_during_ledger_write_keeps_in_flight_units(clock, ledger, quota_day):
+    """写账本期间到期的同步仍然计入进行中的消耗"""
+    limiter = QuotaLimiter(daily_quota=10000)
+    assert limiter.acquire("videos")
+    assert limiter.status()["used"] == 1
+
+    seen = []
+
+    def concurrent_sync():
+        clock.now += LEDGER_SYNC_INTERVAL
+        seen.append(limiter.status())
+
+    ledger.during_record = concurrent_sync
+    assert limiter.acquire("search")
+    ledger.during_record = None
+
+    cost = QuotaLimiter.cost("search")
+    assert seen[0]["used"] == 1 + cost
+    assert seen[0]["by_endpoint"]["search"] == {"units": cost, "calls": 1}
+
+    # 写入完成后与账本一致，不会重复计入
+    assert limiter.status()["used"] == ledger.total() == 1 + cost
+    clock.now += LEDGER_SYNC_INTERVAL
+    assert limiter.status()["used"] == ledger.total() == 1 + cost
+    assert limiter.status()["by_endpoint"] == {
+        "videos": {"units": 1, "calls": 1},
+        "search": {"units": cost, "calls": 1},
+    }
+
+
+def test_sync_picks_up_other_processes(clock, ledger, quota_day):
+    """定期与账本同步，感知其他进程的消耗"""
+    limiter = QuotaLimiter(daily_quota=10000)
+    assert limiter.acquire("videos")
+
+    ledger.record(quota_day["value"], "videos", 500)
+    assert limiter.status()["used"] == 1
+
+    clock.now += LEDGER_SYNC_INTERVAL
+    assert limiter.status()["used"] == 501
+
+
+def test_failed_ledger_write_is_still_counted(clock, ledger, quota_day):
+    """账本写入失败的消耗在当天的后续同步中仍然计入"""
+    limiter = QuotaLimiter(daily_quota=10000)
+    ledger.fail = True
+    assert limiter.acquire("videos")
+    ledger.fail = False
+    assert limiter.acquire("videos")
+
+    clock.now += LEDGER_SYNC_INTERVAL
+    assert ledger.total() == 1
+    assert limiter.status()["used"] == 2
+
+
+def test_pending_units_reset_on_new_day(clock, ledger, quota_day):
+    limiter = QuotaLimiter(daily_quota=10000)
+    ledger.fail = True
+    assert limiter.acquire("videos")
+
+    quota_day["value"] = "2024-06-02"
+    assert limiter.status()["used"] == 0
+
+
+def test_priority_limit_counts_in_flight_units(clock, ledger, quota_day, monkeypatch):
+    """优先级上限按包含进行中消耗的用量判断"""
+    monkeypatch.setitem(quota.Config.QUOTA_PRIORITY_LIMITS, quota.PRIORITY_COMMENTS, 0.5)
+    limiter = QuotaLimiter(daily_quota=4)
+    cost = QuotaLimiter.cost("commentThreads")
+    assert cost == 1
+
+    results = []
+
+    def acquire_during_write():
+        ledger.during_record = None
+        clock.now += LEDGER_SYNC_INTERVAL
+        results.append(limiter.acquire("commentThreads"))
+        results.append(limiter.acquire("commentThreads"))
+
+    ledger.during_record = acquire_during_write
+    assert limiter.acquire("commentThreads")
+
+    assert results == [True, False]
+    assert ledger.total() == 2
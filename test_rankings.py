@@ -0,0 +1,85 @@
+"""
+测试排行榜：每个排行指标的排序和指标值，以及按频道筛选的增长排行
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import Config
+from database import add_video, get_top_videos, invalidate_reads
+
+# 增长排行按 SQLite 的 date('now') 取窗口，统计时间相对当前 UTC 时间构造
+NOW = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) - timedelta(minutes=1)
+
+# 视频 -> (频道, 发布天数, [(几天前, 观看, 点赞, 评论)])，最后一条为最新统计
+VIDEOS = {
+    "a": ("ChanA", 10, [(20, 100, 0, 0), (5, 400, 5, 2), (0, 1000, 10, 5)]),
+    "b": ("ChanA", 1, [(2, 100, 20, 10), (0, 500, 100, 50)]),
+    "c": ("ChanB", 100, [(30, 0, 0, 0), (3, 2990, 30, 300), (0, 3000, 30, 300)]),
+}
+
+
+@pytest.fixture
+def ranked(temp_db):
+    """三个有统计的视频和一个没有统计的视频"""
+    for video_id, (channel, age_days, _) in VIDEOS.items():
+        add_video({"video_id": video_id, "title": video_id, "channel_title": channel,
+                   "published_at": (NOW - timedelta(days=age_days)).isoformat() + "Z"})
+    add_video({"video_id": "d", "title": "d", "channel_title": "ChanB"})
+
+    conn = sqlite3.connect(str(temp_db / Config.DB_PATH), isolation_level=None)
+    for video_id, (_, _, history) in VIDEOS.items():
+        for days_ago, views, likes, comments in history:
+            conn.execute("""
+                INSERT INTO video_stats (video_id, view_count, like_count, comment_count, fetch_time)
+                VALUES (?, ?, ?, ?, ?)
+            """, (video_id, views, likes, comments,
+                  (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")))
+    conn.close()
+    invalidate_reads()
+
+
+def _ranking(metric, **kwargs):
+    frame = get_top_videos(metric, **kwargs)
+    return list(zip(frame["video_id"], frame["value"]))
+
+
+@pytest.mark.parametrize("metric, expected", [
+    ("views", [("c", 3000), ("a", 1000), ("b", 500)]),
+    ("likes", [("b", 100), ("c", 30), ("a", 10)]),
+    ("comments", [("c", 300), ("b", 50), ("a", 5)]),
+    ("engagement", [("b", 150 / 500), ("c", 330 / 3000), ("a", 15 / 1000)]),
+    # 日均观看量：发布不足 1 天按 1 天计
+    ("velocity", [("b", 500), ("a", 100), ("c", 30)]),
+    # 最近 7 天内的增长：a 从 5 天前的 400 增长到 1000，更早的快照不计入
+    ("growth", [("a", 600), ("b", 400), ("c", 10)]),
+])
+def test_each_metric(ranked, metric, expected):
+    frame = get_top_videos(metric)
+
+    assert frame["video_id"].tolist() == [video_id for video_id, _ in expected]
+    assert frame["value"].tolist() == pytest.approx([value for _, value in expected], rel=1e-3)
+    assert frame["value"].dtype == "float64"
+    assert frame["view_count"].tolist() == [VIDEOS[vid][2][-1][1] for vid in frame["video_id"]]
+
+
+def test_limit_and_unknown_metric(ranked):
+    assert [video_id for video_id, _ in _ranking("views", limit=2)] == ["c", "a"]
+    with pytest.raises(ValueError):
+        get_top_videos("shares")
+
+
+def test_growth_with_channel_filter(ranked):
+    """按频道筛选的增长排行：频道参数与窗口参数、其他筛选条件的顺序正确"""
+    assert _ranking("growth", channel="ChanB") == [("c", 10)]
+    assert _ranking("growth", channel="ChanA") == [("a", 600), ("b", 400)]
+
+    # 3 天窗口内 a 只有今天的快照，b 有 2 天前的快照
+    assert _ranking("growth", channel="ChanA", window_days=3) == [("b", 400), ("a", 0)]
+
+    # 频道之后的筛选参数（最低观看量）仍对应正确的占位符
+    assert _ranking("growth", channel="ChanA", min_views=600) == [("a", 600)]
+    assert _ranking("growth", channel="ChanA", active=True, min_views=600, window_days=3) == [("a", 0)]
+    assert _ranking("growth", channel="Nobody") == []
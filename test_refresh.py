@@ -0,0 +1,50 @@
+"""
+测试批量刷新视频（使用本地模拟服务器）
+"""
+
+import pytest
+
+from api import ResponseCache, YouTubeAPI, refresh_videos
+from api.quota import QuotaLimiter
+from database import get_latest_stats, get_video_ids
+
+
+def _api(stub_api, **kwargs):
+    return YouTubeAPI("test-key", base_url=stub_api.url, quota=QuotaLimiter(), **kwargs)
+
+
+def test_refresh_saves_videos_and_stats(temp_db, stub_api):
+    """获取到的视频信息和统计批量写入数据库"""
+    result = refresh_videos(["a1", "b2", "a1"], _api(stub_api, cache=ResponseCache(ttl=0)))
+
+    assert result["requested"] == 2
+    assert result["missing"] == []
+    assert result["videos"]["succeeded"] == result["stats"]["succeeded"] == 2
+    assert sorted(get_video_ids()) == ["a1", "b2"]
+    assert get_latest_stats("a1")["view_count"] == 1000
+
+
+def test_refresh_revalidates_every_time(temp_db, stub_api):
+    """重新验证的缓存每次刷新都会请求 API"""
+    api = _api(stub_api, cache=ResponseCache(ttl=0))
+
+    refresh_videos(["a1"], api)
+    refresh_videos(["a1"], api)
+
+    assert len(stub_api.client_ports) == 2
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_refresh_accepts_revalidating_clients(temp_db, stub_api, use_cache):
+    """use_cache=False 的客户端同样可以用于刷新"""
+    api = _api(stub_api, cache=ResponseCache(ttl=0)) if use_cache else _api(stub_api, use_cache=False)
+    assert refresh_videos(["a1"], api)["stats"]["succeeded"] == 1
+
+
+def test_refresh_rejects_ttl_cache(temp_db, stub_api):
+    """按 TTL 直接返回缓存的客户端可能拿到旧统计，拒绝使用"""
+    api = _api(stub_api, cache=ResponseCache(ttl=300))
+
+    with pytest.raises(ValueError):
+        refresh_videos(["a1"], api)
+    assert stub_api.client_ports == []
@@ -0,0 +1,231 @@
+"""
+测试 API 容错：失败分类、Retry-After 解析与上限、熔断器状态转换
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from config import Config
+import api.resilience as resilience
+from api.resilience import (
+    CircuitBreaker,
+    backoff_delay,
+    describe_failure,
+    get_error_reason,
+    parse_retry_after,
+)
+
+
+def _response(status_code: int, reason: str = None, retry_after: str = None,
+              body: bytes = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "HTTP Reason"
+    if body is None:
+        error = {"code": status_code, "message": "error message"}
+        if reason:
+            error["errors"] = [{"reason": reason, "domain": "youtube.quota"}]
+        body = json.dumps({"error": error}).encode()
+    response._content = body
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+@pytest.mark.parametrize("status_code, reason, retryable", [
+    (403, "quotaExceeded", False),
+    (403, "dailyLimitExceeded", False),
+    (403, "forbidden", False),
+    (403, "rateLimitExceeded", True),
+    (403, "userRateLimitExceeded", True),
+    (429, None, True),
+    (408, None, True),
+    (500, "backendError", True),
+    (502, None, True),
+    (503, None, True),
+    (504, None, True),
+    (400, "keyInvalid", False),
+    (404, "videoNotFound", False),
+])
+def test_response_classification(status_code, reason, retryable):
+    """配额耗尽、密钥无效等不重试；限流、429 和 5xx 重试"""
+    result, message, retry_after = describe_failure(response=_response(status_code, reason))
+
+    assert result is retryable
+    assert message.startswith(f"HTTP {status_code}")
+    assert retry_after is None
+
+
+@pytest.mark.parametrize("exc, retryable", [
+    (requests.exceptions.ConnectTimeout("connect timeout"), True),
+    (requests.exceptions.ReadTimeout("read timeout"), True),
+    (requests.exceptions.ConnectionError("reset"), True),
+    (requests.exceptions.SSLError("handshake"), True),
+    (requests.exceptions.InvalidURL("bad url"), False),
+    (requests.exceptions.TooManyRedirects("loop"), False),
+    (ValueError("bad json"), False),
+])
+def test_exception_classification(exc, retryable):
+    """超时和连接错误重试，其余异常不重试"""
+    assert describe_failure(exc=exc) == (retryable, str(exc), None)
+
+
+def test_error_reason_falls_back_to_status_text():
+    """错误响应不是 JSON 时使用 HTTP 状态说明"""
+    assert get_error_reason(_response(503, body=b"<html>unavailable</html>")) == "HTTP Reason"
+    assert get_error_reason(_response(403, reason="quotaExceeded")) == "quotaExceeded"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0),
+    ("1.5", 1.5),
+    ("-5", 0.0),
+    ("soon", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    """HTTP 日期转换为距现在的秒数，已经过去的日期为 0"""
+    now = datetime.now(timezone.utc)
+
+    assert parse_retry_after(format_datetime(now + timedelta(seconds=30), usegmt=True)) == \
+        pytest.approx(30, abs=2)
+    assert parse_retry_after(format_datetime(now - timedelta(minutes=5), usegmt=True)) == 0.0
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    """抖动取区间下限，退避时间只由 Retry-After 决定"""
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: low)
+
+
+def test_retry_after_is_capped(no_jitter):
+    """Retry-After 作为等待下限，但不超过 Config.API_RETRY_AFTER_MAX"""
+    assert backoff_delay(0) == 0
+    assert backoff_delay(0, retry_after=5) == 5
+    assert backoff_delay(0, retry_after=Config.API_RETRY_AFTER_MAX * 10) == Config.API_RETRY_AFTER_MAX
+
+
+def test_retry_after_from_response_is_capped(no_jitter):
+    """从 429 响应解析出的 Retry-After 经退避计算后同样受上限约束"""
+    retryable, _, retry_after = describe_failure(response=_response(429, retry_after="86400"))
+
+    assert retryable
+    assert retry_after == 86400
+    assert backoff_delay(1, retry_after) == Config.API_RETRY_AFTER_MAX
+
+
+def test_backoff_ceiling(monkeypatch):
+    """抖动上限按指数增长，不超过 Config.API_RETRY_MAX_DELAY，且不低于 Retry-After"""
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+
+    assert backoff_delay(0) == Config.API_RETRY_BASE_DELAY
+    assert backoff_delay(2) == Config.API_RETRY_BASE_DELAY * 4
+    assert backoff_delay(30) == Config.API_RETRY_MAX_DELAY
+    assert backoff_delay(30, retry_after=1) == Config.API_RETRY_MAX_DELAY
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
+
+
+def test_breaker_opens_after_threshold(clock):
+    """连续失败达到阈值后打开，期间拒绝请求"""
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 10
+
+    clock.now += 9.5
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(0.5)
+    assert breaker.stats() == {"state": CircuitBreaker.OPEN, "consecutive_failures": 3,
+                               "times_opened": 1, "rejected": 2}
+
+
+def test_breaker_success_resets_failures(clock):
+    """成功会清零连续失败次数"""
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_probe_closes(clock):
+    """打开 → 超时后半开（只放行一个探测）→ 探测成功后关闭"""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+    breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 0.0
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.stats()["consecutive_failures"] == 0
+
+
+def test_breaker_half_open_probe_failure_reopens(clock):
+    """探测失败后重新打开，并重新计时"""
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["times_opened"] == 2
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_breaker_lost_probe_is_retried(clock):
+    """探测请求没有回报结果时，超时后允许新的探测"""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+
+    clock.now += 5
+    assert not breaker.allow()
+    clock.now += 5
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
@@ -0,0 +1,170 @@
+"""
+测试自适应轮询调度：分级、新视频间隔上限、超出预算时统一拉长间隔、令牌桶限制
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import Config
+from scheduler import PollScheduler, view_velocity
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+TIER_INTERVALS = {name: interval for name, _, interval in Config.POLL_TIERS}
+
+
+def _row(video_id: str, velocity: float = None, age_days: float = 30,
+         fetched_ago: timedelta = timedelta(0)) -> dict:
+    """
+    按每小时增长速度和发布天数构造 get_active_video_activity 格式的行；
+    fetched_ago 为 None 表示从未刷新过
+    """
+    if fetched_ago is None:
+        return {"video_id": video_id, "published_at": None, "added_at": None, "fetch_time": None,
+                "view_count": None, "baseline_time": None, "baseline_views": None}
+    fetch_time = NOW - fetched_ago
+    return {
+        "video_id": video_id,
+        "published_at": (NOW - timedelta(days=age_days)).isoformat() + "Z",
+        "added_at": None,
+        "fetch_time": fetch_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "view_count": 10000 + int((velocity or 0) * 24),
+        "baseline_time": None if velocity is None else
+        (fetch_time - timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S"),
+        "baseline_views": None if velocity is None else 10000,
+    }
+
+
+@pytest.mark.parametrize("velocity, age_days, tier, interval", [
+    (5000, 30, "hot", TIER_INTERVALS["hot"]),
+    (1000, 30, "hot", TIER_INTERVALS["hot"]),
+    (999, 30, "warm", TIER_INTERVALS["warm"]),
+    (50, 30, "cool", TIER_INTERVALS["cool"]),
+    (0, 30, "cold", TIER_INTERVALS["cold"]),
+    (None, 30, "unknown", Config.POLL_NO_HISTORY_INTERVAL),
+    (None, None, "unknown", Config.POLL_NO_HISTORY_INTERVAL),
+    # 新视频的间隔上限
+    (0, 0.5, "new", 10 * 60),
+    (None, 0.5, "new", 10 * 60),
+    (0, 3, "new", 3600),
+    (0, 1, "new", 3600),
+    (0, 7, "cold", TIER_INTERVALS["cold"]),
+    # 分级间隔已经比上限短时保持原分级
+    (5000, 0.5, "hot", TIER_INTERVALS["hot"]),
+    (50, 3, "new", 3600),
+])
+def test_classify(velocity, age_days, tier, interval):
+    assert PollScheduler().classify(velocity, age_days) == (tier, interval)
+
+
+def test_velocity_needs_enough_history():
+    """两次快照间隔太短或缺少基线时不计算增长速度"""
+    assert view_velocity(_row("a", velocity=120)) == pytest.approx(120)
+    assert view_velocity(_row("a")) is None
+
+    row = _row("a", velocity=120)
+    row["baseline_time"] = (NOW - timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S")
+    assert view_velocity(row) is None
+
+
+def test_load_classifies_rows():
+    scheduler = PollScheduler()
+    scheduler.load([
+        _row("hot", velocity=2000),
+        _row("cold", velocity=1),
+        _row("fresh", velocity=1, age_days=0.2),
+        _row("unknown"),
+    ], NOW)
+
+    assert scheduler.stats()["tiers"] == {"hot": 1, "cold": 1, "new": 1, "unknown": 1}
+    assert scheduler.stretch == 1.0
+
+
+def test_demand_within_budget_is_not_stretched():
+    scheduler = PollScheduler(daily_budget=Config.POLL_DAILY_QUOTA_BUDGET)
+    scheduler.load([_row(f"v{i}", velocity=500) for i in range(10)], NOW)
+
+    assert scheduler.stretch == 1.0
+    assert scheduler.stats()["demand"] <= scheduler.daily_budget
+
+
+def test_demand_over_budget_stretches_uniformly():
+    """需求超出预算时所有间隔按同一倍数拉长，拉长后的需求正好等于预算"""
+    scheduler = PollScheduler(daily_budget=100)
+    rows = ([_row(f"hot{i}", velocity=5000) for i in range(40)]
+            + [_row(f"warm{i}", velocity=500) for i in range(40)]
+            + [_row(f"cold{i}", velocity=1) for i in range(40)])
+    scheduler.load(rows, NOW)
+
+    demand = scheduler.stats()["demand"]
+    assert demand > scheduler.daily_budget
+    assert scheduler.stretch == pytest.approx(demand / scheduler.daily_budget)
+
+    entries = scheduler._entries
+    for entry in entries.values():
+        assert entry["interval"] == pytest.approx(entry["base_interval"] * scheduler.stretch)
+    # 各分级之间的相对频率不变
+    assert entries["warm0"]["interval"] / entries["hot0"]["interval"] == \
+        pytest.approx(TIER_INTERVALS["warm"] / TIER_INTERVALS["hot"])
+
+    refreshes_per_day = sum(86400 / entry["interval"] for entry in entries.values())
+    assert refreshes_per_day == pytest.approx(scheduler.daily_capacity)
+
+
+def test_due_times_follow_stretched_intervals():
+    scheduler = PollScheduler(daily_budget=100)
+    scheduler.load([_row(f"hot{i}", velocity=5000, fetched_ago=timedelta(minutes=1))
+                    for i in range(200)], NOW)
+
+    expected = NOW - timedelta(minutes=1) + timedelta(seconds=TIER_INTERVALS["hot"] * scheduler.stretch)
+    assert scheduler.stretch > 1
+    assert scheduler.next_due() == expected
+    assert scheduler.pop_due(NOW) == []
+
+
+def test_pop_due_respects_token_bucket():
+    """取出的视频数不超过令牌桶中的配额，配额按每日预算的速率恢复"""
+    budget, batch_size = 240, 5
+    scheduler = PollScheduler(daily_budget=budget, batch_size=batch_size)
+    scheduler.load([_row(f"v{i:03d}", fetched_ago=None) for i in range(300)], NOW)
+
+    rate = budget / 86400
+    burst = rate * Config.POLL_BUDGET_BURST
+    unit = Config.QUOTA_COSTS["videos"]
+
+    first = scheduler.pop_due(NOW)
+    assert len(first) == int(burst // unit) * batch_size
+    assert scheduler.pop_due(NOW) == []
+    now = NOW + timedelta(seconds=unit / rate / 2)
+    assert scheduler.pop_due(now) == []
+
+    for _ in range(24 * 60):
+        now += timedelta(minutes=1)
+        before = scheduler._allowance
+        popped = scheduler.pop_due(now)
+        allowance = min(before + rate * 60, burst)
+        assert len(popped) <= int(allowance // unit) * batch_size
+        assert scheduler._allowance >= 0
+        elapsed = (now - NOW).total_seconds()
+        assert scheduler.spent <= burst + rate * elapsed + 1e-9
+
+    assert scheduler.spent == pytest.approx(burst + budget, abs=unit)
+
+
+def test_pop_due_charges_partial_batches():
+    """不满一批的视频按一次请求计费，并受 limit 限制"""
+    scheduler = PollScheduler(daily_budget=240, batch_size=5)
+    scheduler.load([_row(f"v{i}", fetched_ago=None) for i in range(3)]
+                   + [_row("x", fetched_ago=timedelta(days=1))], NOW)
+
+    assert len(scheduler.pop_due(NOW, limit=2)) == 2
+    assert scheduler.spent == Config.QUOTA_COSTS["videos"]
+    assert len(scheduler.pop_due(NOW)) == 2
+    assert scheduler.spent == 2 * Config.QUOTA_COSTS["videos"]
+
+
+@pytest.mark.parametrize("budget", [0, -1])
+def test_non_positive_budget_is_rejected(budget):
+    """预算为 0 或负数时刷新间隔会被拉长为无穷大，直接拒绝"""
+    with pytest.raises(ValueError):
+        PollScheduler(daily_budget=budget)
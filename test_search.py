@@ -0,0 +1,124 @@
+"""
+测试评论搜索：全文索引与 LIKE 回退的选择、FTS5 运算符的转义、LIKE 通配符转义、
+日期范围边界，以及评论更新后全文索引同步
+"""
+
+import pytest
+
+import database.connection as connection
+from database import get_db_connection, save_comment, search_comments
+
+COMMENTS = {
+    "tutorial": ("This tutorial is very helpful", "2024-01-01T08:00:00Z"),
+    "cjk": ("很有帮助的教程", "2024-01-01T09:00:00Z"),
+    "percent": ("100% done_right", "2024-01-01T10:00:00Z"),
+    "plain": ("100 percent doneXright", "2024-01-01T11:00:00Z"),
+    "operators": ("He said NEAR the self-made star* twice", "2024-01-01T12:00:00Z"),
+    "quote": ('she wrote "hi there"', "2024-01-01T13:00:00Z"),
+    "day1": ("day one", "2024-02-01T00:00:00Z"),
+    "day2": ("day two", "2024-02-02T23:59:59Z"),
+    "day3": ("day three", "2024-02-03T00:00:00Z"),
+}
+
+
+def _seed() -> None:
+    for comment_id, (text, published_at) in COMMENTS.items():
+        save_comment("v1", {"comment_id": comment_id, "author_name": "a",
+                            "text": text, "published_at": published_at})
+
+
+def _db(request, monkeypatch, tokenizer: str) -> str:
+    """只允许使用指定分词器建立全文索引，再初始化临时数据库"""
+    candidates = [c for c in connection.COMMENT_FTS_TOKENIZERS if c.split()[0] == tokenizer]
+    monkeypatch.setattr(connection, "COMMENT_FTS_TOKENIZERS", tuple(candidates))
+    request.getfixturevalue("temp_db")
+    with get_db_connection() as conn:
+        if connection.get_comment_fts_tokenizer(conn) != tokenizer:
+            pytest.skip(f"SQLite 不支持 {tokenizer} 分词器")
+    _seed()
+    return tokenizer
+
+
+@pytest.fixture(params=["trigram", "unicode61"])
+def search_db(request, monkeypatch):
+    return _db(request, monkeypatch, request.param)
+
+
+@pytest.fixture
+def trigram_db(request, monkeypatch):
+    return _db(request, monkeypatch, "trigram")
+
+
+def _search(query: str, **kwargs):
+    results = search_comments(query, **kwargs)
+    # LIKE 回退的结果没有相关度得分
+    used_fts = {result["score"] is not None for result in results}
+    assert len(used_fts) <= 1
+    return {result["comment_id"] for result in results}, used_fts.pop() if used_fts else None
+
+
+@pytest.mark.parametrize("query, expected, fts", [
+    ("tutorial", {"tutorial"}, {"trigram": True, "unicode61": True}),
+    # trigram 无法索引少于 3 个字符的关键词
+    ("is", {"tutorial"}, {"trigram": False, "unicode61": True}),
+    # unicode61 不对中文分词
+    ("教程", {"cjk"}, {"trigram": False, "unicode61": False}),
+    ("有帮助", {"cjk"}, {"trigram": True, "unicode61": False}),
+    # 一个关键词不能用全文索引时整个查询都回退
+    ("tutorial is", {"tutorial"}, {"trigram": False, "unicode61": True}),
+])
+def test_fts_or_like_fallback(search_db, query, expected, fts):
+    assert _search(query) == (expected, fts[search_db])
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("self-made", {"operators"}),
+    ("star*", {"operators"}),
+    ("NEAR", {"operators"}),
+    ('"NEAR the"', {"operators"}),
+    ('"hi', {"quote"}),
+    ('wrote "hi', {"quote"}),
+])
+def test_fts_operators_are_quoted(search_db, query, expected):
+    """关键词中的 FTS5 运算符按普通文本匹配，不会报语法错误"""
+    ids, used_fts = _search(query)
+    assert used_fts
+    assert ids == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("%", {"percent"}),
+    ("_", {"percent"}),
+    ("0%", {"percent"}),
+    ("e_", {"percent"}),
+])
+def test_like_escapes_wildcards(trigram_db, query, expected):
+    """LIKE 回退时 % 和 _ 按字面匹配"""
+    assert _search(query) == (expected, False)
+
+
+@pytest.mark.parametrize("query", ["day", "da"], ids=["fts", "like"])
+@pytest.mark.parametrize("start_date, end_date, expected", [
+    ("2024-02-02", "2024-02-02", {"day2"}),
+    ("2024-02-01", "2024-02-02", {"day1", "day2"}),
+    ("2024-02-02", "2024-02-03", {"day2", "day3"}),
+    ("2024-02-03", None, {"day3"}),
+    (None, "2024-02-01", {"day1"}),
+])
+def test_date_bounds_are_inclusive(trigram_db, query, start_date, end_date, expected):
+    """起止日期都包含当天（包括当天最后一秒发布的评论）"""
+    ids, _ = _search(query, start_date=start_date, end_date=end_date)
+    assert ids == expected
+
+
+def test_index_follows_comment_upsert(search_db):
+    """同一 comment_id 再次写入时全文索引随之更新"""
+    assert _search("tutorial") == ({"tutorial"}, True)
+
+    save_comment("v1", {"comment_id": "tutorial", "author_name": "a",
+                        "text": "rewritten remark", "published_at": "2024-01-01T08:00:00Z"})
+
+    assert _search("tutorial") == (set(), None)
+    assert _search("rewritten") == ({"tutorial"}, True)
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0] == len(COMMENTS)
@@ -0,0 +1,146 @@
+"""
+测试统计汇总表的增量维护、按保留策略清理以及历史查询的时间粒度
+"""
+
+import random
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import Config
+from database import add_video, get_video_stats_history, invalidate_reads
+from database.connection import ROLLUP_TABLES, rollup_rebuild_sql
+from database.maintenance import prune_stats
+
+NOW = datetime(2024, 6, 1, 12, 30, 0)
+
+
+def _connect(db_dir) -> sqlite3.Connection:
+    return sqlite3.connect(str(db_dir / Config.DB_PATH), isolation_level=None)
+
+
+def _insert_stats(conn, video_id, fetch_time, views, likes=0, comments=0) -> None:
+    conn.execute("""
+        INSERT INTO video_stats (video_id, view_count, like_count, comment_count, fetch_time)
+        VALUES (?, ?, ?, ?, ?)
+    """, (video_id, views, likes, comments, fetch_time.strftime("%Y-%m-%d %H:%M:%S")))
+
+
+def _rows(conn, table) -> list:
+    return conn.execute(f"SELECT * FROM {table} ORDER BY video_id, bucket").fetchall()
+
+
+def test_incremental_rollups_match_rebuild(temp_db):
+    """触发器增量维护的小时/天汇总与 rollup_rebuild_sql 全量重算的结果一致"""
+    rng = random.Random(7)
+    conn = _connect(temp_db)
+    # 乱序写入，包括同一时间的多次快照
+    times = [NOW - timedelta(minutes=rng.randint(0, 6 * 24 * 60)) for _ in range(150)]
+    times += times[:10]
+    for fetch_time in times:
+        _insert_stats(conn, rng.choice(["v1", "v2", "v3"]), fetch_time,
+                      rng.randint(0, 10000), rng.choice([None, rng.randint(0, 100)]),
+                      rng.randint(0, 10))
+
+    for table, bucket_format in ROLLUP_TABLES.items():
+        incremental = _rows(conn, table)
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(rollup_rebuild_sql(table, bucket_format), ("",))
+            rebuilt = _rows(conn, table)
+        finally:
+            conn.execute("ROLLBACK")
+
+        assert incremental
+        assert incremental == rebuilt, table
+    conn.close()
+
+
+def test_prune_keeps_latest_snapshot_and_daily_rollups(temp_db, monkeypatch):
+    """清理过期原始快照和小时汇总时，保留每个视频的最新快照，天汇总不受影响"""
+    monkeypatch.setattr(Config, "STATS_PRUNE_BATCH_SIZE", 3)
+    raw_days = Config.STATS_RAW_RETENTION_DAYS
+    hourly_days = Config.STATS_HOURLY_RETENTION_DAYS
+    conn = _connect(temp_db)
+
+    # stale：所有快照都已过期，最新一条必须保留
+    for days in (hourly_days + 10, raw_days + 5, raw_days + 1):
+        _insert_stats(conn, "stale", NOW - timedelta(days=days), 100 * days)
+    # fresh：过期快照全部删除，保留期内的快照不动
+    for days in (hourly_days + 20, raw_days + 3, raw_days + 2, 1, 0.5):
+        _insert_stats(conn, "fresh", NOW - timedelta(days=days), int(1000 / days))
+
+    daily_before = _rows(conn, "video_stats_daily")
+    hourly_before = _rows(conn, "video_stats_hourly")
+
+    removed = prune_stats(now=NOW)
+
+    raw_cutoff = (NOW - timedelta(days=raw_days)).strftime("%Y-%m-%d %H:%M:%S")
+    remaining = conn.execute(
+        "SELECT video_id, fetch_time FROM video_stats ORDER BY video_id, fetch_time"
+    ).fetchall()
+    assert [row for row in remaining if row[0] == "stale"] == [
+        ("stale", (NOW - timedelta(days=raw_days + 1)).strftime("%Y-%m-%d %H:%M:%S"))
+    ]
+    assert all(row[1] >= raw_cutoff for row in remaining if row[0] == "fresh")
+    assert len([row for row in remaining if row[0] == "fresh"]) == 2
+    assert removed["raw"] == 2 + 3
+
+    latest = dict(conn.execute("SELECT video_id, stats_id FROM video_latest_stats").fetchall())
+    stats_ids = {row[0] for row in conn.execute("SELECT id FROM video_stats")}
+    assert set(latest.values()) <= stats_ids
+
+    hourly_cutoff = (NOW - timedelta(days=hourly_days)).strftime("%Y-%m-%d %H:00:00")
+    hourly_after = _rows(conn, "video_stats_hourly")
+    assert hourly_after == [row for row in hourly_before if row[1] >= hourly_cutoff]
+    assert removed["hourly"] == len(hourly_before) - len(hourly_after) == 2
+    assert _rows(conn, "video_stats_daily") == daily_before
+    conn.close()
+
+
+@pytest.fixture
+def recent_history(temp_db):
+    """最近几小时内的快照（相对真实当前时间，与查询中的 'now' 一致）"""
+    add_video({"video_id": "hist", "title": "history"})
+    now = datetime.utcnow().replace(minute=30, second=0, microsecond=0)
+    conn = _connect(temp_db)
+    for hours, views in ((2, 100), (2, 300), (1, 500), (0, 700)):
+        _insert_stats(conn, "hist", now - timedelta(hours=hours), views)
+    conn.close()
+    invalidate_reads()
+    return now
+
+
+HOUR_BUCKET = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:00:00$")
+DAY_BUCKET = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def test_short_ranges_use_hourly_buckets(recent_history):
+    """范围不超过 STATS_HOURLY_MAX_RANGE_DAYS 天时按小时返回"""
+    history = get_video_stats_history("hist", days=Config.STATS_HOURLY_MAX_RANGE_DAYS)
+
+    assert [row[0] for row in history] == [
+        (recent_history - timedelta(hours=hours)).strftime("%Y-%m-%d %H:00:00")
+        for hours in (2, 1, 0)
+    ]
+    assert all(HOUR_BUCKET.match(row[0]) for row in history)
+    # 同一小时内的两次快照取平均
+    assert history[0][1] == pytest.approx(200)
+
+
+def test_long_ranges_use_daily_buckets(recent_history):
+    """超过 STATS_HOURLY_MAX_RANGE_DAYS 天时按天返回"""
+    history = get_video_stats_history("hist", days=Config.STATS_HOURLY_MAX_RANGE_DAYS + 1)
+
+    # 两小时内的快照最多跨越一次午夜
+    assert 1 <= len(history) <= 2
+    assert all(DAY_BUCKET.match(row[0]) for row in history)
+
+
+def test_granularity_override(recent_history):
+    """granularity 参数覆盖按范围自动选择的粒度"""
+    assert all(DAY_BUCKET.match(row[0]) for row in get_video_stats_history("hist", 1, "day"))
+    assert all(HOUR_BUCKET.match(row[0]) for row in get_video_stats_history("hist", 30, "hour"))
@@ -0,0 +1,75 @@
+"""
+测试多视频对比：get_video_comparison 的顺序、缺失视频、无统计视频和大批量 ID，
+以及 create_comparison_chart 的指标校验
+"""
+
+import pytest
+
+from analytics import create_comparison_chart
+from database import (
+    add_video,
+    save_video_stats,
+    bulk_add_videos,
+    bulk_save_stats,
+    get_video_comparison,
+)
+
+
+@pytest.fixture
+def videos(temp_db):
+    """v1、v2 有统计，v3 没有统计"""
+    for video_id in ("v1", "v2", "v3"):
+        add_video({"video_id": video_id, "title": f"title {video_id}", "channel_title": "C"})
+    save_video_stats("v1", {"view_count": 100, "like_count": 10, "comment_count": 1, "favorite_count": 3})
+    save_video_stats("v2", {"view_count": 200, "like_count": 20, "comment_count": 2, "favorite_count": 4})
+
+
+def test_keeps_input_order_and_skips_missing(videos):
+    """结果按输入顺序排列，重复 ID 只保留一次，不存在的视频被跳过"""
+    comparison = get_video_comparison(["v2", "missing", "v1", "v2"])
+
+    assert comparison["video_id"] == ["v2", "v1"]
+    assert comparison["title"] == ["title v2", "title v1"]
+    assert comparison["view_count"] == [200, 100]
+    assert comparison["favorite_count"] == [4, 3]
+
+
+def test_video_without_stats_has_null_stats(videos):
+    comparison = get_video_comparison(["v3", "v1"])
+
+    assert comparison["video_id"] == ["v3", "v1"]
+    for column in ("view_count", "like_count", "comment_count", "favorite_count", "fetch_time"):
+        assert comparison[column][0] is None
+    assert comparison["like_count"][1] == 10
+
+
+def test_empty_input(videos):
+    comparison = get_video_comparison([])
+    assert comparison["video_id"] == [] and comparison["view_count"] == []
+
+
+def test_more_than_999_ids(temp_db):
+    """ID 数超过 SQLite 默认参数上限时仍是一次查询，顺序不变"""
+    ids = [f"v{i:04d}" for i in range(1500)]
+    bulk_add_videos({"video_id": video_id, "title": video_id} for video_id in ids)
+    bulk_save_stats({"video_id": video_id, "view_count": i} for i, video_id in enumerate(ids))
+
+    requested = list(reversed(ids)) + ["missing"]
+    comparison = get_video_comparison(requested)
+
+    assert comparison["video_id"] == requested[:-1]
+    assert comparison["view_count"] == list(range(1499, -1, -1))
+
+
+@pytest.mark.parametrize("metric", ["view_count", "like_count", "comment_count", "favorite_count"])
+def test_chart_plots_each_metric(videos, metric):
+    figure = create_comparison_chart(["v1", "v2", "v3"], metric)
+
+    comparison = get_video_comparison(["v1", "v2"])
+    assert list(figure.data[0].y) == comparison[metric]
+
+
+def test_chart_rejects_unknown_metric(videos):
+    """不在对比列中的指标报错，而不是画出全 0 的图"""
+    with pytest.raises(ValueError):
+        create_comparison_chart(["v1"], "dislike_count")
@@ -0,0 +1,178 @@
+"""
+测试概览汇总表 video_kpi_rollup 的触发器维护和 get_overview_kpis 的筛选条件
+"""
+
+import random
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from config import Config
+from database import (
+    add_video,
+    save_video_stats,
+    bulk_add_videos,
+    bulk_save_stats,
+    get_overview_kpis,
+    invalidate_reads,
+)
+from database.connection import REBUILD_VIDEO_KPIS_SQL, VIDEO_KPI_KEYS
+
+CHANNELS = ["Alpha", "Beta", "Gamma", None]
+
+
+def _connect(db_dir) -> sqlite3.Connection:
+    return sqlite3.connect(str(db_dir / Config.DB_PATH), isolation_level=None)
+
+
+def _rollup(conn: sqlite3.Connection) -> dict:
+    rows = conn.execute(
+        f"SELECT * FROM video_kpi_rollup ORDER BY {', '.join(VIDEO_KPI_KEYS)}"
+    ).fetchall()
+    keys = len(VIDEO_KPI_KEYS)
+    return {row[:keys]: row[keys:] for row in rows}
+
+
+def _rebuilt(conn: sqlite3.Connection) -> dict:
+    """在回滚的事务中按 REBUILD_VIDEO_KPIS_SQL 重新计算汇总"""
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DELETE FROM video_kpi_rollup")
+        conn.execute(REBUILD_VIDEO_KPIS_SQL)
+        return _rollup(conn)
+    finally:
+        conn.execute("ROLLBACK")
+
+
+def _assert_matches_rebuild(conn: sqlite3.Connection) -> None:
+    actual, expected = _rollup(conn), _rebuilt(conn)
+    assert actual.keys() == expected.keys()
+    for key, measures in expected.items():
+        # engagement_sum 经过多次加减，允许浮点误差
+        assert actual[key][:-1] == measures[:-1], key
+        assert actual[key][-1] == pytest.approx(measures[-1], abs=1e-9), key
+
+
+def _video(video_id: str, rng: random.Random) -> dict:
+    return {"video_id": video_id, "title": f"Video {video_id}",
+            "channel_title": rng.choice(CHANNELS)}
+
+
+def _stats(rng: random.Random) -> dict:
+    views = rng.choice([0, rng.randint(1, 100000)])
+    return {"view_count": views, "like_count": rng.randint(0, 500),
+            "comment_count": rng.choice([0, rng.randint(1, 50)])}
+
+
+def test_rollup_matches_rebuild_after_random_writes(temp_db):
+    """随机的单条/批量写入、修改和删除后，汇总表与完整重建的结果一致"""
+    rng = random.Random(20240601)
+    video_ids = [f"vid{i:03d}" for i in range(40)]
+    conn = _connect(temp_db)
+
+    for step in range(300):
+        video_id = rng.choice(video_ids)
+        action = rng.randrange(8)
+        if action == 0:
+            add_video(_video(video_id, rng))
+        elif action == 1:
+            # 可能先于视频本身写入统计
+            save_video_stats(video_id, _stats(rng))
+        elif action == 2:
+            bulk_add_videos([_video(vid, rng) for vid in rng.sample(video_ids, 5)])
+        elif action == 3:
+            bulk_save_stats([dict(_stats(rng), video_id=vid) for vid in rng.sample(video_ids, 5)])
+        elif action == 4:
+            conn.execute("UPDATE videos SET is_active = ? WHERE video_id = ?",
+                         (rng.choice([0, 1, None]), video_id))
+        elif action == 5:
+            conn.execute("UPDATE videos SET added_at = ? WHERE video_id = ?",
+                         (f"2024-0{rng.randint(1, 3)}-1{rng.randint(0, 9)} 12:00:00", video_id))
+        elif action == 6:
+            conn.execute("UPDATE videos SET channel_title = ? WHERE video_id = ?",
+                         (rng.choice(CHANNELS), video_id))
+        else:
+            conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+
+        if step % 25 == 0:
+            _assert_matches_rebuild(conn)
+
+    _assert_matches_rebuild(conn)
+    conn.close()
+
+
+@pytest.fixture
+def kpi_videos(temp_db):
+    """三个频道、不同监控状态和添加日期的视频"""
+    videos = [
+        # video_id, 频道, 是否监控中, 添加时间, (观看, 点赞, 评论)
+        ("a1", "Alpha", 1, "2024-01-05 08:00:00", (1000, 40, 10)),
+        ("a2", "Alpha", 0, "2024-02-10 09:30:00", (200, 10, 0)),
+        ("b1", "Beta", 1, "2024-02-10 23:59:59", (0, 0, 0)),
+        ("b2", "Beta", 1, "2024-03-01 00:00:00", None),
+        ("n1", None, 0, "2024-03-15 12:00:00", (500, 0, 25)),
+    ]
+    for video_id, channel, _, _, stats in videos:
+        add_video({"video_id": video_id, "title": video_id, "channel_title": channel})
+        if stats:
+            views, likes, comments = stats
+            save_video_stats(video_id, {"view_count": views, "like_count": likes,
+                                        "comment_count": comments})
+
+    conn = _connect(temp_db)
+    conn.executemany("UPDATE videos SET is_active = ?, added_at = ? WHERE video_id = ?",
+                     [(active, added_at, video_id) for video_id, _, active, added_at, _ in videos])
+    conn.close()
+    invalidate_reads()
+    return videos
+
+
+def _expected(videos, keep) -> dict:
+    selected = [video for video in videos if keep(video)]
+    stats = [video[4] for video in selected if video[4]]
+    rates = [(likes + comments) / views if views else 0.0 for views, likes, comments in stats]
+    return {
+        "video_count": len(selected),
+        "channel_count": len({video[1] or "" for video in selected}),
+        "stats_count": len(stats),
+        "total_views": sum(s[0] for s in stats),
+        "total_likes": sum(s[1] for s in stats),
+        "total_comments": sum(s[2] for s in stats),
+        "avg_engagement_rate": sum(rates) / len(selected) if selected else 0.0,
+    }
+
+
+def _assert_kpis(actual: dict, expected: dict) -> None:
+    assert actual == dict(expected, avg_engagement_rate=pytest.approx(expected["avg_engagement_rate"]))
+
+
+@pytest.mark.parametrize("kwargs, keep", [
+    ({}, lambda v: True),
+    ({"channels": "Alpha"}, lambda v: v[1] == "Alpha"),
+    ({"channels": ["Alpha", "Beta", "Alpha"]}, lambda v: v[1] in ("Alpha", "Beta")),
+    ({"channels": [None]}, lambda v: v[1] is None),
+    ({"channels": []}, lambda v: False),
+    ({"active": True}, lambda v: v[2] == 1),
+    ({"active": False}, lambda v: v[2] == 0),
+    ({"added_from": "2024-02-10"}, lambda v: v[3] >= "2024-02-10"),
+    ({"added_to": date(2024, 2, 10)}, lambda v: v[3][:10] <= "2024-02-10"),
+    ({"added_from": datetime(2024, 2, 1, 18, 0), "added_to": "2024-03-01T06:00:00"},
+     lambda v: "2024-02-01" <= v[3][:10] <= "2024-03-01"),
+    ({"channels": "Beta", "active": True, "added_to": "2024-02-28"},
+     lambda v: v[1] == "Beta" and v[2] == 1 and v[3][:10] <= "2024-02-28"),
+])
+def test_overview_kpi_filters(kpi_videos, kwargs, keep):
+    """频道、监控状态和添加日期筛选下推到汇总表后结果正确"""
+    _assert_kpis(get_overview_kpis(**kwargs), _expected(kpi_videos, keep))
+
+
+def test_overview_kpis_follow_writes(kpi_videos):
+    """写入新的统计后，缓存的概览指标随之更新"""
+    before = get_overview_kpis(channels="Beta")
+    save_video_stats("b2", {"view_count": 300, "like_count": 30, "comment_count": 0})
+    after = get_overview_kpis(channels="Beta")
+
+    assert after["stats_count"] == before["stats_count"] + 1
+    assert after["total_views"] == before["total_views"] + 300
+    assert after["avg_engagement_rate"] == pytest.approx(0.1 / 2)
@@ -0,0 +1,70 @@
+"""
+测试分组并发获取视频信息：结果顺序，以及工作线程中的失败提示由调用线程显示
+"""
+
+import threading
+
+import pytest
+
+import api.youtube_api as youtube_api
+from api import YouTubeAPI
+from api.quota import QuotaLimiter
+from api.resilience import CircuitBreaker
+
+VIDEO_IDS = [f"v{i:03d}" for i in range(3 * youtube_api.MAX_IDS_PER_REQUEST)]
+
+
+class RecordingStreamlit:
+    """记录 st.warning/st.error 的调用及调用线程"""
+
+    def __init__(self):
+        self.calls = []
+
+    def warning(self, message):
+        self.calls.append(("warning", message, threading.current_thread()))
+
+    def error(self, message):
+        self.calls.append(("error", message, threading.current_thread()))
+
+
+@pytest.fixture
+def st(monkeypatch):
+    recorder = RecordingStreamlit()
+    monkeypatch.setattr(youtube_api, "st", recorder)
+    return recorder
+
+
+def _api(stub_api, **kwargs):
+    return YouTubeAPI("test-key", base_url=stub_api.url, quota=QuotaLimiter(),
+                      use_cache=False, **kwargs)
+
+
+def test_batched_keeps_chunk_order(temp_db, stub_api, st):
+    videos = _api(stub_api).get_video_info_batched(VIDEO_IDS + VIDEO_IDS[:5], max_workers=3)
+
+    assert [video["video_id"] for video in videos] == VIDEO_IDS
+    assert stub_api.max_in_flight <= 3
+    assert st.calls == []
+
+
+def test_worker_failures_reported_from_calling_thread(temp_db, stub_api, st):
+    """各组请求的失败提示在调用线程中显示（工作线程没有 ScriptRunContext），相同提示只显示一次"""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+
+    videos = _api(stub_api, breaker=breaker).get_video_info_batched(VIDEO_IDS, max_workers=3)
+
+    assert videos == []
+    assert stub_api.client_ports == []
+    assert len(st.calls) == 1
+    level, message, thread = st.calls[0]
+    assert level == "warning" and "videos" in message
+    assert thread is threading.current_thread()
+
+
+def test_single_request_reports_directly(temp_db, stub_api, st):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+
+    assert _api(stub_api, breaker=breaker).get_video_info_batched(VIDEO_IDS[:3]) == []
+    assert [call[0] for call in st.calls] == ["warning"]
@@ -2,7 +2,7 @@
 """更新视频缩略图 URL"""
 
 import sys
-from database import init_database, get_videos, get_video_info, get_db_connection
+from database import init_database, get_videos, bulk_update_thumbnails
 
 def generate_thumbnail_url(video_id):
     """生成 YouTube 视频缩略图 URL"""
@@ -19,33 +19,23 @@ def main():
     videos = get_videos()
     print(f"找到 {len(videos)} 个视频\n")
     
-    # 更新每个视频的缩略图
-    updated_count = 0
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        for video in videos:
-            video_id = video[0]
-            video_title = video[1]
-            
-            # 生成缩略图 URL
-            thumbnail_url = generate_thumbnail_url(video_id)
-            
-            # 更新数据库
-            cursor.execute("""
-                UPDATE videos
-                SET thumbnail_url = ?
-                WHERE video_id = ?
-            """, (thumbnail_url, video_id))
-            
-            updated_count += 1
-            print(f"✅ {updated_count}. {video_title[:40]}... -> {thumbnail_url}")
+    # 生成所有视频的缩略图 URL
+    thumbnails = []
+    for video in videos:
+        video_id = video[0]
+        video_title = video[1]
         
-        # 提交更改
-        conn.commit()
+        thumbnail_url = generate_thumbnail_url(video_id)
+        thumbnails.append((video_id, thumbnail_url))
+        print(f"✅ {len(thumbnails)}. {video_title[:40]}... -> {thumbnail_url}")
+    
+    # 在一个事务中批量更新数据库
+    result = bulk_update_thumbnails(thumbnails)
+    
+    for failure in result["failed"]:
+        print(f"❌ {failure['key']}: {failure['error']}")
     
-    print(f"\n✅ 成功更新 {updated_count} 个视频的缩略图 URL")
+    print(f"\n✅ 成功更新 {result['succeeded']} 个视频的缩略图 URL")
 
 if __name__ == "__main__":
     main()
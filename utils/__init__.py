@@ -5,9 +5,11 @@
 from .helpers import (
     retry_on_failure,
     format_number,
+    format_numbers,
     format_percentage,
     safe_divide,
     truncate_text,
+    truncate_texts,
     get_color_class,
     show_loading,
     cache_key,
@@ -16,14 +18,17 @@ from .helpers import (
     format_duration,
     calculate_engagement_rate,
     get_video_age,
+    get_video_ages,
 )
 
 __all__ = [
     "retry_on_failure",
     "format_number",
+    "format_numbers",
     "format_percentage",
     "safe_divide",
     "truncate_text",
+    "truncate_texts",
     "get_color_class",
     "show_loading",
     "cache_key",
@@ -32,4 +37,5 @@ __all__ = [
     "format_duration",
     "calculate_engagement_rate",
     "get_video_age",
+    "get_video_ages",
 ]
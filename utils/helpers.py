@@ -6,6 +6,8 @@
 import time
 from functools import wraps
 from typing import List, Any
+import numpy as np
+import pandas as pd
 import streamlit as st
 
 
@@ -54,6 +56,24 @@ def format_number(num: int) -> str:
         return str(num)
 
 
+def format_numbers(values: pd.Series) -> pd.Series:
+    """
+    批量格式化数字，规则同 format_number
+    
+    Args:
+        values: 数字序列
+    
+    Returns:
+        格式化后的字符串序列
+    """
+    values = values.fillna(0)
+    return pd.Series(np.select(
+        [values >= 1000000, values >= 1000],
+        [(values / 1000000).map("{:.1f}M".format), (values / 1000).map("{:.1f}K".format)],
+        default=values.astype("int64").astype(str),
+    ), index=values.index)
+
+
 def format_percentage(value: float) -> str:
     """
     格式化百分比
@@ -99,6 +119,22 @@ def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
     return text[:max_length - len(suffix)] + suffix
 
 
+def truncate_texts(texts: pd.Series, max_length: int = 100, suffix: str = "...") -> pd.Series:
+    """
+    批量截断文本，规则同 truncate_text
+    
+    Args:
+        texts: 文本序列
+        max_length: 最大长度
+        suffix: 后缀
+    
+    Returns:
+        截断后的文本序列
+    """
+    texts = texts.fillna("").astype(str)
+    return texts.where(texts.str.len() <= max_length, texts.str.slice(0, max_length - len(suffix)) + suffix)
+
+
 def get_color_class(value: float, thresholds: List[float] = [0.5, 0.8]) -> str:
     """
     根据数值获取颜色类
@@ -219,6 +255,26 @@ def calculate_engagement_rate(likes: int, comments: int, views: int) -> float:
     return safe_divide(likes + comments, views, 0.0)
 
 
+def get_video_ages(published_at: pd.Series) -> pd.Series:
+    """
+    批量获取视频年龄，规则同 get_video_age
+    
+    Args:
+        published_at: 发布时间序列（datetime64[UTC]）
+    
+    Returns:
+        年龄字符串序列，时间缺失时为 "未知"
+    """
+    delta = pd.Timestamp.now(tz="UTC") - published_at
+    days = delta.dt.days
+    hours = delta.dt.seconds // 3600
+    return pd.Series(np.select(
+        [published_at.isna(), days > 0, hours > 0],
+        ["未知", days.astype("Int64").astype(str) + " 天前", hours.astype("Int64").astype(str) + " 小时前"],
+        default="刚刚",
+    ), index=published_at.index)
+
+
 def get_video_age(published_at: str) -> str:
     """
     获取视频年龄
@@ -5,14 +5,16 @@ import sys
 sys.path.insert(0, '.')
 
 from database import (
-    init_database, get_videos, get_video_info, get_latest_stats,
+    init_database, get_videos_frame, get_overview_kpis, get_top_videos, get_video_info, get_latest_stats,
     get_video_stats_history, get_comments, get_all_tags
 )
 from analytics import (
     analyze_video_performance, create_performance_chart,
     create_comparison_chart, generate_optimization_suggestions
 )
-from utils import calculate_engagement_rate, format_number
+from analytics.metrics import compute_video_metrics
+from utils import format_number, format_numbers, get_video_ages
+import pandas as pd
 
 print("=" * 80)
 print("测试 Dashboard 所有页面")
@@ -20,9 +22,9 @@ print("=" * 80)
 
 # 初始化数据库
 init_database()
-videos = get_videos()
+videos = get_videos_frame()
 
-if not videos:
+if videos.empty:
     print("❌ 没有视频数据")
     sys.exit(1)
 
@@ -34,33 +36,21 @@ print("测试 1: 整体看板页面 (render_overall_dashboard)")
 print("=" * 80)
 
 try:
-    total_views = sum([video[4] or 0 for video in videos])
-    total_likes = sum([video[5] or 0 for video in videos])
-    total_comments = sum([video[6] or 0 for video in videos])
+    kpis = get_overview_kpis()
 
-    print(f"✅ 总观看量: {format_number(total_views)}")
-    print(f"✅ 总点赞量: {format_number(total_likes)}")
-    print(f"✅ 总评论量: {format_number(total_comments)}")
+    print(f"✅ 总观看量: {format_number(kpis['total_views'])}")
+    print(f"✅ 总点赞量: {format_number(kpis['total_likes'])}")
+    print(f"✅ 总评论量: {format_number(kpis['total_comments'])}")
 
     # 视频排行
-    import pandas as pd
-    video_list = []
-    for video in videos:
-        engagement_rate = calculate_engagement_rate(
-            video[5] or 0,
-            video[6] or 0,
-            video[4] or 0
-        )
-        video_list.append({
-            "视频标题": video[1],
-            "观看量": video[4] or 0,
-            "点赞量": video[5] or 0,
-            "评论量": video[6] or 0,
-            "互动率": engagement_rate
-        })
-
-    df = pd.DataFrame(video_list)
-    df_sorted = df.sort_values("观看量", ascending=False).head(10)
+    top = get_top_videos("views", limit=10)
+    df_sorted = pd.DataFrame({
+        "视频标题": top["title"],
+        "观看量": top["view_count"],
+        "点赞量": top["like_count"],
+        "评论量": top["comment_count"],
+        "互动率": compute_video_metrics(top)["engagement_rate"],
+    })
     print(f"✅ 创建了 Top 10 排行榜")
 
     # 创建图表
@@ -88,8 +78,8 @@ print("=" * 80)
 print("测试 2: 单个视频详情页面 (render_video_detail)")
 print("=" * 80)
 
-video_id = videos[0][0]
-video_title = videos[0][1]
+video_id = videos["video_id"].iat[0]
+video_title = videos["title"].iat[0]
 
 try:
     print(f"选择视频: {video_title} ({video_id})")
@@ -160,19 +150,14 @@ print("测试 3: 视频管理页面 (render_video_management)")
 print("=" * 80)
 
 try:
-    video_list = []
-    for video in videos:
-        from utils import get_video_age
-        video_list.append({
-            "视频标题": video[1],
-            "频道": video[2],
-            "观看量": format_number(video[4] or 0),
-            "点赞量": format_number(video[5] or 0),
-            "评论量": format_number(video[6] or 0),
-            "发布时间": get_video_age(video[3]) if video[3] else "未知"
-        })
-
-    df = pd.DataFrame(video_list)
+    df = pd.DataFrame({
+        "视频标题": videos["title"],
+        "频道": videos["channel_title"],
+        "观看量": format_numbers(videos["view_count"]),
+        "点赞量": format_numbers(videos["like_count"]),
+        "评论量": format_numbers(videos["comment_count"]),
+        "发布时间": get_video_ages(videos["added_at"]),
+    })
     print(f"✅ 创建了视频列表: {len(df)} 个视频")
 
     print("\n✅ 视频管理页面测试通过\n")
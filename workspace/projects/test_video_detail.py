@@ -2,18 +2,17 @@
 """测试 render_video_detail 函数"""
 
 import sys
-from database import init_database, get_videos, get_video_info, get_latest_stats
+from database import init_database, get_videos_frame, get_video_info, get_latest_stats
 from analytics import create_performance_chart, generate_optimization_suggestions
 
 init_database()
-videos = get_videos()
+videos = get_videos_frame()
 
 print(f"找到 {len(videos)} 个视频\n")
 
 # 测试第一个视频
-video = videos[0]
-video_id = video[0]
-video_title = video[1]
+video_id = videos["video_id"].iat[0]
+video_title = videos["title"].iat[0]
 
 print(f"测试视频: {video_title}")
 print(f"Video ID: {video_id}\n")